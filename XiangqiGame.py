@@ -3,8 +3,16 @@
 # Description: Implementation of the game Chinese Chess, or Xiangqi.  This file represents the game
 #              class and imports the different piece classes from a separate file.
 
-import copy
-from pieces import Piece, Advisor, Cannon, Chariot, Elephant, General, Horse, Soldier
+import importlib
+from pieces import Piece, Advisor, Cannon, Chariot, Elephant, General, Horse, Soldier, COLUMNS, PIECE_KINDS
+from board import (
+    CompactBoard, AttackMapBoard, square_index, piece_code,
+    COLORS, SQUARE_NAMES, SQUARE_COORDINATES, RAYS, HORSE_ATTACKERS, SHORT_RANGE_ATTACKERS, code_color
+)
+from zobrist import ZOBRIST_PIECE_KEYS, ZOBRIST_SIDE_KEY, ZOBRIST_GAME_STATE_KEY, hash_board
+from evaluation import PIECE_SQUARE_VALUES, score_board, score_codes
+from transposition import EXACT
+from snapshot import GameSnapshot
 
 class XiangqiGame:
     """
@@ -84,29 +92,274 @@ class XiangqiGame:
         "black": "red"
     }
 
-    def __init__(self):
+    # A constant of the optional board backends that can be kept alongside the nested dict board
+    # to speed up check detection and move generation. The default "dict" backend uses the piece
+    # objects and the nested dict board alone. The bitboard backend is named by module and class
+    # and only imported once a game uses it, as building its tables slows down every import.
+    BOARD_BACKENDS = {
+        "dict": None,
+        "compact": CompactBoard,
+        "attack_map": AttackMapBoard,
+        "bitboard": ("bitboard", "BitBoard")
+    }
+
+    # Constant of the piece classes by FEN letter. Lower case letters are black pieces and upper
+    # case red, and both the B/N and E/H letters are used for the elephant and horse.
+    FEN_PIECES = {
+        'k': General,
+        'a': Advisor,
+        'b': Elephant,
+        'e': Elephant,
+        'n': Horse,
+        'h': Horse,
+        'r': Chariot,
+        'c': Cannon,
+        'p': Soldier
+    }
+
+    # Constant of the FEN letter written for each piece, by the letter the piece classes print as
+    FEN_LETTERS = {
+        'G': 'k',
+        'A': 'a',
+        'E': 'b',
+        'H': 'n',
+        'R': 'r',
+        'C': 'c',
+        'S': 'p'
+    }
+
+    # Constant of the FEN side to move letters, 'w' is the usual letter for red
+    FEN_TURNS = {
+        'w': "red",
+        'r': "red",
+        'b': "black"
+    }
+
+    # FEN of the starting position
+    START_FEN = "rnbakabnr/9/1c5c1/p1p1p1p1p/9/9/P1P1P1P1P/1C5C1/9/RNBAKABNR w - - 0 1"
+
+    # Constant of the attributes a game made from a snapshot builds the first time they are used
+    LAZY_ATTRIBUTES = ('_board', '_red_pieces', '_black_pieces')
+
+    # Number of times a position must occur for the repetition rules to end the game
+    REPETITION_LIMIT = 3
+
+    # Move Reason Codes #
+    #####################
+    # Returned by validate_moves for each move checked
+    #
+    # LEGAL                   -> The move can be made
+    # GAME_OVER               -> The game has already been won or drawn
+    # INVALID_COORDINATE      -> A coordinate is not a square on the board
+    # NO_PIECE                -> There is no piece on the from square
+    # WRONG_COLOR             -> The piece belongs to the player not moving
+    # INVALID_PIECE_MOVE      -> The piece cannot move that way
+    # EXPOSES_GENERAL         -> The move leaves the two generals facing each other
+    # LEAVES_GENERAL_IN_CHECK -> The move leaves the moving players general in check
+    MOVE_REASONS = (
+        "LEGAL", "GAME_OVER", "INVALID_COORDINATE", "NO_PIECE", "WRONG_COLOR",
+        "INVALID_PIECE_MOVE", "EXPOSES_GENERAL", "LEAVES_GENERAL_IN_CHECK"
+    )
+
+    def __init__(self, board_backend = "dict", game_state_cache = None, fen = None, snapshot = None,
+                 lazy_game_state = False, repetition_rules = False):
         """
         Initialization method that sets up the initial game state including instantiating
-        red and black pieces and placing them in the game board
+        red and black pieces and placing them in the game board. Takes an optional board
+        backend name from BOARD_BACKENDS, an optional TranspositionTable to cache the
+        checkmate and stalemate checks in by position hash, which may be shared between games,
+        and an optional FEN string or GameSnapshot to start from instead of the starting position.
+        With lazy_game_state true, the checkmate and stalemate check is not run after each move
+        but only when the game state is asked for. Repetition rules are off by default so records
+        that repeat a position can be replayed, with repetition_rules true a position reached for
+        the third time ends the game as judged by repetition_result.
+        """
+        if board_backend not in self.BOARD_BACKENDS:
+            raise ValueError(f"Unknown board backend: {board_backend}")
+
+        self._game_state       = "UNFINISHED"
+        self._current_turn     = "red"
+        self._lazy_codes       = None
+        self._lazy_game_state  = lazy_game_state
+        self._repetition_rules = repetition_rules
+
+        if snapshot is not None:
+            # The board and pieces are left unset and built by __getattr__ if they are used
+            self._game_state   = snapshot.get_game_state()
+            self._current_turn = snapshot.get_current_turn()
+            self._lazy_codes   = snapshot.get_codes()
+        elif fen is None:
+            self._red_pieces   = self.initialize_pieces("red")
+            self._black_pieces = self.initialize_pieces("black")
+            self._board        = self.initialize_board()
+        else:
+            self.load_fen(fen)
+
+        self._board_backend    = None
+        self._move_stack       = []
+        self._game_state_cache = game_state_cache
+
+        if snapshot is not None:
+            self._position_hash = snapshot.get_position_hash()
+            self._score         = score_codes(self._lazy_codes)
+        else:
+            self._position_hash = hash_board(self._board, self._current_turn)
+            self._score         = score_board(self._board)
+
+        # Number of times each position hash has occurred in the game, for repetition lookups
+        self._position_counts = { self._position_hash: 1 }
+
+        self._board_backend_name = board_backend
+        backend_class            = self.get_backend_class(board_backend)
+
+        if backend_class and self._lazy_codes is not None:
+            self._board_backend = backend_class.from_codes(self._lazy_codes)
+        elif backend_class:
+            self._board_backend = backend_class.from_board(self._board)
+
+        # A loaded position may already be lost for the player to move
+        if fen is not None and lazy_game_state:
+            self._game_state = None
+        elif fen is not None:
+            self.update_game_state(self._current_turn)
+
+    def __getattr__(self, name):
+        """
+        Builds the board and pieces of a game made from a snapshot the first time one of them is
+        used. Python only calls this for attributes that are not set, so once they are built it
+        is never called for them again.
+        """
+        lazy_codes = self.__dict__.get('_lazy_codes')
+
+        if name not in self.LAZY_ATTRIBUTES or lazy_codes is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        self.load_codes(lazy_codes)
+
+        return self.__dict__[name]
+
+    @classmethod
+    def from_fen(cls, fen, board_backend = "dict", game_state_cache = None, lazy_game_state = False,
+                 repetition_rules = False):
+        """
+        Takes a FEN string (ex XiangqiGame.START_FEN) and optional board backend name, game
+        state cache, lazy game state flag and repetition rules flag, and returns a new game set
+        up in that position
+        """
+        return cls(board_backend, game_state_cache, fen, None, lazy_game_state, repetition_rules)
+
+    @classmethod
+    def from_snapshot(cls, snapshot, board_backend = "dict", game_state_cache = None, lazy_game_state = False,
+                      repetition_rules = False):
+        """
+        Takes a GameSnapshot and optional board backend name, game state cache, lazy game state
+        flag and repetition rules flag, and returns a new game in that position with an empty
+        move history. Piece objects are only built if the game uses them, a board backend is
+        built straight from the piece codes.
+        """
+        return cls(board_backend, game_state_cache, None, snapshot, lazy_game_state, repetition_rules)
+
+    @classmethod
+    def get_backend_class(cls, board_backend):
+        """
+        Takes a board backend name from BOARD_BACKENDS and returns its class, importing it first
+        if it is only named by module, or None for the "dict" backend
+        """
+        backend_class = cls.BOARD_BACKENDS[board_backend]
+
+        if isinstance(backend_class, tuple):
+            module_name, class_name = backend_class
+            backend_class           = getattr(importlib.import_module(module_name), class_name)
+
+        return backend_class
+
+    def snapshot(self):
+        """
+        Returns an immutable GameSnapshot of the position, player to move, game state and hash
         """
-        self._game_state   = "UNFINISHED"
-        self._current_turn = "red"
-        self._red_pieces   = self.initialize_pieces("red")
-        self._black_pieces = self.initialize_pieces("black")
-        self._board        = self.initialize_board()
+        if self._lazy_codes is not None:
+            codes = self._lazy_codes
+        elif self._board_backend:
+            codes = self._board_backend.get_codes()
+        else:
+            codes = bytearray(90)
+
+            for row, columns in self._board.items():
+                for column, piece in columns.items():
+                    if piece:
+                        codes[square_index(column, row)] = piece_code(piece)
+
+        return GameSnapshot(codes, self._current_turn, self.get_game_state(), self._position_hash)
+
+    def clone(self):
+        """
+        Returns a copy of the game in the same position with the same board backend, sharing no
+        state with this game. The copy starts with an empty move history, so its repetition
+        counts start again from this position.
+        """
+        return self.from_snapshot(
+            self.snapshot(), self._board_backend_name, self._game_state_cache, self._lazy_game_state, self._repetition_rules
+        )
 
     def get_game_state(self):
         """
-        Returns the current game state string
+        Returns the current game state string, first running the checkmate and stalemate check
+        if a move made in lazy game state mode left it pending
         """
+        if self._game_state is None:
+            self.resolve_game_state()
+
         return self._game_state
 
+    def resolve_game_state(self):
+        """
+        Runs the checkmate and stalemate check for the player to move, settling a pending game
+        state. The result stands until the next move.
+        """
+        self._game_state = "UNFINISHED"
+        self.update_game_state(self._current_turn)
+
+    def get_position_hash(self):
+        """
+        Returns the 64 bit Zobrist hash of the current position, covering every piece and the
+        player to move
+        """
+        return self._position_hash
+
     def get_current_turn(self):
         """
         Returns the current colors turn as a string
         """
         return self._current_turn
 
+    def get_piece(self, coord_dict):
+        """
+        Takes a coordinate dict of row and column and returns the piece on that square, or None
+        """
+        return self._board[coord_dict['row']][coord_dict['column']]
+
+    def get_piece_kind(self, coord_dict):
+        """
+        Takes a coordinate dict of row and column and returns the interned PieceKind on that
+        square, or None. A game made from a snapshot answers from its piece codes without
+        building any piece objects.
+        """
+        if self._lazy_codes is not None:
+            return PIECE_KINDS[self._lazy_codes[square_index(coord_dict['column'], coord_dict['row'])]]
+
+        if self._board_backend:
+            return PIECE_KINDS[self._board_backend.get_code(square_index(coord_dict['column'], coord_dict['row']))]
+
+        piece = self._board[coord_dict['row']][coord_dict['column']]
+
+        return piece.get_kind() if piece else None
+
+    def get_pieces(self, color):
+        """
+        Takes a color string and returns a list of that colors pieces still in play
+        """
+        return [piece for piece in getattr(self, f"_{color}_pieces").values() if piece.is_in_play()]
+
     def toggle_turn(self):
         """
         Changes the current turn attribute to the opposite of current state
@@ -121,27 +374,73 @@ class XiangqiGame:
         Method that takes a color string and checks the current state of the game,
         returning true if the given color is in a state of 'check' and false if
         not. Can also take a piece to ignore if checking whether a potential move
-        would result in a check.
+        would result in a check, though a captured piece is already off the board
+        during that check.
         """
+        # The board backend works outward from the general instead
+        if self._board_backend:
+            return self._board_backend.is_in_check(color)
+
         # Find the coordinates of the general of the given color
         generals_coords = getattr(self, f"_{color}_pieces")["G"].get_coordinates()
 
-        # Get the opposing colors pieces
-        opposite_color  = self.OPPOSITE_COLOR_DICT[color]
-        opposing_pieces = getattr(self, f"_{opposite_color}_pieces")
+        # Look outward from the general for any opposing piece that could capture it
+        return self.square_is_attacked(
+            generals_coords['column'], generals_coords['row'], self.OPPOSITE_COLOR_DICT[color], piece_to_ignore
+        )
+
+    def square_is_attacked(self, column, row, color, piece_to_ignore = None):
+        """
+        Takes a column, row and color string, and returns true if any piece of that color could
+        capture on the square. Rather than asking every piece of the color, it works outward from
+        the square along the rows and columns for chariots and cannons and checks the few squares
+        the other pieces could attack it from. A piece to ignore is never counted as attacking.
+        """
+        board  = self._board
+        square = square_index(column, row)
+
+        # Chariots are the first piece found along a row or column and cannons the second
+        for ray in RAYS[square]:
+            screen_found = False
+
+            for target in ray:
+                target_column, target_row = SQUARE_COORDINATES[target]
+                piece = board[target_row][target_column]
+
+                if piece:
+                    if piece.get_color() == color and piece is not piece_to_ignore:
+                        if not screen_found and isinstance(piece, Chariot):
+                            return True
+
+                        if screen_found and isinstance(piece, Cannon):
+                            return True
+
+                    if screen_found:
+                        break
+
+                    screen_found = True
+
+        # Horses attack through the square next to themselves
+        for horse_square, leg in HORSE_ATTACKERS[square]:
+            horse_column, horse_row = SQUARE_COORDINATES[horse_square]
+            piece = board[horse_row][horse_column]
+
+            if piece and isinstance(piece, Horse) and piece.get_color() == color and piece is not piece_to_ignore:
+                leg_column, leg_row = SQUARE_COORDINATES[leg]
+
+                if not board[leg_row][leg_column]:
+                    return True
+
+        # The remaining pieces can only attack from the surrounding squares, so any found there
+        # are asked directly
+        for target in SHORT_RANGE_ATTACKERS[square]:
+            target_column, target_row = SQUARE_COORDINATES[target]
+            piece = board[target_row][target_column]
+
+            if piece and piece.get_color() == color and piece is not piece_to_ignore:
+                if isinstance(piece, (Soldier, General, Advisor, Elephant)) and piece.valid_move(column, row, board):
+                    return True
 
-        # Iterate the opposing colors pieces and if the piece is still in play, check if
-        # the generals coordinates are a valid move for the given piece and return True if so.
-        for piece in opposing_pieces.values():
-            if piece.is_in_play():
-                # Can ignore a given piece, used when checking if a potential move would result in
-                # a check by ignoring a piece that would otherwise be captured.
-                if not piece_to_ignore or piece_to_ignore.get_coordinates() != piece.get_coordinates():
-                    if piece.valid_move(generals_coords['column'], generals_coords['row'], self._board):
-                        return True
-
-        # If no piece has a valid move to the generals coordinates return false as the
-        # player is not in check
         return False
 
     def make_move(self, from_coord, to_coord, alter_state = True):
@@ -152,8 +451,9 @@ class XiangqiGame:
         the alter state variable is true it will also execute the move and evaluate
         the current state of the game, updating as appropriate.
         """
-        # Return false if game is over
-        if self._game_state != "UNFINISHED":
+        # Return false if game is over. A pending game state is not worked out here, a finished
+        # position has no legal moves so the move is refused by the checks below anyway.
+        if self._game_state is not None and self._game_state != "UNFINISHED":
             return False
 
         # Convert input to usable dicts
@@ -172,36 +472,439 @@ class XiangqiGame:
         if not piece.valid_move(to_coord_dict['column'], to_coord_dict['row'], self._board):
             return False
 
-        # Check if the move exposes the general.  If the piece being moved is a General it
-        # will check within it's own valid_move logic, otherwise check using the move_exposes_general
-        # helper method.
-        if piece.__class__.__name__ != "General" and self.move_exposes_general(from_coord_dict, to_coord_dict):
-            return False
-
-        # Return false if the move would put the current players general in check
-        if self.move_puts_current_player_in_check(from_coord_dict, to_coord_dict):
+        # Return false if the move would expose the general or leave it in check. Analysing the
+        # position first lets most moves skip simulating the move.
+        if not self.move_is_legal(piece, from_coord_dict, to_coord_dict, self.analyze_position(self._current_turn)):
             return False
 
         # Only change the game state and make the move if alter_state is true.  Allows for evaluating
         # a move without actually making the move.
         if alter_state:
-            piece_at_destination = self._board[to_coord_dict['row']][to_coord_dict['column']]
+            self.apply_move(from_coord_dict, to_coord_dict)
 
-            self._board[to_coord_dict['row']][to_coord_dict['column']] = piece
-            self._board[from_coord_dict['row']][from_coord_dict['column']] = None
+            # Check if the last move ended the game by preventing the opposing player
+            # from having any valid moves, or leave it pending in lazy game state mode
+            if self._lazy_game_state:
+                self._game_state = None
+            else:
+                self.update_game_state(self._current_turn)
 
-            piece.set_coordinates(to_coord_dict['column'], to_coord_dict['row'])
+            # A position reached for the third time ends the game unless the move already won it
+            if (self._repetition_rules and self._game_state in ("UNFINISHED", None) and
+                    self._position_counts[self._position_hash] >= self.REPETITION_LIMIT):
+                self._game_state = self.repetition_result()
 
-            if piece_at_destination:
-                piece_at_destination.capture()
+        return True
 
-            self.toggle_turn()
+    def validate_moves(self, moves, with_reasons = True):
+        """
+        Takes a list of (from, to) tuples of string coordinates (ex ('h3', 'e3')) and checks each
+        as make_move would for the player to move, without making any of them. Returns a list
+        with a reason code from MOVE_REASONS for each move, or a list of booleans if with_reasons
+        is false. The position is analysed once for the whole list, so most moves are accepted
+        without simulating them.
+        """
+        analysis    = None
+        coord_dicts = {}
+        reasons     = []
 
-            # Check if the last move ended the game by preventing the opposing player
-            # from having any valid moves
-            self.update_game_state(self._current_turn)
+        for from_coord, to_coord in moves:
+            if self.get_game_state() != "UNFINISHED":
+                reasons.append("GAME_OVER")
+                continue
 
-        return True
+            # Anything but a coordinate string is invalid, and may not even be hashable
+            if not self.is_coordinate(from_coord) or not self.is_coordinate(to_coord):
+                reasons.append("INVALID_COORDINATE")
+                continue
+
+            # Each distinct coordinate is only converted once
+            for coord in (from_coord, to_coord):
+                if coord not in coord_dicts:
+                    coord_dicts[coord] = self.convert_coord(coord)
+
+            from_coord_dict = coord_dicts[from_coord]
+            to_coord_dict   = coord_dicts[to_coord]
+            piece           = self._board[from_coord_dict['row']][from_coord_dict['column']]
+
+            if piece is None:
+                reasons.append("NO_PIECE")
+                continue
+
+            if piece.get_color() != self._current_turn:
+                reasons.append("WRONG_COLOR")
+                continue
+
+            if not piece.valid_move(to_coord_dict['column'], to_coord_dict['row'], self._board):
+                reasons.append("INVALID_PIECE_MOVE")
+                continue
+
+            if analysis is None:
+                analysis = self.analyze_position(self._current_turn)
+
+            if self.move_is_legal(piece, from_coord_dict, to_coord_dict, analysis):
+                reasons.append("LEGAL")
+            elif not isinstance(piece, General) and self.move_exposes_general(from_coord_dict, to_coord_dict):
+                reasons.append("EXPOSES_GENERAL")
+            else:
+                reasons.append("LEAVES_GENERAL_IN_CHECK")
+
+        if not with_reasons:
+            return [reason == "LEGAL" for reason in reasons]
+
+        return reasons
+
+    def analyze_position(self, color):
+        """
+        Takes a color string and works outward from that colors general once to find what any of
+        its moves could change about the generals safety. Returns a dict of:
+
+        general        -> the square index of the general
+        checkers       -> a list of the squares of pieces giving check, including an opposing
+                          general on an open file
+        pinned         -> a set of the squares of the colors own pieces that may be shielding
+                          the general, being the only piece between it and a chariot or general,
+                          one of the two pieces between it and a cannon, or on the leg of a horse
+        screen_squares -> a set of the empty squares between the general and an opposing cannon
+                          with nothing between them, where any piece would become a screen
+        evasion_squares -> a set of the squares that can matter to a single check, being the
+                           checker, the squares between it and the general, and a horses leg
+
+        A move by a piece other than the general, from a square not pinned, to a square that is
+        not a screen square, cannot leave the general in check or facing the other general when
+        there are no checkers. When there is one checker, a move by a piece other than the
+        general that neither starts nor ends on an evasion square cannot get out of check.
+        """
+        board          = self._board
+        coords         = getattr(self, f"_{color}_pieces")['G'].get_coordinates()
+        general_square = square_index(coords['column'], coords['row'])
+        checkers        = []
+        pinned          = set()
+        screen_squares  = set()
+        evasion_squares = set()
+
+        # Only the first three pieces along each row and column from the general matter, the
+        # first can attack directly, the second over the first as a cannon, and the third over
+        # two pieces that would leave a cannon attacking if one of them moved
+        for ray in RAYS[general_square]:
+            found = []
+            empty = []
+
+            for target in ray:
+                target_column, target_row = SQUARE_COORDINATES[target]
+                piece = board[target_row][target_column]
+
+                if piece:
+                    found.append((target, piece))
+
+                    if len(found) == 3:
+                        break
+                elif not found:
+                    empty.append(target)
+
+            if not found:
+                continue
+
+            first_square, first = found[0]
+            first_is_own        = first.get_color() == color
+
+            if not first_is_own:
+                if isinstance(first, (Chariot, General)):
+                    checkers.append(first_square)
+                    evasion_squares.update(empty, (first_square,))
+                elif isinstance(first, Cannon):
+                    screen_squares.update(empty)
+
+            if len(found) > 1:
+                second_square, second = found[1]
+
+                if second.get_color() != color:
+                    if isinstance(second, Cannon):
+                        checkers.append(second_square)
+                        evasion_squares.update(ray[:ray.index(second_square) + 1])
+                    elif isinstance(second, (Chariot, General)) and first_is_own:
+                        pinned.add(first_square)
+
+            if len(found) > 2:
+                third_square, third = found[2]
+
+                if third.get_color() != color and isinstance(third, Cannon):
+                    pinned.update(square for square, piece in found[:2] if piece.get_color() == color)
+
+        # Horses attack through the square next to themselves, so an own piece on that square
+        # is shielding the general
+        for horse_square, leg in HORSE_ATTACKERS[general_square]:
+            horse_column, horse_row = SQUARE_COORDINATES[horse_square]
+            piece = board[horse_row][horse_column]
+
+            if piece and isinstance(piece, Horse) and piece.get_color() != color:
+                leg_column, leg_row = SQUARE_COORDINATES[leg]
+                leg_piece = board[leg_row][leg_column]
+
+                if not leg_piece:
+                    checkers.append(horse_square)
+                    evasion_squares.update((horse_square, leg))
+                elif leg_piece.get_color() == color:
+                    pinned.add(leg)
+
+        # The remaining pieces can only attack from the surrounding squares
+        for target in SHORT_RANGE_ATTACKERS[general_square]:
+            target_column, target_row = SQUARE_COORDINATES[target]
+            piece = board[target_row][target_column]
+
+            if piece and piece.get_color() != color and isinstance(piece, (Soldier, Advisor, Elephant)):
+                if piece.valid_move(coords['column'], coords['row'], board):
+                    checkers.append(target)
+                    evasion_squares.add(target)
+
+        return {
+            "general": general_square,
+            "checkers": checkers,
+            "pinned": pinned,
+            "screen_squares": screen_squares,
+            "evasion_squares": evasion_squares
+        }
+
+    def is_coordinate(self, coord):
+        """
+        Returns true if the given string is a coordinate on the board (ex 'a10')
+        """
+        return isinstance(coord, str) and coord in SQUARE_NAMES
+
+    def push_move(self, from_coord, to_coord):
+        """
+        Takes a from and to coordinate as a string (ex 'a1') and makes the move exactly as
+        make_move does, returning true if the move was made. Every move made is kept on the
+        move stack so it can be taken back with pop_move.
+        """
+        return self.make_move(from_coord, to_coord)
+
+    def pop_move(self):
+        """
+        Takes back the last move made, restoring any captured piece along with the game state
+        and turn from before the move. Returns the move taken back as a (from, to) tuple of
+        string coordinates, or False if no moves have been made.
+        """
+        if not self._move_stack:
+            return False
+
+        move_record     = self._move_stack.pop()
+        piece           = move_record['piece']
+        captured_piece  = move_record['captured']
+        from_coord_dict = move_record['from']
+        to_coord_dict   = move_record['to']
+
+        self._board[from_coord_dict['row']][from_coord_dict['column']] = piece
+        self._board[to_coord_dict['row']][to_coord_dict['column']] = captured_piece
+
+        piece.set_coordinates(from_coord_dict['column'], from_coord_dict['row'])
+
+        if captured_piece:
+            captured_piece.restore()
+
+        if self._board_backend:
+            self._board_backend.undo(move_record['from_square'], move_record['to_square'], move_record['backend_captured'])
+
+        position_count = self._position_counts[self._position_hash]
+
+        if position_count == 1:
+            del self._position_counts[self._position_hash]
+        else:
+            self._position_counts[self._position_hash] = position_count - 1
+
+        self.update_position_hash(piece, captured_piece, move_record['from_square'], move_record['to_square'])
+
+        self._game_state   = move_record['game_state']
+        self._current_turn = move_record['turn']
+        self._score        = move_record['score']
+
+        return self.format_coord(from_coord_dict), self.format_coord(to_coord_dict)
+
+    def apply_move(self, from_coord_dict, to_coord_dict):
+        """
+        Takes from and to coordinates (as dicts) and makes the move without any validation,
+        capturing any piece at the destination, changing the turn and recording the move on the
+        move stack. The game state is left for the caller to update, which lets searches make
+        and take back moves without running the checkmate scan on every one.
+        """
+        piece                = self._board[from_coord_dict['row']][from_coord_dict['column']]
+        piece_at_destination = self._board[to_coord_dict['row']][to_coord_dict['column']]
+        from_square          = square_index(from_coord_dict['column'], from_coord_dict['row'])
+        to_square            = square_index(to_coord_dict['column'], to_coord_dict['row'])
+
+        self._board[to_coord_dict['row']][to_coord_dict['column']] = piece
+        self._board[from_coord_dict['row']][from_coord_dict['column']] = None
+
+        piece.set_coordinates(to_coord_dict['column'], to_coord_dict['row'])
+
+        if piece_at_destination:
+            piece_at_destination.capture()
+
+        backend_captured = None
+
+        if self._board_backend:
+            backend_captured = self._board_backend.move(from_square, to_square)
+
+        position_hash = self._position_hash
+        score         = self._score
+
+        self.update_position_hash(piece, piece_at_destination, from_square, to_square)
+        self.update_score(piece, piece_at_destination, from_square, to_square)
+
+        self._position_counts[self._position_hash] = self._position_counts.get(self._position_hash, 0) + 1
+
+        # Record everything needed to take the move back
+        self._move_stack.append({
+            "piece": piece,
+            "from": from_coord_dict,
+            "to": to_coord_dict,
+            "from_square": from_square,
+            "to_square": to_square,
+            "captured": piece_at_destination,
+            "backend_captured": backend_captured,
+            "game_state": self._game_state,
+            "turn": self._current_turn,
+            "position_hash": position_hash,
+            "score": score
+        })
+
+        self.toggle_turn()
+
+    def update_position_hash(self, piece, captured_piece, from_square, to_square):
+        """
+        Applies the XOR deltas of a move to the position hash given the piece moved, any piece
+        captured and the square indices moved between. XOR undoes itself, so the same call takes
+        a move back out of the hash.
+        """
+        piece_keys = ZOBRIST_PIECE_KEYS[piece_code(piece)]
+
+        position_hash = self._position_hash ^ piece_keys[from_square] ^ piece_keys[to_square] ^ ZOBRIST_SIDE_KEY
+
+        if captured_piece:
+            position_hash ^= ZOBRIST_PIECE_KEYS[piece_code(captured_piece)][to_square]
+
+        self._position_hash = position_hash
+
+    def update_score(self, piece, captured_piece, from_square, to_square):
+        """
+        Adds the change in the evaluation score from a move to the score, given the piece moved,
+        any piece captured and the square indices moved between. Taking a move back restores the
+        score saved with the move instead.
+        """
+        piece_values = PIECE_SQUARE_VALUES[piece_code(piece)]
+
+        score = self._score + piece_values[to_square] - piece_values[from_square]
+
+        if captured_piece:
+            score -= PIECE_SQUARE_VALUES[piece_code(captured_piece)][to_square]
+
+        self._score = score
+
+    def evaluate(self):
+        """
+        Returns the static evaluation of the position from red's point of view, the material
+        and square bonuses of red's pieces less those of black's, so positive when red is ahead.
+        The score is kept up to date as moves are made and taken back rather than worked out here.
+        """
+        return self._score
+
+    def get_move_history(self):
+        """
+        Returns a list of the moves on the move stack, oldest first, as (from, to) tuples of
+        string coordinates
+        """
+        return [
+            (self.format_coord(move_record['from']), self.format_coord(move_record['to']))
+            for move_record in self._move_stack
+        ]
+
+    def get_repetition_count(self):
+        """
+        Returns the number of times the current position, with the same player to move, has
+        occurred in the game
+        """
+        return self._position_counts.get(self._position_hash, 0)
+
+    def repetition_result(self):
+        """
+        Judges a position that has occurred REPETITION_LIMIT times by the moves made since it
+        last occurred, and returns the game state it ends the game with. A side that gave check
+        with every one of its moves loses, as does a side that checked or chased with every move
+        when the other side did not. Anything else, including both sides checking, is a draw.
+        """
+        # The cycle starts at the last move made from the current position
+        cycle_start = len(self._move_stack) - 1
+
+        while self._move_stack[cycle_start]['position_hash'] != self._position_hash:
+            cycle_start -= 1
+
+        cycle  = self._move_stack[cycle_start:]
+        checks = { "red": True, "black": True }
+        chases = { "red": True, "black": True }
+
+        # Take the cycle back and play it again to see what each move did
+        for _move_record in cycle:
+            self.pop_move()
+
+        for move_record in cycle:
+            color = move_record['turn']
+
+            self.apply_move(move_record['from'], move_record['to'])
+
+            gives_check   = self.is_in_check(self.OPPOSITE_COLOR_DICT[color])
+            checks[color] = checks[color] and gives_check
+            chases[color] = chases[color] and (gives_check or self.move_chases(move_record['to']))
+
+        # Perpetual check is judged before perpetual chase, so a side checking every move against
+        # one chasing every move loses
+        for color in ("red", "black"):
+            other_color = self.OPPOSITE_COLOR_DICT[color]
+
+            if checks[color] and not checks[other_color]:
+                return other_color.upper() + "_WON"
+
+        for color in ("red", "black"):
+            other_color = self.OPPOSITE_COLOR_DICT[color]
+
+            if chases[color] and not chases[other_color]:
+                return other_color.upper() + "_WON"
+
+        return "DRAW"
+
+    def move_chases(self, coord_dict):
+        """
+        Takes the coordinates (as a dict) of a piece that has just moved and returns true if it
+        now chases an opposing piece: threatens to capture a piece that could not be recaptured,
+        or a chariot with a horse or cannon. Generals and soldiers neither chase nor are chased.
+        """
+        piece = self._board[coord_dict['row']][coord_dict['column']]
+
+        if isinstance(piece, (General, Soldier)):
+            return False
+
+        other_color = self.OPPOSITE_COLOR_DICT[piece.get_color()]
+
+        for target in self.get_pieces(other_color):
+            if isinstance(target, (General, Soldier)):
+                continue
+
+            target_coord_dict = target.get_coordinates()
+
+            if not piece.valid_move(target_coord_dict['column'], target_coord_dict['row'], self._board):
+                continue
+
+            if isinstance(target, Chariot) and isinstance(piece, (Horse, Cannon)):
+                return True
+
+            # Make the capture to see whether the other side could take back
+            self.apply_move(coord_dict, target_coord_dict)
+            protected = self.square_is_attacked(target_coord_dict['column'], target_coord_dict['row'], other_color)
+            self.pop_move()
+
+            if not protected:
+                return True
+
+        return False
 
     def update_game_state(self, color):
         """
@@ -209,25 +912,40 @@ class XiangqiGame:
         the color has no valid moves that would keep them out of check, it is either a stalemate
         or checkmate, and sets the other color as the winner in the game state
         """
-        # Get the colors pieces to iterate
-        pieces_to_check = getattr(self, f"_{color}_pieces")
+        cache_key = None
+
+        # Look the position up in the cache first, keyed by the hash with the color to move. The
+        # key is moved into its own key space, as the score of these entries is a flag for
+        # whether the color has a legal move and a table shared with a search must not mix them.
+        if self._game_state_cache is not None:
+            cache_key = self._position_hash ^ ZOBRIST_GAME_STATE_KEY
+
+            if color != self._current_turn:
+                cache_key ^= ZOBRIST_SIDE_KEY
+
+            entry = self._game_state_cache.probe(cache_key)
+
+            if entry is not None:
+                if entry['score']:
+                    return
 
-        # Iterate all of the pieces of the given color, and if the piece is in play, try moving
-        # that piece to every other spot on the board to see if there is a valid move.  If a valid
-        # move is found the loops are exited and no further action is taken.
-        for _key, piece in pieces_to_check.items():
-            if  piece.is_in_play():
-                piece_coords_dict = piece.get_coordinates()
+                self._game_state = self.OPPOSITE_COLOR_DICT[color].upper() + "_WON"
+                return
 
-                for row in range(1, 11):
-                    for column in range(97, 106):
-                        from_coord = piece_coords_dict['column'] + str(piece_coords_dict['row'])
-                        to_coord   = chr(column) + str(row)
+        # Pull the first legal move for the color, if one is found no further action is taken
+        for from_coord_dict, to_coord_dict in self.generate_legal_moves(color):
+            if cache_key is not None:
+                self._game_state_cache.store(
+                    cache_key, 0, 1, EXACT, (
+                        square_index(from_coord_dict['column'], from_coord_dict['row']),
+                        square_index(to_coord_dict['column'], to_coord_dict['row'])
+                    )
+                )
 
-                        # Send false to the make move method to prevent the actual game state
-                        # from being altered
-                        if self.make_move(from_coord, to_coord, False):
-                            return
+            return
+
+        if cache_key is not None:
+            self._game_state_cache.store(cache_key, 0, 0, EXACT)
 
         # If the check did not exit early, then there was no valid move and set the other color
         # as the winner.
@@ -235,6 +953,177 @@ class XiangqiGame:
 
         self._game_state = winning_color.upper() + "_WON"
 
+    def legal_moves(self, color = None):
+        """
+        Takes an optional color string, defaulting to the player whose turn it is, and returns
+        a list of every legal move for that color as (from, to) tuples of string coordinates
+        (ex ('b3', 'e3')).
+        """
+        if color is None:
+            color = self._current_turn
+
+        moves = [
+            (self.format_coord(from_coord_dict), self.format_coord(to_coord_dict))
+            for from_coord_dict, to_coord_dict in self.generate_legal_moves(color)
+        ]
+
+        # The moves of the player to move settle a pending game state without another scan
+        if self._game_state is None and color == self._current_turn:
+            self._game_state = "UNFINISHED" if moves else self.OPPOSITE_COLOR_DICT[color].upper() + "_WON"
+
+        return moves
+
+    def generate_legal_moves(self, color):
+        """
+        Generator that takes a color string and yields every legal move for that color as
+        (from, to) coordinate dict pairs.  Only the destinations produced by each piece's own
+        generate_moves are checked, rather than every square on the board.
+        """
+        # One analysis of the position serves every move, so it must not change while the moves
+        # are being generated
+        analysis = self.analyze_position(color)
+
+        # The board backend generates moves from its own tables, and only the moves the analysis
+        # cannot settle are simulated on it
+        if self._board_backend:
+            board_backend  = self._board_backend
+            general_square = analysis['general']
+            pinned         = analysis['pinned']
+            screen_squares = analysis['screen_squares']
+            in_check       = bool(analysis['checkers'])
+
+            for from_square, to_square in board_backend.generate_moves(color):
+                # The common case of no check is settled here without a call per move
+                if from_square == general_square:
+                    legal = None
+                elif not in_check:
+                    legal = None if from_square in pinned or to_square in screen_squares else True
+                else:
+                    legal = self.analysis_verdict(analysis, from_square, to_square)
+
+                if legal is None:
+                    legal = board_backend.move_is_legal(from_square, to_square)
+
+                if legal:
+                    from_column, from_row = SQUARE_COORDINATES[from_square]
+                    to_column, to_row     = SQUARE_COORDINATES[to_square]
+
+                    yield { "row": from_row, "column": from_column }, { "row": to_row, "column": to_column }
+            return
+
+        for piece in list(getattr(self, f"_{color}_pieces").values()):
+            if piece.is_in_play():
+                from_coord_dict = piece.get_coordinates()
+
+                # The destinations are collected up front as checking legality temporarily
+                # moves the piece around the board
+                for column, row in list(piece.generate_moves(self._board)):
+                    to_coord_dict = { "row": row, "column": column }
+
+                    if self.move_is_legal(piece, from_coord_dict, to_coord_dict, analysis):
+                        yield from_coord_dict, to_coord_dict
+
+    def perft(self, depth):
+        """
+        Takes a depth and returns the number of leaf positions reached by playing out every legal
+        move sequence of that many moves from the current position. Used to check move generation
+        against known counts and to measure its speed. The game is left unchanged.
+        """
+        if depth == 0:
+            return 1
+
+        moves = list(self.generate_legal_moves(self._current_turn))
+
+        # The moves at the last level only need counting
+        if depth == 1:
+            return len(moves)
+
+        nodes = 0
+
+        for from_coord_dict, to_coord_dict in moves:
+            self.apply_move(from_coord_dict, to_coord_dict)
+            nodes += self.perft(depth - 1)
+            self.pop_move()
+
+        return nodes
+
+    def divide(self, depth):
+        """
+        Takes a depth and returns a dict of every legal move from the current position, as
+        (from, to) tuples of string coordinates, to the perft count below that move. Used to
+        narrow down which move a wrong perft count comes from.
+        """
+        results = {}
+
+        for from_coord_dict, to_coord_dict in list(self.generate_legal_moves(self._current_turn)):
+            self.apply_move(from_coord_dict, to_coord_dict)
+            results[(self.format_coord(from_coord_dict), self.format_coord(to_coord_dict))] = self.perft(depth - 1)
+            self.pop_move()
+
+        return results
+
+    def move_is_legal(self, piece, from_coord_dict, to_coord_dict, analysis = None):
+        """
+        Takes a piece and a move it is already able to make according to its own movement
+        rules, and returns true if making that move would neither expose the general nor
+        leave the piece's own general in check. Takes an optional analysis of the position from
+        analyze_position, which lets most moves be accepted without simulating them.
+        """
+        if analysis is not None and not isinstance(piece, General):
+            legal = self.analysis_verdict(
+                analysis,
+                square_index(from_coord_dict['column'], from_coord_dict['row']),
+                square_index(to_coord_dict['column'], to_coord_dict['row'])
+            )
+
+            if legal is not None:
+                return legal
+
+        # The board backend simulates the move on its own compact board
+        if self._board_backend:
+            return self._board_backend.move_is_legal(
+                square_index(from_coord_dict['column'], from_coord_dict['row']),
+                square_index(to_coord_dict['column'], to_coord_dict['row'])
+            )
+
+        # Check if the move exposes the general.  If the piece being moved is a General it
+        # will check within it's own valid_move logic, otherwise check using the move_exposes_general
+        # helper method.
+        if piece.__class__.__name__ != "General" and self.move_exposes_general(from_coord_dict, to_coord_dict):
+            return False
+
+        # Return false if the move would put the moving players general in check
+        if self.move_puts_current_player_in_check(from_coord_dict, to_coord_dict):
+            return False
+
+        return True
+
+    def analysis_verdict(self, analysis, from_square, to_square):
+        """
+        Takes an analysis of the position from analyze_position and a move between two square
+        indices by a piece other than the general, and returns true if the analysis shows the
+        move is legal, false if it shows the move leaves the general in check, or None if the
+        move has to be simulated to tell
+        """
+        checkers = analysis['checkers']
+
+        # Moves that analyze_position shows cannot affect the general need no simulation
+        if not checkers:
+            if from_square not in analysis['pinned'] and to_square not in analysis['screen_squares']:
+                return True
+
+            return None
+
+        # Out of a single check, a move that neither captures the checker, blocks it nor moves
+        # the screen of a checking cannon leaves the general in check
+        if (
+            len(checkers) == 1 and from_square not in analysis['evasion_squares'] and
+            to_square not in analysis['evasion_squares']
+        ):
+            return False
+
+        return None
+
     def move_puts_current_player_in_check(self, from_coord_dict, to_coord_dict):
         """
         This method takes from and to coordinates (as dicts) and checks if the given
@@ -254,9 +1143,9 @@ class XiangqiGame:
 
         piece_to_move.set_coordinates(to_column, to_row)
 
-        # Checks if current state of the board would be a check for the current player. Sends
+        # Checks if current state of the board would be a check for the player moving. Sends
         # either a potentially captured piece or None to be ignored when checking
-        result = self.is_in_check(self._current_turn, captured_piece)
+        result = self.is_in_check(piece_to_move.get_color(), captured_piece)
 
         # Restores changes
         piece_to_move.set_coordinates(from_column, from_row)
@@ -270,6 +1159,17 @@ class XiangqiGame:
         Checks if the given move causes the two generals to face each other. Assumes that the piece
         being moved is not a general, as they have their own logic for that situation.
         """
+        # The board backend makes the move on its own board and checks there
+        if self._board_backend:
+            from_square = square_index(from_coord_dict['column'], from_coord_dict['row'])
+            to_square   = square_index(to_coord_dict['column'], to_coord_dict['row'])
+
+            captured = self._board_backend.move(from_square, to_square)
+            result   = self._board_backend.generals_facing()
+            self._board_backend.undo(from_square, to_square, captured)
+
+            return result
+
         black_general_coords = self._black_pieces['G'].get_coordinates()
         red_general_coords   = self._red_pieces['G'].get_coordinates()
 
@@ -309,6 +1209,13 @@ class XiangqiGame:
         """
         return { "row": int(coord[1:]), "column": coord[0] }
 
+    def format_coord(self, coord_dict):
+        """
+        Converts a coordinate dictionary of row and column back to a string coordinate
+        (ex 'a10'), the reverse of convert_coord
+        """
+        return coord_dict['column'] + str(coord_dict['row'])
+
     def print_board(self):
         """
         Prints the current board
@@ -326,11 +1233,152 @@ class XiangqiGame:
 
             print(current_row)
 
+    def rebuild_position_caches(self):
+        """
+        Rebuilds the board backend, position hash, repetition counts and evaluation score from the
+        nested dict board, used after the board or turn has been set up or changed by hand
+        """
+        if self._board_backend:
+            self._board_backend = self._board_backend.__class__.from_board(self._board)
+
+        self._position_hash   = hash_board(self._board, self._current_turn)
+        self._position_counts = { self._position_hash: 1 }
+        self._score           = score_board(self._board)
+
+    def load_fen(self, fen):
+        """
+        Takes a FEN string and sets up the board, the red and black pieces and the player to move
+        from it in a single pass over the placement field, raising a ValueError if it is not a
+        valid position. Move counters after the side to move field are accepted but not used.
+        """
+        fields = fen.split()
+
+        if not fields or len(fields[0].split('/')) != 10:
+            raise ValueError(f"FEN must have 10 ranks: {fen}")
+
+        if len(fields) > 1 and fields[1] not in self.FEN_TURNS:
+            raise ValueError(f"Invalid side to move: {fields[1]}")
+
+        pieces = { "red": {}, "black": {} }
+        board  = {}
+        row    = 10
+
+        # Ranks are listed from black's back rank, row 10, down to red's on row 1
+        for rank in fields[0].split('/'):
+            columns      = dict.fromkeys(COLUMNS)
+            column_index = 0
+
+            for letter in rank:
+                if letter.isdigit():
+                    column_index += int(letter)
+                    continue
+
+                piece_class = self.FEN_PIECES.get(letter.lower())
+
+                if piece_class is None or column_index >= 9:
+                    raise ValueError(f"Invalid rank {rank} in FEN: {fen}")
+
+                color = "red" if letter.isupper() else "black"
+                piece = piece_class(color, COLUMNS[column_index], row)
+                key   = self.piece_key(pieces[color], piece)
+
+                if key in pieces[color]:
+                    raise ValueError(f"FEN has more than one {color} general: {fen}")
+
+                pieces[color][key]             = piece
+                columns[COLUMNS[column_index]] = piece
+                column_index                  += 1
+
+            if column_index != 9:
+                raise ValueError(f"Invalid rank {rank} in FEN: {fen}")
+
+            board[row]  = columns
+            row        -= 1
+
+        for color in COLORS:
+            if 'G' not in pieces[color]:
+                raise ValueError(f"FEN has no {color} general: {fen}")
+
+        self._red_pieces   = pieces["red"]
+        self._black_pieces = pieces["black"]
+        self._board        = board
+        self._current_turn = self.FEN_TURNS[fields[1]] if len(fields) > 1 else "red"
+
+    def load_codes(self, codes):
+        """
+        Takes the 90 piece codes of a snapshot by square index and builds any of the board and
+        red and black pieces that are not already set from them
+        """
+        pieces = { "red": {}, "black": {} }
+        board  = { row: dict.fromkeys(COLUMNS) for row in range(1, 11) }
+
+        for square, code in enumerate(codes):
+            if code:
+                column, row = SQUARE_COORDINATES[square]
+                color       = code_color(code)
+                piece       = PIECE_KINDS[code].make_piece(column, row)
+
+                pieces[color][self.piece_key(pieces[color], piece)] = piece
+                board[row][column]                                  = piece
+
+        self.__dict__.setdefault('_board', board)
+        self.__dict__.setdefault('_red_pieces', pieces["red"])
+        self.__dict__.setdefault('_black_pieces', pieces["black"])
+
+        self._lazy_codes = None
+
+    def piece_key(self, pieces, piece):
+        """
+        Takes a dict of one colors pieces and a new piece, and returns the key to add it under,
+        matching initialize_pieces with the general alone and the rest numbered in order
+        """
+        code = str(piece)
+
+        if code == 'G':
+            return 'G'
+
+        return code + str(sum(1 for existing in pieces if existing[0] == code) + 1)
+
+    def to_fen(self):
+        """
+        Returns the current position as a FEN string, with red to move written as 'w'. Move
+        counters are not tracked and are always written as 0 1.
+        """
+        ranks = []
+
+        for row in range(10, 0, -1):
+            rank  = ""
+            empty = 0
+
+            for column in COLUMNS:
+                piece = self._board[row][column]
+
+                if not piece:
+                    empty += 1
+                    continue
+
+                if empty:
+                    rank  += str(empty)
+                    empty  = 0
+
+                letter = self.FEN_LETTERS[str(piece)]
+                rank  += letter.upper() if piece.get_color() == "red" else letter
+
+            if empty:
+                rank += str(empty)
+
+            ranks.append(rank)
+
+        side = 'w' if self._current_turn == "red" else 'b'
+
+        return f"{'/'.join(ranks)} {side} - - 0 1"
+
     def initialize_board(self):
         """
         Populates and returns a game board dict with red and black players
         """
-        board = copy.deepcopy(self.BLANK_BOARD)
+        # Built directly rather than deep copying BLANK_BOARD, which is far slower
+        board = { row: dict.fromkeys(COLUMNS) for row in range(1, 11) }
         for key, piece in self._red_pieces.items():
             coords = self.STARTING_COORDINATES['red'][key]
             piece.set_coordinates(*coords)
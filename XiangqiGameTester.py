@@ -2,9 +2,11 @@
 # Date: 03/01/2020
 # Description: Tests for the XiangqiGame class.
 
-import unittest, copy
+import unittest, copy, random
 from XiangqiGame import XiangqiGame
-from pieces import Piece, Advisor, Cannon, Chariot, Elephant, General, Horse, Soldier
+from zobrist import hash_board
+from board import square_index
+from pieces import Advisor, Cannon, Chariot, General, Horse, Soldier
 
 class XiangqiGameTester(unittest.TestCase):
     def setUp(self):
@@ -297,11 +299,503 @@ class XiangqiGameTester(unittest.TestCase):
             "RED_WON"
         )
 
+    def test_legal_moves_start(self):
+        self.assertEqual(
+            len(self.game.legal_moves()),
+            44
+        )
+
+        self.assertIn(
+            ('b3', 'e3'),
+            self.game.legal_moves('red')
+        )
+
+    def test_legal_moves_match_make_move(self):
+        self.game.make_move('h3', 'e3')
+        self.game.make_move('h8', 'e8')
+
+        expected_moves = []
+
+        for piece in self.game._red_pieces.values():
+            from_coord = self.game.format_coord(piece.get_coordinates())
+
+            for row in range(1, 11):
+                for column in 'abcdefghi':
+                    to_coord = column + str(row)
+
+                    if self.game.make_move(from_coord, to_coord, False):
+                        expected_moves.append((from_coord, to_coord))
+
+        self.assertCountEqual(
+            self.game.legal_moves('red'),
+            expected_moves
+        )
+
+    def test_legal_moves_checkmate(self):
+        self.test_black_win_checkmate_1()
+
+        self.assertEqual(
+            self.game.legal_moves('red'),
+            []
+        )
+
+    def test_push_and_pop_move(self):
+        red_cannon = self.game._board[3]['h']
+        black_horse = self.game._board[10]['h']
+
+        self.assertTrue(
+            self.game.push_move('h3', 'h10')
+        )
+
+        self.assertFalse(
+            black_horse.is_in_play()
+        )
+
+        self.assertEqual(
+            self.game.pop_move(),
+            ('h3', 'h10')
+        )
+
+        self.assertIs(self.game._board[3]['h'], red_cannon)
+        self.assertIs(self.game._board[10]['h'], black_horse)
+        self.assertTrue(black_horse.is_in_play())
+
+        self.assertEqual(
+            red_cannon.get_coordinates(),
+            { "row": 3, "column": 'h' }
+        )
+
+        self.assertEqual(
+            self.game.get_current_turn(),
+            "red"
+        )
+
+    def test_pop_move_empty(self):
+        self.assertFalse(
+            self.game.pop_move()
+        )
+
+    def test_pop_move_restores_game_state(self):
+        self.test_black_win_checkmate_1()
+
+        self.assertEqual(
+            self.game.pop_move(),
+            ('c6', 'd6')
+        )
+
+        self.assertEqual(
+            self.game.get_game_state(),
+            "UNFINISHED"
+        )
+
+        self.assertEqual(
+            self.game.get_current_turn(),
+            "black"
+        )
+
+        self.assertFalse(
+            self.game.is_in_check('red')
+        )
+
+    def test_move_history(self):
+        self.game.make_move('h3', 'e3')
+        self.game.make_move('h8', 'e8')
+        self.game.make_move('a1', 'a3', False)
+
+        self.assertEqual(
+            self.game.get_move_history(),
+            [('h3', 'e3'), ('h8', 'e8')]
+        )
+
+    def test_pop_move_compact_backend(self):
+        game = XiangqiGame(board_backend = "compact")
+        game.make_move('h3', 'h10')
+        game.pop_move()
+
+        self.assertEqual(
+            len(game.legal_moves()),
+            44
+        )
+
+    def test_position_hash_start(self):
+        self.assertEqual(
+            self.game.get_position_hash(),
+            hash_board(self.game._board, "red")
+        )
+
+    def test_position_hash_incremental(self):
+        for from_coord, to_coord in (('h3', 'h10'), ('i10', 'h10'), ('b1', 'c3'), ('a10', 'a8')):
+            self.assertTrue(self.game.make_move(from_coord, to_coord))
+
+            self.assertEqual(
+                self.game.get_position_hash(),
+                hash_board(self.game._board, self.game.get_current_turn())
+            )
+
+    def test_position_hash_pop_move(self):
+        start_hash = self.game.get_position_hash()
+
+        self.game.make_move('h3', 'h10')
+        self.game.make_move('i10', 'h10')
+
+        self.assertNotEqual(self.game.get_position_hash(), start_hash)
+
+        self.game.pop_move()
+        self.game.pop_move()
+
+        self.assertEqual(self.game.get_position_hash(), start_hash)
+
+    def test_position_hash_transposition(self):
+        other_game = XiangqiGame()
+
+        for from_coord, to_coord in (('b1', 'c3'), ('b10', 'c8'), ('h1', 'g3'), ('h10', 'g8')):
+            self.game.make_move(from_coord, to_coord)
+
+        for from_coord, to_coord in (('h1', 'g3'), ('h10', 'g8'), ('b1', 'c3'), ('b10', 'c8')):
+            other_game.make_move(from_coord, to_coord)
+
+        self.assertEqual(
+            self.game.get_position_hash(),
+            other_game.get_position_hash()
+        )
+
     def test_convert_coord(self):
         self.assertEqual(
             self.game.convert_coord('a10'),
             { "row": 10, "column": 'a' }
         )
 
+    def test_format_coord(self):
+        self.assertEqual(
+            self.game.format_coord({ "row": 10, "column": 'a' }),
+            'a10'
+        )
+
+    def test_to_fen_start(self):
+        self.assertEqual(
+            self.game.to_fen(),
+            XiangqiGame.START_FEN
+        )
+
+    def test_from_fen_start(self):
+        game = XiangqiGame.from_fen(XiangqiGame.START_FEN)
+
+        self.assertCountEqual(game.legal_moves(), self.game.legal_moves())
+        self.assertEqual(game.get_position_hash(), self.game.get_position_hash())
+        self.assertCountEqual(game._red_pieces.keys(), self.game._red_pieces.keys())
+
+    def test_fen_round_trip_after_moves(self):
+        self.game.make_move('h3', 'e3')
+        self.game.make_move('h10', 'g8')
+
+        game = XiangqiGame.from_fen(self.game.to_fen(), board_backend = "compact")
+
+        self.assertEqual(game.to_fen(), self.game.to_fen())
+        self.assertEqual(game.get_current_turn(), "red")
+        self.assertEqual(game.get_position_hash(), self.game.get_position_hash())
+        self.assertCountEqual(game.legal_moves(), self.game.legal_moves())
+
+    def test_from_fen_black_to_move(self):
+        game = XiangqiGame.from_fen("4k4/9/9/9/9/9/9/9/4A4/3K5 b - - 0 1")
+
+        self.assertEqual(game.get_current_turn(), "black")
+        self.assertEqual(game.to_fen(), "4k4/9/9/9/9/9/9/9/4A4/3K5 b - - 0 1")
+        self.assertIs(game.get_piece({ "row": 2, "column": 'e' }), game._red_pieces['A1'])
+
+    def test_from_fen_checkmate(self):
+        # Same position as test_black_win_checkmate_1 after c6 d6
+        game = XiangqiGame.from_fen("9/9/4k4/9/3r5/9/9/9/9/3K5 w")
+
+        self.assertEqual(
+            game.get_game_state(),
+            "BLACK_WON"
+        )
+
+    def test_from_fen_invalid(self):
+        for fen in (
+            "",
+            "4k4/9/9/9/9/9/9/9/3K5 w",
+            "4k4/9/9/9/9/9/9/9/9/3K4 w",
+            "4k4/9/9/9/9/9/9/9/9/3K6 w",
+            "4k4/9/9/9/9/9/9/9/9/3X5 w",
+            "4k4/9/9/9/9/9/9/9/9/9 w",
+            "4k4/9/9/9/9/9/9/9/9/3KK4 w",
+            "4k4/9/9/9/9/9/9/9/9/3K5 x",
+        ):
+            with self.assertRaises(ValueError):
+                XiangqiGame.from_fen(fen)
+
+    def test_lazy_game_state_checkmate(self):
+        game = XiangqiGame.from_fen("4k4/9/9/9/9/9/9/9/R8/1R1K5 w", lazy_game_state = True)
+
+        for from_coord, to_coord in (('a2', 'a9'), ('e10', 'f10'), ('b1', 'b10')):
+            self.assertTrue(game.make_move(from_coord, to_coord))
+
+        # The checkmate is not found until the state is asked for, and no move can be made
+        self.assertIsNone(game._game_state)
+        self.assertFalse(game.make_move('f10', 'f9'))
+        self.assertEqual(game.get_game_state(), "RED_WON")
+
+        # Taking the move back restores the pending state, which listing the moves settles
+        game.pop_move()
+
+        self.assertIsNone(game._game_state)
+        self.assertIn(('b1', 'b10'), game.legal_moves())
+        self.assertEqual(game._game_state, "UNFINISHED")
+
+    def test_lazy_game_state_matches_eager(self):
+        generator = random.Random(11)
+        lazy_game = XiangqiGame(lazy_game_state = True)
+
+        for _ply in range(150):
+            if self.game.get_game_state() != "UNFINISHED":
+                break
+
+            from_coord, to_coord = generator.choice(self.game.legal_moves())
+
+            self.assertTrue(self.game.make_move(from_coord, to_coord))
+            self.assertTrue(lazy_game.make_move(from_coord, to_coord))
+            self.assertEqual(lazy_game.get_game_state(), self.game.get_game_state())
+
+    def play_moves(self, game, moves):
+        for from_coord, to_coord in moves:
+            self.assertTrue(game.make_move(from_coord, to_coord), from_coord + to_coord)
+
+    def test_repetition_draw(self):
+        game        = XiangqiGame(repetition_rules = True)
+        horse_moves = [('b1', 'c3'), ('b10', 'c8'), ('c3', 'b1'), ('c8', 'b10')]
+
+        self.play_moves(game, horse_moves)
+
+        self.assertEqual(game.get_repetition_count(), 2)
+        self.assertEqual(game.get_game_state(), "UNFINISHED")
+
+        self.play_moves(game, horse_moves)
+
+        self.assertEqual(game.get_repetition_count(), 3)
+        self.assertEqual(game.get_game_state(), "DRAW")
+        self.assertFalse(game.make_move('b1', 'c3'))
+
+        # Taking a move back lowers the count and restores the game
+        game.pop_move()
+
+        self.assertEqual(game.get_game_state(), "UNFINISHED")
+        self.assertEqual(game.get_repetition_count(), 2)
+
+    def test_repetition_rules_off_by_default(self):
+        game = XiangqiGame()
+
+        self.play_moves(game, [('b1', 'c3'), ('b10', 'c8'), ('c3', 'b1'), ('c8', 'b10')] * 3)
+
+        self.assertEqual(game.get_repetition_count(), 4)
+        self.assertEqual(game.get_game_state(), "UNFINISHED")
+
+    def test_perpetual_check_loses(self):
+        game = XiangqiGame.from_fen("4k4/9/R8/9/9/9/9/9/9/3K5 w", repetition_rules = True)
+
+        self.play_moves(game, [('a8', 'a10')])
+        self.play_moves(game, [('e10', 'e9'), ('a10', 'a9'), ('e9', 'e10'), ('a9', 'a10')] * 2)
+
+        self.assertEqual(game.get_repetition_count(), 3)
+        self.assertEqual(game.get_game_state(), "BLACK_WON")
+
+    def test_perpetual_chase_loses(self):
+        # The red chariot follows the unprotected black cannon up and down the board
+        game = XiangqiGame.from_fen("4k4/9/9/9/R8/2c6/9/9/9/3K5 w", repetition_rules = True)
+
+        self.play_moves(game, [('a6', 'a5'), ('c5', 'c6'), ('a5', 'a6'), ('c6', 'c5')] * 2)
+
+        self.assertEqual(game.get_game_state(), "BLACK_WON")
+
+    def test_protected_piece_is_not_chased(self):
+        # The black chariot on d10 protects the cannon on the d file
+        game = XiangqiGame.from_fen("3rk4/9/9/9/R8/3c5/9/9/9/5K3 w", repetition_rules = True)
+
+        self.play_moves(game, [('a6', 'a5'), ('d5', 'd6'), ('a5', 'a6'), ('d6', 'd5')] * 2)
+
+        self.assertEqual(game.get_game_state(), "DRAW")
+
+    def test_validate_moves_reasons(self):
+        self.game.make_move('h3', 'e3')
+        self.game.make_move('h8', 'e8')
+
+        self.assertEqual(
+            self.game.validate_moves([
+                ('b3', 'b10'),
+                ('z1', 'a1'),
+                ('a5', 'a6'),
+                ('a10', 'a9'),
+                ('a1', 'a5'),
+                ('e4', 'e5'),
+            ]),
+            [
+                "LEGAL",
+                "INVALID_COORDINATE",
+                "NO_PIECE",
+                "WRONG_COLOR",
+                "INVALID_PIECE_MOVE",
+                "LEGAL",
+            ]
+        )
+
+    def test_validate_moves_unhashable_coordinates(self):
+        self.assertEqual(
+            self.game.validate_moves([(['a', 1], 'a2'), ('a4', {'row': 5}), (None, 'a5'), ('a4', 'a5')]),
+            ["INVALID_COORDINATE", "INVALID_COORDINATE", "INVALID_COORDINATE", "LEGAL"]
+        )
+
+    def test_validate_moves_pinned_chariot(self):
+        game = XiangqiGame.from_fen("3k5/9/9/9/4r4/9/9/9/4R4/4K4 w")
+
+        # The red chariot on e2 is the only piece between the black chariot and the red general
+        self.assertEqual(
+            game.validate_moves([('e2', 'd2'), ('e2', 'e5'), ('e2', 'e6')]),
+            ["LEAVES_GENERAL_IN_CHECK", "LEGAL", "LEGAL"]
+        )
+
+    def test_validate_moves_exposes_general(self):
+        self.test_move_exposes_general()
+
+        self.assertEqual(
+            self.game.validate_moves([('e7', 'd7'), ('e7', 'e8')]),
+            ["EXPOSES_GENERAL", "LEGAL"]
+        )
+
+    def test_validate_moves_game_over(self):
+        self.test_black_win_checkmate_1()
+
+        self.assertEqual(
+            self.game.validate_moves([('d1', 'e1')], with_reasons = False),
+            [False]
+        )
+
+    def test_validate_moves_matches_make_move(self):
+        self.game.make_move('h3', 'e3')
+        self.game.make_move('h8', 'e8')
+
+        moves = [
+            (from_coord + str(from_row), to_coord + str(to_row))
+            for from_coord in 'abcdefghi' for from_row in (1, 3, 4)
+            for to_coord in 'abcdefghi' for to_row in (1, 2, 3, 5)
+        ]
+
+        self.assertEqual(
+            self.game.validate_moves(moves, with_reasons = False),
+            [self.game.make_move(from_coord, to_coord, False) for from_coord, to_coord in moves]
+        )
+
+    def test_analyze_position_start(self):
+        analysis = self.game.analyze_position('red')
+
+        # The black cannon on e8 would need one more screen between itself and the red general
+        self.assertEqual(analysis['general'], 4)
+        self.assertEqual(analysis['checkers'], [])
+        self.assertEqual(analysis['pinned'], set())
+        self.assertEqual(analysis['screen_squares'], set())
+
+    def test_analyze_position_cannon_pin(self):
+        game     = XiangqiGame.from_fen("3k5/9/9/4c4/9/9/9/4N4/4R4/4K4 w")
+        analysis = game.analyze_position('red')
+
+        # Both pieces between the black cannon and the red general are pinned
+        self.assertEqual(analysis['pinned'], { square_index('e', 2), square_index('e', 3) })
+        self.assertFalse(game.make_move('e3', 'c4'))
+        self.assertFalse(game.make_move('e2', 'd2'))
+
+    def test_analyze_position_cannon_screen_squares(self):
+        game     = XiangqiGame.from_fen("3k5/9/9/4c4/9/9/9/R8/9/4K4 w")
+        analysis = game.analyze_position('red')
+
+        self.assertEqual(analysis['checkers'], [])
+        self.assertEqual(
+            analysis['screen_squares'],
+            { square_index('e', row) for row in range(2, 7) }
+        )
+        self.assertFalse(game.make_move('a3', 'e3'))
+        self.assertTrue(game.make_move('a3', 'a4'))
+
+    def test_analyze_position_horse_leg(self):
+        game     = XiangqiGame.from_fen("4k4/9/9/9/9/9/9/3n5/3R5/5K3 w")
+        analysis = game.analyze_position('red')
+
+        self.assertEqual(analysis['pinned'], set())
+
+        game     = XiangqiGame.from_fen("5k3/9/9/9/9/9/9/3n5/3R5/4K4 w")
+        analysis = game.analyze_position('red')
+
+        # The red chariot on d2 blocks the leg of the black horse on d3
+        self.assertEqual(analysis['pinned'], { square_index('d', 2) })
+        self.assertFalse(game.make_move('d2', 'c2'))
+        self.assertTrue(game.make_move('d2', 'd3'))
+
+    def test_analyze_position_flying_general(self):
+        game     = XiangqiGame.from_fen("4k4/9/9/9/9/9/9/9/4R4/4K4 w")
+        analysis = game.analyze_position('red')
+
+        self.assertEqual(analysis['pinned'], { square_index('e', 2) })
+        self.assertFalse(game.make_move('e2', 'd2'))
+        self.assertTrue(game.make_move('e2', 'e9'))
+
+    def test_analyze_position_check_evasion(self):
+        game     = XiangqiGame.from_fen("3k5/9/9/9/4r4/9/9/9/R8/4K4 w")
+        analysis = game.analyze_position('red')
+
+        self.assertEqual(analysis['checkers'], [square_index('e', 6)])
+        self.assertEqual(
+            analysis['evasion_squares'],
+            { square_index('e', row) for row in range(2, 7) }
+        )
+        self.assertEqual(
+            game.validate_moves([('a2', 'a5'), ('a2', 'e2'), ('e1', 'f1')]),
+            ["LEAVES_GENERAL_IN_CHECK", "LEGAL", "LEGAL"]
+        )
+
+    def test_legal_moves_match_simulation(self):
+        # Every move accepted or rejected using the analysis matches simulating it
+        game = XiangqiGame.from_fen("1C2ka3/9/C1Nab1n2/p3p3p/6p2/9/P3P3P/3AB4/3p2c2/c1BAK4 w")
+
+        for color in ('red', 'black'):
+            analysis = game.analyze_position(color)
+
+            for piece in game.get_pieces(color):
+                from_coord_dict = piece.get_coordinates()
+
+                for column, row in list(piece.generate_moves(game._board)):
+                    to_coord_dict = { "row": row, "column": column }
+
+                    self.assertEqual(
+                        game.move_is_legal(piece, from_coord_dict, to_coord_dict, analysis),
+                        game.move_is_legal(piece, from_coord_dict, to_coord_dict)
+                    )
+
+    def test_backend_moves_use_analysis(self):
+        fen = "1C2ka3/9/C1Nab1n2/p3p3p/6p2/9/P3P3P/3AB4/3p2c2/c1BAK4 w"
+
+        for board_backend in ("compact", "attack_map", "bitboard"):
+            game = XiangqiGame.from_fen(fen, board_backend)
+
+            for color in ('red', 'black'):
+                self.assertCountEqual(
+                    list(game._board_backend.generate_legal_moves(color)),
+                    [
+                        (square_index(from_coord['column'], from_coord['row']), square_index(to_coord['column'], to_coord['row']))
+                        for from_coord, to_coord in game.generate_legal_moves(color)
+                    ]
+                )
+
+            # From the start only the general's one move has to be simulated
+            game      = XiangqiGame(board_backend = board_backend)
+            simulated = []
+            is_legal  = game._board_backend.move_is_legal
+
+            def counted_move_is_legal(from_square, to_square, is_legal = is_legal):
+                simulated.append((from_square, to_square))
+                return is_legal(from_square, to_square)
+
+            game._board_backend.move_is_legal = counted_move_is_legal
+
+            self.assertEqual(len(game.legal_moves()), 44)
+            self.assertEqual(simulated, [(square_index('e', 1), square_index('e', 2))])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,287 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Compact binary archive of xiangqi games.  Each move is stored as two bytes, the from
+#              and to square indices, with an index of game offsets at the end of the file.  The
+#              archive is read through mmap so any game can be found and replayed without reading
+#              or parsing the rest of the file.
+#
+# Usage: python archive.py pack games.pgn games.xqa
+#        python archive.py show games.xqa GAME_NUMBER
+
+import argparse, mmap, struct, sys
+from array import array
+from XiangqiGame import XiangqiGame
+from board import SQUARE_NAMES
+from records import RESULT_STATES, read_games, record_moves
+
+# File Layout #
+###############
+# header     -> magic b'XQAR', version (u16), reserved (u16), game count (u64), index offset (u64)
+# games      -> for each game: move count (u32), result code (u8), FEN length (u8), the FEN as
+#               ascii if it has one, then two bytes per move (from square, to square)
+# index      -> the offset of each game (u64 each), in game order
+#
+# All numbers are little endian.
+ARCHIVE_MAGIC   = b'XQAR'
+ARCHIVE_VERSION = 1
+HEADER_FORMAT   = struct.Struct('<4sHHQQ')
+GAME_FORMAT     = struct.Struct('<IBB')
+INDEX_FORMAT    = struct.Struct('<Q')
+
+# Constant of the result codes stored for each game, None for a game with no recorded result
+RESULT_CODES = {
+    None: 0,
+    "RED_WON": 1,
+    "BLACK_WON": 2,
+    "DRAW": 3,
+    "MOVE_LIMIT": 4
+}
+CODE_RESULTS = { code: result for result, code in RESULT_CODES.items() }
+
+# Constant of the square index of each square name (ex 'a1' -> 0)
+SQUARE_NUMBERS = { name: square for square, name in enumerate(SQUARE_NAMES) }
+
+class ArchiveWriter:
+    """
+    Writes games to a new archive file one at a time, so an archive of any size can be written
+    without holding the games in memory. Use as a context manager or call close when done, which
+    writes the index.
+    """
+    def __init__(self, path):
+        """
+        Initialization method that takes the path of the archive to create, replacing any file
+        already there
+        """
+        self._file    = open(path, "wb")
+        self._offsets = array('Q')
+
+        # The header is written again with the game count and index offset on close
+        self._file.write(HEADER_FORMAT.pack(ARCHIVE_MAGIC, ARCHIVE_VERSION, 0, 0, 0))
+
+    def __enter__(self):
+        """
+        Returns the writer for use in a with statement
+        """
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        """
+        Closes the writer at the end of a with statement
+        """
+        self.close()
+
+    def add_game(self, moves, result = None, fen = None):
+        """
+        Takes a list of moves as (from, to) tuples of string coordinates (ex ('h3', 'e3')), an
+        optional result from RESULT_CODES and an optional starting FEN, and appends the game.
+        Returns the games number in the archive.
+        """
+        fen_bytes = fen.encode("ascii") if fen else b''
+
+        if len(fen_bytes) > 255:
+            raise ValueError("FEN is too long to store")
+
+        move_bytes = bytearray(len(moves) * 2)
+
+        for move_index, (from_coord, to_coord) in enumerate(moves):
+            move_bytes[move_index * 2]     = SQUARE_NUMBERS[from_coord]
+            move_bytes[move_index * 2 + 1] = SQUARE_NUMBERS[to_coord]
+
+        self._offsets.append(self._file.tell())
+        self._file.write(GAME_FORMAT.pack(len(moves), RESULT_CODES[result], len(fen_bytes)))
+        self._file.write(fen_bytes)
+        self._file.write(move_bytes)
+
+        return len(self._offsets) - 1
+
+    def close(self):
+        """
+        Writes the index and final header and closes the file
+        """
+        if self._file.closed:
+            return
+
+        index_offset = self._file.tell()
+
+        if sys.byteorder != "little":
+            self._offsets.byteswap()
+
+        self._offsets.tofile(self._file)
+
+        self._file.seek(0)
+        self._file.write(HEADER_FORMAT.pack(
+            ARCHIVE_MAGIC, ARCHIVE_VERSION, 0, len(self._offsets), index_offset
+        ))
+        self._file.close()
+
+class ArchiveReader:
+    """
+    Reads an archive through mmap. Games are found through the index and their moves are
+    returned as memoryview slices of the mapped file, so reading a game copies nothing.
+    """
+    def __init__(self, path):
+        """
+        Initialization method that takes the path of the archive, raising a ValueError if it is
+        not an archive
+        """
+        with open(path, "rb") as archive_file:
+            self._map = mmap.mmap(archive_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        self._view = memoryview(self._map)
+
+        magic, version, _reserved, game_count, index_offset = HEADER_FORMAT.unpack_from(self._map)
+
+        if magic != ARCHIVE_MAGIC or version != ARCHIVE_VERSION:
+            self.close()
+            raise ValueError(f"Not a version {ARCHIVE_VERSION} game archive: {path}")
+
+        self._game_count   = game_count
+        self._index_offset = index_offset
+
+    def __enter__(self):
+        """
+        Returns the reader for use in a with statement
+        """
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        """
+        Closes the reader at the end of a with statement
+        """
+        self.close()
+
+    def __len__(self):
+        """
+        Returns the number of games in the archive
+        """
+        return self._game_count
+
+    def close(self):
+        """
+        Releases the views of the mapped file and closes it
+        """
+        self._view.release()
+        self._map.close()
+
+    def get_game_header(self, game_number):
+        """
+        Takes a game number and returns a tuple of the offset of its moves, its move count, its
+        result and its starting FEN (None for the starting position)
+        """
+        if not 0 <= game_number < self._game_count:
+            raise IndexError(f"No game {game_number} in an archive of {self._game_count}")
+
+        offset                           = INDEX_FORMAT.unpack_from(self._map, self._index_offset + game_number * 8)[0]
+        move_count, result_code, fen_len = GAME_FORMAT.unpack_from(self._map, offset)
+        fen_offset                       = offset + GAME_FORMAT.size
+        fen                              = bytes(self._view[fen_offset:fen_offset + fen_len]).decode("ascii") or None
+
+        return fen_offset + fen_len, move_count, CODE_RESULTS[result_code], fen
+
+    def get_move_bytes(self, game_number):
+        """
+        Takes a game number and returns its moves as a memoryview of the mapped file, two bytes
+        per move of the from and to square indices. The view must be released before the reader
+        is closed.
+        """
+        moves_offset, move_count, _result, _fen = self.get_game_header(game_number)
+
+        return self._view[moves_offset:moves_offset + move_count * 2]
+
+    def get_result(self, game_number):
+        """
+        Takes a game number and returns its recorded result
+        """
+        return self.get_game_header(game_number)[2]
+
+    def get_moves(self, game_number):
+        """
+        Takes a game number and returns its moves as a list of (from, to) tuples of string
+        coordinates
+        """
+        move_bytes = self.get_move_bytes(game_number)
+        moves      = [
+            (SQUARE_NAMES[move_bytes[move_index]], SQUARE_NAMES[move_bytes[move_index + 1]])
+            for move_index in range(0, len(move_bytes), 2)
+        ]
+
+        move_bytes.release()
+
+        return moves
+
+    def replay(self, game_number, board_backend = "dict"):
+        """
+        Takes a game number and returns a new game with its moves played, raising a ValueError
+        if any move is illegal. The game is in lazy game state mode, so the checkmate check only
+        runs if its state is asked for.
+        """
+        _moves_offset, _move_count, _result, fen = self.get_game_header(game_number)
+
+        game = XiangqiGame(board_backend = board_backend, fen = fen, lazy_game_state = True)
+
+        for from_coord, to_coord in self.get_moves(game_number):
+            if not game.make_move(from_coord, to_coord):
+                raise ValueError(f"Illegal move {from_coord}{to_coord} in game {game_number}")
+
+        return game
+
+def pack_records(source, path, notation = "auto"):
+    """
+    Takes a file path or iterable of lines of PGN style game records and writes every game that
+    replays without an illegal move to a new archive at path, with the result from the record's
+    result token or else the game state its replay reached. Games with an illegal move or a FEN
+    too long to store are skipped. Returns a tuple of the number of games written and skipped.
+    """
+    written = 0
+    skipped = 0
+
+    with ArchiveWriter(path) as writer:
+        for record in read_games(source):
+            moves, game_state, illegal_move = record_moves(record, notation)
+
+            if illegal_move:
+                skipped += 1
+                continue
+
+            # Most games end by resignation or agreement, so the result token is used before the
+            # state the replay reached
+            result = RESULT_STATES.get(record['result'], game_state if game_state != "UNFINISHED" else None)
+
+            # add_game checks the FEN before writing anything, so a game it refuses leaves no trace
+            try:
+                writer.add_game(moves, result, record['tags'].get('FEN'))
+            except ValueError:
+                skipped += 1
+                continue
+
+            written += 1
+
+    return written, skipped
+
+def main(arguments = None):
+    """
+    Command line entry point, returns the exit status
+    """
+    parser      = argparse.ArgumentParser(description = "Pack and read binary xiangqi game archives.")
+    subparsers  = parser.add_subparsers(dest = "command", required = True)
+    pack_parser = subparsers.add_parser("pack", help = "pack PGN style records into an archive")
+    pack_parser.add_argument("source", help = "file of PGN style game records")
+    pack_parser.add_argument("path", help = "archive to write")
+    show_parser = subparsers.add_parser("show", help = "print the moves of one game")
+    show_parser.add_argument("path", help = "archive to read")
+    show_parser.add_argument("game_number", type = int, help = "game to print, counting from 0")
+    options = parser.parse_args(arguments)
+
+    if options.command == "pack":
+        written, skipped = pack_records(options.source, options.path)
+        print(f"{written} games written, {skipped} skipped")
+        return 0
+
+    with ArchiveReader(options.path) as reader:
+        print(" ".join(from_coord + to_coord for from_coord, to_coord in reader.get_moves(options.game_number)))
+        print(reader.get_result(options.game_number) or "no result")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for the binary game archive.
+
+import unittest, contextlib, io, os, tempfile
+from XiangqiGame import XiangqiGame
+from archive import ArchiveWriter, ArchiveReader, pack_records, main
+from selfplay import play_game
+from records import parse_move
+from board import square_index
+from records_tester import RECORDS
+
+class ArchiveTester(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path      = os.path.join(self.directory.name, "games.xqa")
+        self.games     = [play_game(seed, max_moves = 50) for seed in range(5)]
+
+        with ArchiveWriter(self.path) as writer:
+            for game in self.games:
+                writer.add_game([parse_move(move) for move in game['moves']], game['result'])
+
+            writer.add_game([('e1', 'd1')], None, "5k3/9/9/9/4r4/9/9/9/9/4K4 w")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read_moves(self):
+        with ArchiveReader(self.path) as reader:
+            self.assertEqual(len(reader), 6)
+
+            for game_number, game in enumerate(self.games):
+                self.assertEqual(
+                    [from_coord + to_coord for from_coord, to_coord in reader.get_moves(game_number)],
+                    game['moves']
+                )
+                self.assertEqual(reader.get_result(game_number), game['result'])
+
+    def test_two_bytes_per_move(self):
+        with ArchiveReader(self.path) as reader:
+            move_bytes = reader.get_move_bytes(5)
+
+            self.assertIsInstance(move_bytes, memoryview)
+            self.assertEqual(bytes(move_bytes), bytes((square_index('e', 1), square_index('d', 1))))
+
+            move_bytes.release()
+
+    def test_replay(self):
+        with ArchiveReader(self.path) as reader:
+            game = reader.replay(4, "compact")
+
+            expected_game = XiangqiGame()
+
+            for move in self.games[4]['moves']:
+                expected_game.make_move(*parse_move(move))
+
+            self.assertEqual(game.to_fen(), expected_game.to_fen())
+
+            # The last game starts from its FEN
+            self.assertEqual(reader.replay(5).get_piece({ "row": 1, "column": 'd' }).__class__.__name__, "General")
+
+    def test_replay_illegal_move(self):
+        with ArchiveWriter(self.path) as writer:
+            writer.add_game([('a1', 'a5')])
+
+        with ArchiveReader(self.path) as reader:
+            with self.assertRaises(ValueError):
+                reader.replay(0)
+
+    def test_bad_game_number(self):
+        with ArchiveReader(self.path) as reader:
+            with self.assertRaises(IndexError):
+                reader.get_moves(6)
+
+    def test_not_an_archive(self):
+        with open(self.path, "wb") as archive_file:
+            archive_file.write(b'\0' * 64)
+
+        with self.assertRaises(ValueError):
+            ArchiveReader(self.path)
+
+    def test_pack_records(self):
+        self.assertEqual(pack_records(io.StringIO(RECORDS), self.path), (2, 1))
+
+        with ArchiveReader(self.path) as reader:
+            self.assertEqual(reader.get_moves(1)[0], ('h3', 'e3'))
+
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(main(["show", self.path, "0"]), 0)
+
+        self.assertTrue(output.getvalue().startswith("h3e3 h10g8"))
+
+    def test_pack_record_results(self):
+        records = "1. h2e2 h9g7 1-0\n\n1. h2e2 h9g7 0-1\n\n1. h2e2 1/2-1/2\n\n1. h2e2 *\n"
+
+        self.assertEqual(pack_records(io.StringIO(records), self.path), (4, 0))
+
+        with ArchiveReader(self.path) as reader:
+            self.assertEqual(
+                [reader.get_result(game_number) for game_number in range(4)],
+                ["RED_WON", "BLACK_WON", "DRAW", None]
+            )
+
+    def test_pack_long_fen(self):
+        # The FEN tag is padded past the 255 bytes a game header can hold, but still loads
+        records = f'[FEN "4k4/9/9/9/9/9/9/9/R8/1R1K5 w{" " * 300}"]\n1. a1a2 *\n\n1. h2e2 h9g7 1-0\n'
+
+        self.assertEqual(pack_records(io.StringIO(records), self.path), (1, 1))
+
+        with ArchiveReader(self.path) as reader:
+            self.assertEqual(len(reader), 1)
+            self.assertEqual(reader.get_moves(0), [('h3', 'e3'), ('h10', 'g8')])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,382 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Vectorized evaluation of many xiangqi positions at once with NumPy.  Positions are
+#              an (N, 10, 9) int8 array of the piece codes from board.py, indexed by row (row 1
+#              first) and column (a first), so position[row - 1][column] holds the square's code.
+#              Check flags, material counts and legal moves are worked out for every position
+#              together with table lookups instead of one XiangqiGame at a time.  NumPy is
+#              optional for the rest of the package and only needed here.
+
+from board import (
+    COLOR_INDEX, RAYS, HORSE_MOVES, HORSE_ATTACKERS, ELEPHANT_MOVES, ADVISOR_MOVES, GENERAL_MOVES,
+    SOLDIER_MOVES, GENERAL, ADVISOR, ELEPHANT, HORSE, CHARIOT, CANNON, SOLDIER, BLACK_FLAG, TYPE_MASK
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Square index of the always empty square added to the end of every flattened position, which
+# pads the lookup tables out to a fixed width
+PAD_SQUARE = 90
+
+# Positions handled together by default when generating legal moves, which bounds the memory
+# used by the intermediate arrays to tens of megabytes
+DEFAULT_CHUNK_SIZE = 1024
+
+def require_numpy():
+    """
+    Raises an ImportError if NumPy is not installed
+    """
+    if np is None:
+        raise ImportError("The batch module needs NumPy, install it with pip install numpy")
+
+def _build_tables():
+    """
+    Builds the NumPy lookup tables from the board.py tables. Returns a dict of the ray table
+    (square, direction, step), the horse attacker table (square, attacker, (horse, leg)), the
+    soldier attacker table (attacking color index, square, attacker), and for each color index
+    the candidate moves of every piece type from every square, along with boolean tables of the
+    squares along the rows and columns of each square and of the horse legs around it. The candidate moves are arrays
+    of from squares, to squares, a cannon flag and the squares between that are counted (padded
+    to 8), sorted by piece type and from square so the moves of a piece are found by the start
+    and length tables indexed by (piece type, square).
+    """
+    ray_table = np.full((90, 4, 9), PAD_SQUARE, dtype = np.intp)
+
+    for square in range(90):
+        for direction, ray in enumerate(RAYS[square]):
+            ray_table[square, direction, :len(ray)] = ray
+
+    horse_attack_table = np.full((90, 8, 2), PAD_SQUARE, dtype = np.intp)
+
+    for square in range(90):
+        for attacker, (horse_square, leg) in enumerate(HORSE_ATTACKERS[square]):
+            horse_attack_table[square, attacker] = (horse_square, leg)
+
+    # The squares along the rows and columns of each square, and the legs of the horses that
+    # could attack it, which are the only squares a move can open or screen an attack through
+    line_squares = np.zeros((90, 91), dtype = bool)
+    leg_squares  = np.zeros((90, 91), dtype = bool)
+
+    for square in range(90):
+        line_squares[square, ray_table[square].ravel()] = True
+        leg_squares[square, horse_attack_table[square, :, 1]] = True
+
+    line_squares[:, PAD_SQUARE] = False
+    leg_squares[:, PAD_SQUARE]  = False
+
+    # Reverse the soldier moves to find the squares a soldier of each color attacks from
+    soldier_attack_table = np.full((2, 90, 3), PAD_SQUARE, dtype = np.intp)
+    soldier_attackers    = [[[] for _square in range(90)] for _color_index in (0, 1)]
+
+    for color_index in (0, 1):
+        for square in range(90):
+            for target in SOLDIER_MOVES[color_index][square]:
+                soldier_attackers[color_index][target].append(square)
+
+        for square in range(90):
+            attackers = soldier_attackers[color_index][square]
+            soldier_attack_table[color_index, square, :len(attackers)] = attackers
+
+    move_tables = []
+
+    for color_index in (0, 1):
+
+        moves   = []
+        starts  = np.zeros((8, 90), dtype = np.intp)
+        lengths = np.zeros((8, 90), dtype = np.intp)
+
+        for piece_type in range(GENERAL, SOLDIER + 1):
+            for square in range(90):
+                # Moves as (destination, squares between that must be counted)
+                if piece_type in (CHARIOT, CANNON):
+                    targets = [(target, ray[:step]) for ray in RAYS[square] for step, target in enumerate(ray)]
+                elif piece_type == HORSE:
+                    targets = [(target, (leg,)) for target, leg in HORSE_MOVES[square]]
+                elif piece_type == ELEPHANT:
+                    targets = [(target, (eye,)) for target, eye in ELEPHANT_MOVES[color_index][square]]
+                else:
+                    table   = { ADVISOR: ADVISOR_MOVES, GENERAL: GENERAL_MOVES, SOLDIER: SOLDIER_MOVES }[piece_type]
+                    targets = [(target, ()) for target in table[color_index][square]]
+
+                starts[piece_type, square]  = len(moves)
+                lengths[piece_type, square] = len(targets)
+
+                for target, squares in targets:
+                    moves.append((square, target, piece_type == CANNON, tuple(squares) + (PAD_SQUARE,) * (8 - len(squares))))
+
+        move_tables.append({
+            "from": np.array([move[0] for move in moves], dtype = np.intp),
+            "to": np.array([move[1] for move in moves], dtype = np.intp),
+            "is_cannon": np.array([move[2] for move in moves], dtype = bool),
+            "between": np.array([move[3] for move in moves], dtype = np.intp),
+            "starts": starts,
+            "lengths": lengths
+        })
+
+    return {
+        "rays": ray_table,
+        "horse_attackers": horse_attack_table,
+        "soldier_attackers": soldier_attack_table,
+        "line_squares": line_squares,
+        "leg_squares": leg_squares,
+        "moves": move_tables
+    }
+
+TABLES = _build_tables() if np is not None else None
+
+def flatten_positions(positions):
+    """
+    Takes an (N, 10, 9) array of piece codes and returns it as an (N, 91) int8 array of squares
+    with the empty pad square on the end, raising a ValueError if the shape is wrong or any
+    position does not have exactly one general of each color
+    """
+    require_numpy()
+
+    positions = np.asarray(positions, dtype = np.int8)
+
+    if positions.ndim != 3 or positions.shape[1:] != (10, 9):
+        raise ValueError(f"Positions must have shape (N, 10, 9), not {positions.shape}")
+
+    boards = np.zeros((positions.shape[0], 91), dtype = np.int8)
+    boards[:, :90] = positions.reshape(-1, 90)
+
+    for general_code in (GENERAL, GENERAL | BLACK_FLAG):
+        if not ((boards == general_code).sum(axis = 1) == 1).all():
+            raise ValueError("Every position needs exactly one general of each color")
+
+    return boards
+
+def color_indices(colors, count):
+    """
+    Takes None (red for every position), a color string for every position, or a sequence of
+    color indices (0 red, 1 black) or color strings, and returns an array of count color indices
+    """
+    if colors is None:
+        colors = "red"
+
+    if isinstance(colors, str):
+        return np.full(count, COLOR_INDEX[colors], dtype = np.intp)
+
+    colors = [COLOR_INDEX[color] if isinstance(color, str) else color for color in colors]
+    colors = np.asarray(colors, dtype = np.intp)
+
+    if colors.shape != (count,) or not np.isin(colors, (0, 1)).all():
+        raise ValueError("Colors must give a color index of 0 or 1 for every position")
+
+    return colors
+
+def encode_games(games):
+    """
+    Takes an iterable of XiangqiGame objects and returns a tuple of their positions as an
+    (N, 10, 9) int8 array and the color index of the player to move in each
+    """
+    require_numpy()
+
+    codes  = []
+    colors = []
+
+    for game in games:
+        snapshot = game.snapshot()
+
+        codes.append(np.frombuffer(snapshot.get_codes(), dtype = np.int8))
+        colors.append(COLOR_INDEX[snapshot.get_current_turn()])
+
+    if not codes:
+        return np.zeros((0, 10, 9), dtype = np.int8), np.zeros(0, dtype = np.intp)
+
+    return np.stack(codes).reshape(-1, 10, 9), np.array(colors, dtype = np.intp)
+
+def general_attacks(boards, colors):
+    """
+    Takes flattened boards and the color index of the general to look at on each, and returns a
+    tuple of boolean arrays: whether the general is attacked as XiangqiGame.is_in_check sees it,
+    and whether it faces the other general along its column with nothing between
+    """
+    count       = boards.shape[0]
+    rows        = np.arange(count)
+    enemy_flags = ((1 - colors) * BLACK_FLAG).astype(np.int8)
+    generals    = np.argmax(boards[:, :90] == (GENERAL + colors * BLACK_FLAG)[:, None], axis = 1)
+
+    # The first and second piece along each ray, 0 where there is none
+    ray_codes   = boards[rows[:, None, None], TABLES['rays'][generals]]
+    occupied    = ray_codes != 0
+    seen        = np.cumsum(occupied, axis = 2)
+    first_code  = np.where(occupied & (seen == 1), ray_codes, 0).sum(axis = 2)
+    second_code = np.where(occupied & (seen == 2), ray_codes, 0).sum(axis = 2)
+    enemy_flags = enemy_flags[:, None]
+
+    # Chariots are the first piece found along a row or column and cannons the second
+    attacked  = (first_code == (CHARIOT | enemy_flags)).any(axis = 1)
+    attacked |= (second_code == (CANNON | enemy_flags)).any(axis = 1)
+
+    # Horses attack through the square next to themselves
+    horse_table  = TABLES['horse_attackers'][generals]
+    horse_codes  = boards[rows[:, None], horse_table[:, :, 0]]
+    leg_codes    = boards[rows[:, None], horse_table[:, :, 1]]
+    attacked    |= ((horse_codes == (HORSE | enemy_flags)) & (leg_codes == 0)).any(axis = 1)
+
+    # Soldiers attack from the squares they could move to the general from. Advisors and
+    # elephants can never reach the other palace.
+    soldier_codes  = boards[rows[:, None], TABLES['soldier_attackers'][1 - colors, generals]]
+    attacked      |= (soldier_codes == (SOLDIER | enemy_flags)).any(axis = 1)
+
+    facing = (first_code == (GENERAL | enemy_flags)).any(axis = 1)
+
+    return attacked, facing
+
+def in_check(positions):
+    """
+    Takes an (N, 10, 9) array of positions and returns an (N, 2) boolean array of whether red
+    and black are in check in each, matching XiangqiGame.is_in_check
+    """
+    boards = flatten_positions(positions)
+    count  = boards.shape[0]
+    flags  = np.zeros((count, 2), dtype = bool)
+
+    for color_index in (0, 1):
+        flags[:, color_index] = general_attacks(boards, np.full(count, color_index, dtype = np.intp))[0]
+
+    return flags
+
+def material_counts(positions):
+    """
+    Takes an (N, 10, 9) array of positions and returns an (N, 2, 7) array of the number of
+    pieces of each color (red then black) and type (in piece code order, general first)
+    """
+    require_numpy()
+
+    positions = np.asarray(positions, dtype = np.int8).reshape(-1, 90)
+    count     = positions.shape[0]
+    offsets   = np.arange(count, dtype = np.intp)[:, None] * 16
+    totals    = np.bincount((positions.astype(np.intp) + offsets).ravel(), minlength = count * 16).reshape(count, 16)
+
+    return np.stack((totals[:, 1:8], totals[:, 9:16]), axis = 1)
+
+def legal_moves_of_color(boards, color_index):
+    """
+    Takes flattened boards all with the same color to move and returns the legal moves of every
+    board as a tuple of arrays of board numbers, from squares and to squares
+    """
+    moves = TABLES['moves'][color_index]
+    flag  = BLACK_FLAG if color_index else 0
+
+    # Find the pieces of the color to move and expand each into the moves its type has from
+    # its square
+    board_numbers, squares = np.nonzero((boards != 0) & ((boards & BLACK_FLAG) == flag))
+    piece_types            = boards[board_numbers, squares] & TYPE_MASK
+    starts                 = moves['starts'][piece_types, squares]
+    lengths                = moves['lengths'][piece_types, squares]
+    ends                   = np.cumsum(lengths)
+    board_numbers          = np.repeat(board_numbers, lengths)
+    move_numbers           = np.arange(ends[-1] if len(ends) else 0) + np.repeat(starts - ends + lengths, lengths)
+
+    targets  = boards[board_numbers, moves['to'][move_numbers]]
+    blockers = (boards[board_numbers[:, None], moves['between'][move_numbers]] != 0).sum(axis = 1)
+
+    # Cannons move onto an empty square over nothing or capture over exactly one piece, every
+    # other piece moves over nothing onto any square without a piece of its own color
+    empty_target = targets == 0
+    enemy_target = ~empty_target & ((targets & BLACK_FLAG) != flag)
+    clear        = blockers == 0
+    cannon_moves = (clear & empty_target) | ((blockers == 1) & enemy_target)
+    other_moves  = clear & (empty_target | enemy_target)
+    candidates   = np.where(moves['is_cannon'][move_numbers], cannon_moves, other_moves)
+
+    board_numbers = board_numbers[candidates]
+    move_numbers  = move_numbers[candidates]
+    from_squares  = moves['from'][move_numbers]
+    to_squares    = moves['to'][move_numbers]
+
+    # When the general is safe, a move by another piece can only expose it by leaving a square
+    # along its row or column or a horse leg next to it, or by landing on its row or column as
+    # a cannon screen. Every other move is legal without trying it.
+    generals         = np.argmax(boards[:, :90] == (GENERAL | flag), axis = 1)
+    attacked, facing = general_attacks(boards, np.full(len(boards), color_index, dtype = np.intp))
+    move_generals    = generals[board_numbers]
+    needs_check      = (
+        attacked[board_numbers] | facing[board_numbers] | (from_squares == move_generals) |
+        TABLES['line_squares'][move_generals, from_squares] | TABLES['leg_squares'][move_generals, from_squares] |
+        TABLES['line_squares'][move_generals, to_squares]
+    )
+    checked = np.nonzero(needs_check)[0]
+
+    # Make each remaining move on its own copy of the board and keep those that leave the
+    # general safe and not facing the other general
+    after     = boards[board_numbers[checked]]
+    move_rows = np.arange(len(checked))
+    after[move_rows, to_squares[checked]]   = after[move_rows, from_squares[checked]]
+    after[move_rows, from_squares[checked]] = 0
+
+    attacked, facing = general_attacks(after, np.full(len(checked), color_index, dtype = np.intp))
+    legal            = np.ones(len(board_numbers), dtype = bool)
+    legal[checked]   = ~attacked & ~facing
+
+    return board_numbers[legal], from_squares[legal], to_squares[legal]
+
+def generate_legal_moves(positions, colors = None, chunk_size = DEFAULT_CHUNK_SIZE):
+    """
+    Generator that takes an (N, 10, 9) array of positions and the colors to move (see
+    color_indices), and yields the legal moves of the positions in chunks, each a tuple of arrays
+    of position numbers, from squares and to squares
+    """
+    boards = flatten_positions(positions)
+    colors = color_indices(colors, boards.shape[0])
+
+    for color_index in (0, 1):
+        position_numbers = np.nonzero(colors == color_index)[0]
+
+        for start in range(0, len(position_numbers), chunk_size):
+            chunk = position_numbers[start:start + chunk_size]
+
+            board_numbers, from_squares, to_squares = legal_moves_of_color(boards[chunk], color_index)
+
+            yield chunk[board_numbers], from_squares, to_squares
+
+def legal_move_counts(positions, colors = None, chunk_size = DEFAULT_CHUNK_SIZE):
+    """
+    Takes an (N, 10, 9) array of positions and the colors to move (see color_indices), and
+    returns an (N,) array of the number of legal moves in each, matching
+    XiangqiGame.legal_moves
+    """
+    count  = len(positions)
+    counts = np.zeros(count, dtype = np.int64)
+
+    for position_numbers, _from_squares, _to_squares in generate_legal_moves(positions, colors, chunk_size):
+        counts += np.bincount(position_numbers, minlength = count)
+
+    return counts
+
+def legal_move_masks(positions, colors = None, chunk_size = DEFAULT_CHUNK_SIZE):
+    """
+    Takes an (N, 10, 9) array of positions and the colors to move (see color_indices), and
+    returns an (N, 90, 90) boolean array that is true at [position, from square, to square] for
+    every legal move
+    """
+    masks = np.zeros((len(positions), 90, 90), dtype = bool)
+
+    for position_numbers, from_squares, to_squares in generate_legal_moves(positions, colors, chunk_size):
+        masks[position_numbers, from_squares, to_squares] = True
+
+    return masks
+
+def analyze_batch(positions, colors = None, with_masks = False, chunk_size = DEFAULT_CHUNK_SIZE):
+    """
+    Takes an (N, 10, 9) array of positions and the colors to move (see color_indices), and
+    returns a dict of the in_check flags, material_counts and legal_move_counts of every
+    position, along with the legal_move_masks if with_masks is true
+    """
+    results = {
+        "in_check": in_check(positions),
+        "material_counts": material_counts(positions)
+    }
+
+    if with_masks:
+        results['legal_move_masks']  = legal_move_masks(positions, colors, chunk_size)
+        results['legal_move_counts'] = results['legal_move_masks'].sum(axis = (1, 2))
+    else:
+        results['legal_move_counts'] = legal_move_counts(positions, colors, chunk_size)
+
+    return results
@@ -0,0 +1,93 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for the NumPy batch evaluation, skipped when NumPy is not installed.
+
+import unittest, random
+import batch
+from XiangqiGame import XiangqiGame
+from board import SQUARE_NAMES, square_index
+
+@unittest.skipIf(batch.np is None, "NumPy is not installed")
+class BatchTester(unittest.TestCase):
+    def setUp(self):
+        # Positions from random games, some of them in check
+        self.games = []
+
+        for seed in range(40):
+            generator = random.Random(seed)
+            game      = XiangqiGame()
+
+            for _ply in range(generator.randrange(120)):
+                if game.get_game_state() != "UNFINISHED":
+                    break
+
+                game.make_move(*generator.choice(game.legal_moves()))
+
+            self.games.append(game)
+
+        self.positions, self.colors = batch.encode_games(self.games)
+
+    def test_encode_games(self):
+        self.assertEqual(self.positions.shape, (40, 10, 9))
+        self.assertEqual(self.positions.dtype, batch.np.int8)
+        self.assertEqual(list(self.colors), [0 if game.get_current_turn() == "red" else 1 for game in self.games])
+
+    def test_start_position(self):
+        positions, _colors = batch.encode_games([XiangqiGame()])
+        results            = batch.analyze_batch(positions)
+
+        self.assertEqual(results['in_check'].tolist(), [[False, False]])
+        self.assertEqual(results['legal_move_counts'].tolist(), [44])
+        self.assertEqual(results['material_counts'].tolist(), [[[1, 2, 2, 2, 2, 2, 5]] * 2])
+
+    def test_in_check_matches_game(self):
+        self.assertEqual(
+            batch.in_check(self.positions).tolist(),
+            [[game.is_in_check("red"), game.is_in_check("black")] for game in self.games]
+        )
+
+    def test_legal_moves_match_game(self):
+        masks = batch.legal_move_masks(self.positions, self.colors, chunk_size = 7)
+
+        for game, mask in zip(self.games, masks):
+            self.assertCountEqual(
+                [(SQUARE_NAMES[from_square], SQUARE_NAMES[to_square]) for from_square, to_square in zip(*mask.nonzero())],
+                game.legal_moves()
+            )
+
+        self.assertEqual(
+            batch.legal_move_counts(self.positions, self.colors).tolist(),
+            [len(game.legal_moves()) for game in self.games]
+        )
+
+    def test_checkmate_has_no_moves(self):
+        game               = XiangqiGame.from_fen("9/9/4k4/9/3r5/9/9/9/9/3K5 w")
+        positions, _colors = batch.encode_games([game])
+
+        self.assertEqual(batch.legal_move_counts(positions, "red").tolist(), [0])
+        self.assertEqual(batch.in_check(positions).tolist(), [[True, False]])
+
+    def test_flying_general(self):
+        # The advisor is the only piece between the generals, so it cannot leave the column
+        game               = XiangqiGame.from_fen("4k4/9/9/9/9/9/9/9/4A4/4K4 w")
+        positions, _colors = batch.encode_games([game])
+        masks              = batch.legal_move_masks(positions)
+
+        self.assertFalse(masks[0, square_index('e', 2)].any())
+        self.assertEqual(batch.in_check(positions).tolist(), [[False, False]])
+
+    def test_invalid_positions(self):
+        with self.assertRaises(ValueError):
+            batch.in_check(self.positions.reshape(-1, 90))
+
+        positions       = self.positions.copy()
+        positions[0, :] = 0
+
+        with self.assertRaises(ValueError):
+            batch.legal_move_counts(positions)
+
+        with self.assertRaises(ValueError):
+            batch.legal_move_counts(self.positions, [0, 1])
+
+if __name__ == '__main__':
+    unittest.main()
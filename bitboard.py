@@ -0,0 +1,473 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Bitboard representation for the XiangqiGame class.  Every piece type and color is a
+#              90 bit integer mask with bit N set for square index N, so check detection and move
+#              generation are a handful of bitwise operations on precomputed attack masks.
+
+from board import (
+    COLOR_INDEX, TYPE_MASK, BLACK_FLAG, EMPTY, GENERAL, ADVISOR, ELEPHANT, HORSE, CHARIOT, CANNON,
+    SOLDIER, HORSE_MOVES, HORSE_ATTACKERS, ELEPHANT_MOVES, ADVISOR_MOVES, GENERAL_MOVES, SOLDIER_MOVES,
+    square_index, piece_code
+)
+
+# Constant of the single bit mask of every square index
+SQUARE_BITS = tuple(1 << square for square in range(90))
+
+# Constant of the mask of every square in each column
+COLUMN_MASKS = tuple(sum(1 << (row * 9 + column) for row in range(10)) for column in range(9))
+
+# Constant of the bit of every square index in the column major (rotated) occupancy, where the
+# ten squares of a column are next to each other so they can be shifted out together
+FILE_BITS = tuple(1 << ((square % 9) * 10 + square // 9) for square in range(90))
+
+def _line_attacks(position, occupancy, length):
+    """
+    Takes a position along a line of the given length and the occupancy bits of that line, and
+    returns a tuple of the chariot slide bits, up to and including the first piece each way, and
+    the cannon capture bits, the first piece after a screen each way
+    """
+    slide, capture = 0, 0
+
+    for step in (1, -1):
+        current      = position + step
+        screen_found = False
+
+        while 0 <= current < length:
+            bit = 1 << current
+
+            if not screen_found:
+                slide |= bit
+
+                if occupancy & bit:
+                    screen_found = True
+            elif occupancy & bit:
+                capture |= bit
+                break
+
+            current += step
+
+    return slide, capture
+
+def _build_line_tables(length):
+    """
+    Returns a pair of tables indexed by position then occupancy, of the chariot slide and cannon
+    capture bits along a line of the given length
+    """
+    slides, captures = [], []
+
+    for position in range(length):
+        position_slides, position_captures = [], []
+
+        for occupancy in range(1 << length):
+            slide, capture = _line_attacks(position, occupancy, length)
+            position_slides.append(slide)
+            position_captures.append(capture)
+
+        slides.append(tuple(position_slides))
+        captures.append(tuple(position_captures))
+
+    return tuple(slides), tuple(captures)
+
+# Constant tables of the attacks along a row, indexed by column then row occupancy, and along a
+# column, indexed by row then column occupancy
+RANK_SLIDES, RANK_CAPTURES = _build_line_tables(9)
+FILE_SLIDES, FILE_CAPTURES = _build_line_tables(10)
+
+# Constant converting the ten bits of a column back into the row major squares of column a
+FILE_SPREAD = tuple(
+    sum(1 << (row * 9) for row in range(10) if column_bits & (1 << row))
+    for column_bits in range(1 << 10)
+)
+
+def _mask(squares):
+    """
+    Returns the mask with the bit of every given square index set
+    """
+    mask = 0
+
+    for square in squares:
+        mask |= SQUARE_BITS[square]
+
+    return mask
+
+def _group_by_block(moves):
+    """
+    Takes (square, block) pairs and returns a tuple of (block bit, mask of squares) pairs, one
+    for each blocking square
+    """
+    groups = {}
+
+    for square, block in moves:
+        groups[block] = groups.get(block, 0) | SQUARE_BITS[square]
+
+    return tuple((SQUARE_BITS[block], mask) for block, mask in groups.items())
+
+def _reverse_mask(color_table, square):
+    """
+    Returns the mask of squares from which a piece with the given per square table could move
+    to the given square
+    """
+    return _mask(origin for origin in range(90) if square in color_table[origin])
+
+# Constant move masks for the short range pieces, by color index then square
+ADVISOR_MASKS = tuple(tuple(_mask(ADVISOR_MOVES[color_index][square]) for square in range(90)) for color_index in (0, 1))
+GENERAL_MASKS = tuple(tuple(_mask(GENERAL_MOVES[color_index][square]) for square in range(90)) for color_index in (0, 1))
+SOLDIER_MASKS = tuple(tuple(_mask(SOLDIER_MOVES[color_index][square]) for square in range(90)) for color_index in (0, 1))
+
+# Constant of the (leg bit, destinations mask) groups of the horse and (eye bit, destinations mask)
+# groups of the elephant from every square
+HORSE_GROUPS    = tuple(_group_by_block(HORSE_MOVES[square]) for square in range(90))
+ELEPHANT_GROUPS = tuple(tuple(_group_by_block(ELEPHANT_MOVES[color_index][square]) for square in range(90)) for color_index in (0, 1))
+
+# Constant of the masks of squares a piece of each color index could attack every square from
+ADVISOR_ATTACKERS = tuple(tuple(_reverse_mask(ADVISOR_MOVES[color_index], square) for square in range(90)) for color_index in (0, 1))
+GENERAL_ATTACKERS = tuple(tuple(_reverse_mask(GENERAL_MOVES[color_index], square) for square in range(90)) for color_index in (0, 1))
+SOLDIER_ATTACKERS = tuple(tuple(_reverse_mask(SOLDIER_MOVES[color_index], square) for square in range(90)) for color_index in (0, 1))
+
+# Constant of the (leg bit, horse squares mask) groups of horses that could attack every square
+HORSE_ATTACKER_GROUPS = tuple(_group_by_block(HORSE_ATTACKERS[square]) for square in range(90))
+
+# Constant of the (eye bit, elephant squares mask) groups of elephants of each color index that
+# could attack every square
+ELEPHANT_ATTACKER_GROUPS = tuple(
+    tuple(
+        _group_by_block(
+            (origin, eye)
+            for origin in range(90)
+            for target, eye in ELEPHANT_MOVES[color_index][origin]
+            if target == square
+        )
+        for square in range(90)
+    )
+    for color_index in (0, 1)
+)
+
+def iterate_bits(mask):
+    """
+    Generator yielding the square index of every set bit of the mask, lowest first
+    """
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+class BitBoard:
+    """
+    Board backend storing the position as one bit mask per piece code, one per color and the
+    occupied squares in both row major and column major order.  A bytearray of piece codes is
+    kept as well so the piece on a square can be found directly.
+    """
+    def __init__(self):
+        """
+        Initialization method that sets up an empty board
+        """
+        self._squares        = bytearray(90)
+        self._pieces         = [0] * 16
+        self._colors         = [0, 0]
+        self._occupied       = 0
+        self._occupied_files = 0
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Takes a nested dict game board of piece objects and returns a bitboard of the same position
+        """
+        bit_board = cls()
+
+        for row, columns in board.items():
+            for column, piece in columns.items():
+                if piece:
+                    bit_board.set_code(square_index(column, row), piece_code(piece))
+
+        return bit_board
+
+    @classmethod
+    def from_codes(cls, codes):
+        """
+        Takes a sequence of 90 piece codes by square index and returns a board of that position
+        """
+        bit_board = cls()
+
+        for square, code in enumerate(codes):
+            if code:
+                bit_board.set_code(square, code)
+
+        return bit_board
+
+    def get_codes(self):
+        """
+        Returns the piece codes of every square as 90 bytes
+        """
+        return bytes(self._squares)
+
+    def get_code(self, square):
+        """
+        Returns the piece code at the given square index
+        """
+        return self._squares[square]
+
+    def set_code(self, square, code):
+        """
+        Places the piece code at the given square index, replacing anything already there
+        """
+        bit      = SQUARE_BITS[square]
+        file_bit = FILE_BITS[square]
+        existing = self._squares[square]
+
+        if existing:
+            self._pieces[existing] &= ~bit
+            self._colors[existing >> 3] &= ~bit
+            self._occupied &= ~bit
+            self._occupied_files &= ~file_bit
+
+        self._squares[square] = code
+
+        if code:
+            self._pieces[code] |= bit
+            self._colors[code >> 3] |= bit
+            self._occupied |= bit
+            self._occupied_files |= file_bit
+
+    def general_square(self, color):
+        """
+        Returns the square index of the general of the given color string
+        """
+        generals = self._pieces[GENERAL | (COLOR_INDEX[color] << 3)]
+
+        return generals.bit_length() - 1 if generals else None
+
+    def move(self, from_square, to_square):
+        """
+        Moves the piece between the given square indices without any validation and returns
+        the code of the captured piece, or EMPTY
+        """
+        squares  = self._squares
+        code     = squares[from_square]
+        captured = squares[to_square]
+        from_bit = SQUARE_BITS[from_square]
+        to_bit   = SQUARE_BITS[to_square]
+
+        if captured:
+            self._pieces[captured] ^= to_bit
+            self._colors[captured >> 3] ^= to_bit
+        else:
+            self._occupied ^= to_bit
+            self._occupied_files ^= FILE_BITS[to_square]
+
+        self._pieces[code] ^= from_bit | to_bit
+        self._colors[code >> 3] ^= from_bit | to_bit
+        self._occupied ^= from_bit
+        self._occupied_files ^= FILE_BITS[from_square]
+
+        squares[to_square]   = code
+        squares[from_square] = EMPTY
+
+        return captured
+
+    def undo(self, from_square, to_square, captured):
+        """
+        Reverses a move made with the move method given the captured code it returned
+        """
+        squares  = self._squares
+        code     = squares[to_square]
+        from_bit = SQUARE_BITS[from_square]
+        to_bit   = SQUARE_BITS[to_square]
+
+        self._pieces[code] ^= from_bit | to_bit
+        self._colors[code >> 3] ^= from_bit | to_bit
+        self._occupied ^= from_bit
+        self._occupied_files ^= FILE_BITS[from_square]
+
+        if captured:
+            self._pieces[captured] ^= to_bit
+            self._colors[captured >> 3] ^= to_bit
+        else:
+            self._occupied ^= to_bit
+            self._occupied_files ^= FILE_BITS[to_square]
+
+        squares[from_square] = code
+        squares[to_square]   = captured
+
+    def line_attacks(self, square):
+        """
+        Returns a tuple of the chariot slide mask, every square up to and including the first
+        piece along each row and column direction, and the cannon capture mask, the first piece
+        after a screen in each direction, from the given square
+        """
+        row, column = divmod(square, 9)
+
+        rank_occupancy = (self._occupied >> (row * 9)) & 0x1FF
+        file_occupancy = (self._occupied_files >> (column * 10)) & 0x3FF
+
+        slide = (RANK_SLIDES[column][rank_occupancy] << (row * 9)) | (FILE_SPREAD[FILE_SLIDES[row][file_occupancy]] << column)
+        capture = (RANK_CAPTURES[column][rank_occupancy] << (row * 9)) | (FILE_SPREAD[FILE_CAPTURES[row][file_occupancy]] << column)
+
+        return slide, capture
+
+    def generals_facing(self):
+        """
+        Returns true if the two generals are on the same column with no pieces between them
+        """
+        red_square = self.general_square('red')
+
+        if red_square is None:
+            return False
+
+        return bool(self.line_attacks(red_square)[0] & COLUMN_MASKS[red_square % 9] & self._pieces[GENERAL | BLACK_FLAG])
+
+    def is_attacked(self, square, color_index, lines = None):
+        """
+        Returns true if any piece of the given color index could capture on the given square.
+        The attacks are worked out from the square and masked against the attacking pieces.
+        Takes the line_attacks of the square if they have already been worked out.
+        """
+        pieces     = self._pieces
+        occupied   = self._occupied
+        color_flag = color_index << 3
+
+        slide, capture = lines or self.line_attacks(square)
+
+        if slide & pieces[CHARIOT | color_flag] or capture & pieces[CANNON | color_flag]:
+            return True
+
+        if SOLDIER_ATTACKERS[color_index][square] & pieces[SOLDIER | color_flag]:
+            return True
+
+        horses = pieces[HORSE | color_flag]
+        if horses:
+            for leg_bit, horse_mask in HORSE_ATTACKER_GROUPS[square]:
+                if horse_mask & horses and not occupied & leg_bit:
+                    return True
+
+        if GENERAL_ATTACKERS[color_index][square] & pieces[GENERAL | color_flag]:
+            return True
+
+        if ADVISOR_ATTACKERS[color_index][square] & pieces[ADVISOR | color_flag]:
+            return True
+
+        elephants = pieces[ELEPHANT | color_flag]
+        if elephants:
+            for eye_bit, elephant_mask in ELEPHANT_ATTACKER_GROUPS[color_index][square]:
+                if elephant_mask & elephants and not occupied & eye_bit:
+                    return True
+
+        return False
+
+    def general_exposed(self, color_index):
+        """
+        Returns true if the general of the given color index could be captured or is facing the
+        other general, sharing one line_attacks lookup between the two checks
+        """
+        generals = self._pieces[GENERAL | (color_index << 3)]
+        square   = generals.bit_length() - 1
+        lines    = self.line_attacks(square)
+
+        # Facing is a chariot style slide along the column that reaches the other general
+        if lines[0] & COLUMN_MASKS[square % 9] & self._pieces[GENERAL | ((1 - color_index) << 3)]:
+            return True
+
+        return self.is_attacked(square, 1 - color_index, lines)
+
+    def is_in_check(self, color):
+        """
+        Takes a color string and returns true if that colors general could be captured on the
+        opposing players next move
+        """
+        color_index = COLOR_INDEX[color]
+
+        return self.is_attacked(self.general_square(color), 1 - color_index)
+
+    def moves_mask(self, square):
+        """
+        Returns the mask of every destination the piece on the given square could move to by its
+        own movement rules, without considering check
+        """
+        code        = self._squares[square]
+        piece_type  = code & TYPE_MASK
+        color_index = code >> 3
+        own         = self._colors[color_index]
+        occupied    = self._occupied
+
+        if piece_type == CHARIOT:
+            return self.line_attacks(square)[0] & ~own
+
+        if piece_type == CANNON:
+            slide, capture = self.line_attacks(square)
+
+            return (slide & ~occupied) | (capture & self._colors[1 - color_index])
+
+        if piece_type == HORSE:
+            groups = HORSE_GROUPS[square]
+        elif piece_type == ELEPHANT:
+            groups = ELEPHANT_GROUPS[color_index][square]
+        else:
+            if piece_type == ADVISOR:
+                mask = ADVISOR_MASKS[color_index][square]
+            elif piece_type == GENERAL:
+                mask = GENERAL_MASKS[color_index][square]
+            else:
+                mask = SOLDIER_MASKS[color_index][square]
+
+            return mask & ~own
+
+        mask = 0
+
+        for block_bit, targets in groups:
+            if not occupied & block_bit:
+                mask |= targets
+
+        return mask & ~own
+
+    def piece_moves(self, square):
+        """
+        Generator yielding every destination square index the piece on the given square could
+        move to by its own movement rules, without considering check
+        """
+        return iterate_bits(self.moves_mask(square))
+
+    def move_is_legal(self, from_square, to_square):
+        """
+        Makes the move on the board, returns whether it leaves the moving players general safe
+        and not facing the other general, then restores the board
+        """
+        color_index = self._squares[from_square] >> 3
+        captured    = self.move(from_square, to_square)
+        legal       = not self.general_exposed(color_index)
+
+        self.undo(from_square, to_square, captured)
+
+        return legal
+
+    def generate_moves(self, color):
+        """
+        Returns a list of every move for the given color string by the pieces' own movement
+        rules, without considering check, as (from square, to square) index pairs
+        """
+        moves = []
+
+        # The bits are walked inline rather than with iterate_bits, as this runs for every node
+        # of a search
+        pieces = self._colors[COLOR_INDEX[color]]
+
+        while pieces:
+            lowest  = pieces & -pieces
+            square  = lowest.bit_length() - 1
+            pieces ^= lowest
+            targets = self.moves_mask(square)
+
+            while targets:
+                target   = targets & -targets
+                targets ^= target
+
+                moves.append((square, target.bit_length() - 1))
+
+        return moves
+
+    def generate_legal_moves(self, color):
+        """
+        Generator that takes a color string and yields every legal move for that color as
+        (from square, to square) index pairs
+        """
+        for from_square, to_square in self.generate_moves(color):
+            if self.move_is_legal(from_square, to_square):
+                yield from_square, to_square
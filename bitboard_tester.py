@@ -0,0 +1,152 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for the bitboard representation.
+
+import unittest, copy, os, random, subprocess, sys
+from bitboard import BitBoard, RANK_SLIDES, RANK_CAPTURES, FILE_SPREAD, iterate_bits
+from board import square_index, CANNON, BLACK_FLAG
+from pieces import General, Cannon, Soldier
+from XiangqiGame import XiangqiGame
+
+class LineTableTester(unittest.TestCase):
+    def test_rank_slides(self):
+        # A chariot on column c with pieces on columns a and f slides to b, a, d, e and f
+        self.assertEqual(
+            RANK_SLIDES[2][0b100001],
+            0b111011
+        )
+
+    def test_rank_captures(self):
+        # A cannon on column a with pieces on columns c and e captures on e only
+        self.assertEqual(
+            RANK_CAPTURES[0][0b10100],
+            0b10000
+        )
+
+    def test_file_spread(self):
+        self.assertEqual(
+            FILE_SPREAD[0b11],
+            1 | (1 << 9)
+        )
+
+    def test_iterate_bits(self):
+        self.assertEqual(
+            list(iterate_bits(0b100101)),
+            [0, 2, 5]
+        )
+
+class BitBoardTester(unittest.TestCase):
+    def setUp(self):
+        self.game  = XiangqiGame()
+        self.board = BitBoard.from_board(self.game._board)
+
+    def assert_same_masks(self, board, other_board):
+        self.assertEqual(board._squares, other_board._squares)
+        self.assertEqual(board._pieces, other_board._pieces)
+        self.assertEqual(board._colors, other_board._colors)
+        self.assertEqual(board._occupied, other_board._occupied)
+        self.assertEqual(board._occupied_files, other_board._occupied_files)
+
+    def test_from_board(self):
+        self.assertEqual(
+            self.board.general_square('red'),
+            square_index('e', 1)
+        )
+
+        self.assertEqual(
+            self.board.get_code(square_index('h', 8)),
+            CANNON | BLACK_FLAG
+        )
+
+    def test_move_and_undo(self):
+        start_board = BitBoard.from_board(self.game._board)
+        from_square = square_index('b', 3)
+        to_square   = square_index('b', 10)
+
+        captured = self.board.move(from_square, to_square)
+        self.board.undo(from_square, to_square, captured)
+
+        self.assert_same_masks(self.board, start_board)
+
+    def test_cannon_moves(self):
+        self.assertEqual(
+            len(list(self.board.piece_moves(square_index('b', 3)))),
+            12
+        )
+
+    def test_generals_facing(self):
+        board = copy.deepcopy( XiangqiGame.BLANK_BOARD )
+        board[1]['e'] = General('red', 'e', 1)
+        board[10]['e'] = General('black', 'e', 10)
+        board[5]['e'] = Soldier('red', 'e', 5)
+
+        bit_board = BitBoard.from_board(board)
+
+        self.assertFalse(bit_board.generals_facing())
+
+        bit_board.move(square_index('e', 5), square_index('d', 5))
+
+        self.assertTrue(bit_board.generals_facing())
+
+    def test_cannon_check(self):
+        board = copy.deepcopy( XiangqiGame.BLANK_BOARD )
+        board[1]['e'] = General('red', 'e', 1)
+        board[10]['d'] = General('black', 'd', 10)
+        board[3]['e'] = Soldier('red', 'e', 3)
+        board[7]['e'] = Cannon('black', 'e', 7)
+
+        bit_board = BitBoard.from_board(board)
+
+        self.assertTrue(bit_board.is_in_check('red'))
+        self.assertFalse(bit_board.move_is_legal(square_index('e', 3), square_index('e', 4)))
+        self.assertTrue(bit_board.move_is_legal(square_index('e', 1), square_index('f', 1)))
+
+    def test_matches_compact_board_over_random_games(self):
+        generator = random.Random(90)
+
+        for _game in range(3):
+            bit_game     = XiangqiGame(board_backend = "bitboard")
+            compact_game = XiangqiGame(board_backend = "compact")
+
+            for _ply in range(80):
+                legal_moves = compact_game.legal_moves()
+
+                self.assertCountEqual(bit_game.legal_moves(), legal_moves)
+
+                for color in ('red', 'black'):
+                    self.assertEqual(bit_game.is_in_check(color), compact_game.is_in_check(color))
+
+                if not legal_moves:
+                    break
+
+                move = generator.choice(legal_moves)
+                bit_game.make_move(*move)
+                compact_game.make_move(*move)
+
+            # Taking every move back returns the masks to the start position
+            while bit_game.pop_move():
+                pass
+
+            self.assert_same_masks(bit_game._board_backend, self.board)
+
+    def test_perft(self):
+        self.assertEqual(
+            XiangqiGame(board_backend = "bitboard").perft(3),
+            79666
+        )
+
+    def test_imported_only_when_used(self):
+        # A fresh interpreter is used as this test run has already imported the module
+        code = (
+            "import sys, XiangqiGame; print('bitboard' in sys.modules); "
+            "XiangqiGame.XiangqiGame(board_backend = 'bitboard'); print('bitboard' in sys.modules)"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code], cwd = os.path.dirname(os.path.abspath(__file__)),
+            capture_output = True, text = True, check = True
+        ).stdout
+
+        self.assertEqual(output.split(), ["False", "True"])
+
+if __name__ == '__main__':
+    unittest.main()
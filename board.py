@@ -0,0 +1,638 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Compact board representation for the XiangqiGame class.  Squares are integer indices
+#              into a flat 90 entry bytearray of piece codes, with the neighbour, ray and piece
+#              movement tables computed once at import so the hot validation loops are lookups.
+
+# Constant of the column letters in board order
+COLUMNS = 'abcdefghi'
+
+# Piece Codes #
+###############
+# The low three bits are the piece type and the BLACK_FLAG bit is set for black pieces, an empty
+# square is 0.
+EMPTY      = 0
+GENERAL    = 1
+ADVISOR    = 2
+ELEPHANT   = 3
+HORSE      = 4
+CHARIOT    = 5
+CANNON     = 6
+SOLDIER    = 7
+BLACK_FLAG = 8
+TYPE_MASK  = 7
+
+# Constants converting between the letters the piece classes print as and the piece type codes
+LETTER_CODES = { 'G': GENERAL, 'A': ADVISOR, 'E': ELEPHANT, 'H': HORSE, 'R': CHARIOT, 'C': CANNON, 'S': SOLDIER }
+CODE_LETTERS = { code: letter for letter, code in LETTER_CODES.items() }
+
+# Constants converting between color strings and the color index (0 for red, 1 for black) used
+# by the per color tables below
+COLOR_INDEX = { 'red': 0, 'black': 1 }
+COLORS      = ('red', 'black')
+
+def square_index(column, row):
+    """
+    Converts a column letter and row number to the square index, 0 for a1 through 89 for i10
+    """
+    return (row - 1) * 9 + ord(column) - 97
+
+def square_coordinates(square):
+    """
+    Converts a square index back to a (column, row) tuple
+    """
+    return COLUMNS[square % 9], square // 9 + 1
+
+# Constant of the algebraic name of each square index (ex 'a1')
+SQUARE_NAMES = tuple(column + str(row) for row in range(1, 11) for column in COLUMNS)
+
+# Constant of the (column, row) tuple of each square index
+SQUARE_COORDINATES = tuple((column, row) for row in range(1, 11) for column in COLUMNS)
+
+def piece_code(piece):
+    """
+    Returns the piece code for a piece object from the pieces module
+    """
+    code = LETTER_CODES[str(piece)]
+
+    if piece.get_color() == 'black':
+        code |= BLACK_FLAG
+
+    return code
+
+def code_color(code):
+    """
+    Returns the color string of a non empty piece code
+    """
+    return 'black' if code & BLACK_FLAG else 'red'
+
+def _square_if_on_board(row, column_index):
+    """
+    Returns the square index for a row and column index, or None if it is off the board
+    """
+    if 1 <= row <= 10 and 0 <= column_index <= 8:
+        return (row - 1) * 9 + column_index
+
+    return None
+
+def _in_palace(color_index, square):
+    """
+    Returns true if the square is within the palace of the given color index
+    """
+    column, row = square_coordinates(square)
+
+    if column < 'd' or column > 'f':
+        return False
+
+    return row <= 3 if color_index == 0 else row >= 8
+
+def _build_tables():
+    """
+    Builds the per square lookup tables.  Every table is a tuple indexed by square, and the piece
+    tables that depend on color are a pair of those indexed by color index.
+    """
+    neighbours, diagonals, rays = [], [], []
+    horse_moves, horse_attackers = [], []
+    elephant_moves = ([], [])
+    advisor_moves  = ([], [])
+    general_moves  = ([], [])
+    soldier_moves  = ([], [])
+
+    for square in range(90):
+        row          = square // 9 + 1
+        column_index = square % 9
+
+        # Orthogonal and diagonal neighbours
+        neighbours.append(tuple(
+            target for target in (
+                _square_if_on_board(row + 1, column_index), _square_if_on_board(row - 1, column_index),
+                _square_if_on_board(row, column_index + 1), _square_if_on_board(row, column_index - 1)
+            ) if target is not None
+        ))
+        diagonals.append(tuple(
+            target for target in (
+                _square_if_on_board(row + 1, column_index + 1), _square_if_on_board(row + 1, column_index - 1),
+                _square_if_on_board(row - 1, column_index + 1), _square_if_on_board(row - 1, column_index - 1)
+            ) if target is not None
+        ))
+
+        # Rays heading up, down, right and left, nearest square first
+        square_rays = []
+        for row_step, column_step in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            ray    = []
+            target = _square_if_on_board(row + row_step, column_index + column_step)
+
+            while target is not None:
+                ray.append(target)
+                target = _square_if_on_board(target // 9 + 1 + row_step, target % 9 + column_step)
+
+            square_rays.append(tuple(ray))
+        rays.append(tuple(square_rays))
+
+        # Horse moves as (destination, leg) where the leg is next to the horse along the long side
+        # of the L, and the reverse (horse square, leg) pairs for horses that could attack the square
+        moves, attackers = [], []
+        for row_offset, column_offset in ((2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)):
+            target = _square_if_on_board(row + row_offset, column_index + column_offset)
+
+            if target is None:
+                continue
+
+            if abs(row_offset) == 2:
+                leg = _square_if_on_board(row + row_offset // 2, column_index)
+                # A horse on the target square attacks back through the square next to itself
+                attacker_leg = _square_if_on_board(row + row_offset // 2, column_index + column_offset)
+            else:
+                leg = _square_if_on_board(row, column_index + column_offset // 2)
+                attacker_leg = _square_if_on_board(row + row_offset, column_index + column_offset // 2)
+
+            moves.append((target, leg))
+            attackers.append((target, attacker_leg))
+
+        horse_moves.append(tuple(moves))
+        horse_attackers.append(tuple(attackers))
+
+        for color_index in (0, 1):
+            # Elephant moves as (destination, eye), never crossing the river
+            moves = []
+            for row_offset, column_offset in ((2, 2), (2, -2), (-2, 2), (-2, -2)):
+                target = _square_if_on_board(row + row_offset, column_index + column_offset)
+
+                if target is None:
+                    continue
+
+                target_row = target // 9 + 1
+                if (color_index == 0 and target_row > 5) or (color_index == 1 and target_row < 6):
+                    continue
+
+                eye = _square_if_on_board(row + row_offset // 2, column_index + column_offset // 2)
+                moves.append((target, eye))
+            elephant_moves[color_index].append(tuple(moves))
+
+            # Advisors move one space diagonally and generals one space orthogonally, both only
+            # to squares inside their palace
+            advisor_moves[color_index].append(tuple(
+                target for target in diagonals[square] if _in_palace(color_index, target)
+            ))
+            general_moves[color_index].append(tuple(
+                target for target in neighbours[square] if _in_palace(color_index, target)
+            ))
+
+            # Soldiers move forward, and sideways once they have crossed the river
+            forward = 1 if color_index == 0 else -1
+            crossed = row >= 6 if color_index == 0 else row <= 5
+            targets = [_square_if_on_board(row + forward, column_index)]
+
+            if crossed:
+                targets.append(_square_if_on_board(row, column_index + 1))
+                targets.append(_square_if_on_board(row, column_index - 1))
+
+            soldier_moves[color_index].append(tuple(target for target in targets if target is not None))
+
+    return (
+        tuple(neighbours), tuple(diagonals), tuple(rays), tuple(horse_moves), tuple(horse_attackers),
+        tuple(map(tuple, elephant_moves)), tuple(map(tuple, advisor_moves)),
+        tuple(map(tuple, general_moves)), tuple(map(tuple, soldier_moves))
+    )
+
+(NEIGHBOURS, DIAGONALS, RAYS, HORSE_MOVES, HORSE_ATTACKERS,
+ ELEPHANT_MOVES, ADVISOR_MOVES, GENERAL_MOVES, SOLDIER_MOVES) = _build_tables()
+
+# Constant of the squares a soldier, general, advisor or elephant could attack each square from,
+# the orthogonal and diagonal neighbours plus the two space diagonals
+SHORT_RANGE_ATTACKERS = tuple(
+    NEIGHBOURS[square] + DIAGONALS[square] +
+    tuple(target for target, _eye in ELEPHANT_MOVES[0][square] + ELEPHANT_MOVES[1][square])
+    for square in range(90)
+)
+
+class CompactBoard:
+    """
+    Board backend storing the position as a flat bytearray of piece codes.  Keeps the squares of
+    both generals so check detection can work outward from the general.
+    """
+    def __init__(self):
+        """
+        Initialization method that sets up an empty board
+        """
+        self._squares  = bytearray(90)
+        self._generals = [None, None]
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Takes a nested dict game board of piece objects and returns a compact board of the same
+        position
+        """
+        compact_board = cls()
+
+        for row, columns in board.items():
+            for column, piece in columns.items():
+                if piece:
+                    compact_board.set_code(square_index(column, row), piece_code(piece))
+
+        return compact_board
+
+    @classmethod
+    def from_codes(cls, codes):
+        """
+        Takes a sequence of 90 piece codes by square index and returns a board of that position
+        """
+        compact_board = cls()
+
+        for square, code in enumerate(codes):
+            if code:
+                compact_board.set_code(square, code)
+
+        return compact_board
+
+    def get_codes(self):
+        """
+        Returns the piece codes of every square as 90 bytes
+        """
+        return bytes(self._squares)
+
+    def get_code(self, square):
+        """
+        Returns the piece code at the given square index
+        """
+        return self._squares[square]
+
+    def set_code(self, square, code):
+        """
+        Places the piece code at the given square index, keeping track of the generals
+        """
+        self._squares[square] = code
+
+        if code & TYPE_MASK == GENERAL:
+            self._generals[code >> 3] = square
+
+    def general_square(self, color):
+        """
+        Returns the square index of the general of the given color string
+        """
+        return self._generals[COLOR_INDEX[color]]
+
+    def move(self, from_square, to_square):
+        """
+        Moves the piece between the given square indices without any validation and returns
+        the code of the captured piece, or EMPTY
+        """
+        squares  = self._squares
+        code     = squares[from_square]
+        captured = squares[to_square]
+
+        squares[to_square]   = code
+        squares[from_square] = EMPTY
+
+        if code & TYPE_MASK == GENERAL:
+            self._generals[code >> 3] = to_square
+
+        return captured
+
+    def undo(self, from_square, to_square, captured):
+        """
+        Reverses a move made with the move method given the captured code it returned
+        """
+        squares = self._squares
+        code    = squares[to_square]
+
+        squares[from_square] = code
+        squares[to_square]   = captured
+
+        if code & TYPE_MASK == GENERAL:
+            self._generals[code >> 3] = from_square
+
+    def generals_facing(self):
+        """
+        Returns true if the two generals are on the same column with no pieces between them
+        """
+        red_square, black_square = self._generals
+
+        if red_square is None or black_square is None or red_square % 9 != black_square % 9:
+            return False
+
+        squares = self._squares
+        low, high = min(red_square, black_square), max(red_square, black_square)
+
+        for square in range(low + 9, high, 9):
+            if squares[square]:
+                return False
+
+        return True
+
+    def is_attacked(self, square, color_index):
+        """
+        Returns true if any piece of the given color index could capture on the given square.
+        Works outward from the square along the rays and movement patterns in reverse rather
+        than trying every attacking piece.
+        """
+        squares    = self._squares
+        color_flag = color_index << 3
+
+        # Chariots are the first piece along a ray and cannons the second
+        for ray in RAYS[square]:
+            screen_found = False
+
+            for target in ray:
+                code = squares[target]
+
+                if code:
+                    if not screen_found:
+                        if code == CHARIOT | color_flag:
+                            return True
+                        screen_found = True
+                    else:
+                        if code == CANNON | color_flag:
+                            return True
+                        break
+
+        # Horses attack through the square next to themselves
+        horse_code = HORSE | color_flag
+        for horse_square, leg in HORSE_ATTACKERS[square]:
+            if squares[horse_square] == horse_code and not squares[leg]:
+                return True
+
+        # Soldiers attack from behind, and from the side once they have crossed the river
+        soldier_code = SOLDIER | color_flag
+        for target in NEIGHBOURS[square]:
+            if squares[target] == soldier_code and square in SOLDIER_MOVES[color_index][target]:
+                return True
+
+        # The remaining pieces have short, symmetric movement patterns so their tables can be
+        # read from the target square
+        general_code = GENERAL | color_flag
+        for target in NEIGHBOURS[square]:
+            if squares[target] == general_code and square in GENERAL_MOVES[color_index][target]:
+                return True
+
+        advisor_code = ADVISOR | color_flag
+        for target in DIAGONALS[square]:
+            if squares[target] == advisor_code and square in ADVISOR_MOVES[color_index][target]:
+                return True
+
+        elephant_code = ELEPHANT | color_flag
+        for target, eye in ELEPHANT_MOVES[1 - color_index][square] + ELEPHANT_MOVES[color_index][square]:
+            if squares[target] == elephant_code and not squares[eye] and (square, eye) in ELEPHANT_MOVES[color_index][target]:
+                return True
+
+        return False
+
+    def is_in_check(self, color):
+        """
+        Takes a color string and returns true if that colors general could be captured on the
+        opposing players next move
+        """
+        color_index = COLOR_INDEX[color]
+        general     = self._generals[color_index]
+
+        return self.is_attacked(general, 1 - color_index)
+
+    def piece_moves(self, square):
+        """
+        Generator yielding every destination square index the piece on the given square could
+        move to by its own movement rules, without considering check
+        """
+        squares     = self._squares
+        code        = squares[square]
+        piece_type  = code & TYPE_MASK
+        color_index = code >> 3
+        color_flag  = code & BLACK_FLAG
+
+        if piece_type == CHARIOT or piece_type == CANNON:
+            for ray in RAYS[square]:
+                screen_found = False
+
+                for target in ray:
+                    target_code = squares[target]
+
+                    if not screen_found:
+                        if not target_code:
+                            yield target
+                        elif piece_type == CANNON:
+                            screen_found = True
+                        else:
+                            if target_code & BLACK_FLAG != color_flag:
+                                yield target
+                            break
+                    elif target_code:
+                        if target_code & BLACK_FLAG != color_flag:
+                            yield target
+                        break
+            return
+
+        if piece_type == HORSE:
+            targets = (target for target, leg in HORSE_MOVES[square] if not squares[leg])
+        elif piece_type == ELEPHANT:
+            targets = (target for target, eye in ELEPHANT_MOVES[color_index][square] if not squares[eye])
+        elif piece_type == ADVISOR:
+            targets = ADVISOR_MOVES[color_index][square]
+        elif piece_type == GENERAL:
+            targets = GENERAL_MOVES[color_index][square]
+        else:
+            targets = SOLDIER_MOVES[color_index][square]
+
+        for target in targets:
+            target_code = squares[target]
+
+            if not target_code or target_code & BLACK_FLAG != color_flag:
+                yield target
+
+    def move_is_legal(self, from_square, to_square):
+        """
+        Makes the move on the board, returns whether it leaves the moving players general safe
+        and not facing the other general, then restores the board
+        """
+        color    = code_color(self._squares[from_square])
+        captured = self.move(from_square, to_square)
+        legal    = not self.generals_facing() and not self.is_in_check(color)
+
+        self.undo(from_square, to_square, captured)
+
+        return legal
+
+    def generate_moves(self, color):
+        """
+        Returns a list of every move for the given color string by the pieces' own movement
+        rules, without considering check, as (from square, to square) index pairs
+        """
+        squares    = self._squares
+        color_flag = COLOR_INDEX[color] << 3
+        moves      = []
+
+        for square in range(90):
+            code = squares[square]
+
+            if code and code & BLACK_FLAG == color_flag:
+                moves.extend((square, target) for target in self.piece_moves(square))
+
+        return moves
+
+    def generate_legal_moves(self, color):
+        """
+        Generator that takes a color string and yields every legal move for that color as
+        (from square, to square) index pairs
+        """
+        for from_square, to_square in self.generate_moves(color):
+            if self.move_is_legal(from_square, to_square):
+                yield from_square, to_square
+
+class AttackMapBoard(CompactBoard):
+    """
+    Compact board that also keeps an attack map, the number of pieces of each color attacking
+    every square.  The map is updated on each move by recalculating only the pieces whose
+    attacks could have changed, so check detection is a single lookup.  Moves cost more than on
+    the compact board, so it pays off where checks are asked for many times per move.
+    """
+    def __init__(self):
+        """
+        Initialization method, calls up to parent class definition and sets up an empty map
+        """
+        super().__init__()
+        self._attack_counts = (bytearray(90), bytearray(90))
+        self._attacks       = [()] * 90
+        self._owners        = bytearray(90)
+
+    def set_code(self, square, code):
+        """
+        Places the piece code at the given square index, then updates the attack map
+        """
+        super().set_code(square, code)
+        self.update_attacks((square,))
+
+    def move(self, from_square, to_square):
+        """
+        Moves the piece between the given square indices, then updates the attack map
+        """
+        captured = super().move(from_square, to_square)
+        self.update_attacks((from_square, to_square))
+
+        return captured
+
+    def undo(self, from_square, to_square, captured):
+        """
+        Reverses a move made with the move method, then updates the attack map
+        """
+        super().undo(from_square, to_square, captured)
+        self.update_attacks((from_square, to_square))
+
+    def attack_count(self, square, color_index):
+        """
+        Returns the number of pieces of the given color index attacking the square
+        """
+        return self._attack_counts[color_index][square]
+
+    def is_attacked(self, square, color_index):
+        """
+        Returns true if any piece of the given color index could capture on the given square
+        """
+        return self._attack_counts[color_index][square] > 0
+
+    def piece_attacks(self, square):
+        """
+        Returns a tuple of every square the piece on the given square attacks, meaning it could
+        capture there if an opposing piece stood there, including squares of its own pieces
+        """
+        squares     = self._squares
+        code        = squares[square]
+        piece_type  = code & TYPE_MASK
+        color_index = code >> 3
+
+        if not code:
+            return ()
+
+        if piece_type == CHARIOT or piece_type == CANNON:
+            attacks = []
+
+            for ray in RAYS[square]:
+                screen_found = piece_type == CHARIOT
+
+                for target in ray:
+                    if screen_found:
+                        attacks.append(target)
+
+                        if squares[target]:
+                            break
+                    elif squares[target]:
+                        screen_found = True
+
+            return tuple(attacks)
+
+        if piece_type == HORSE:
+            return tuple(target for target, leg in HORSE_MOVES[square] if not squares[leg])
+
+        if piece_type == ELEPHANT:
+            return tuple(target for target, eye in ELEPHANT_MOVES[color_index][square] if not squares[eye])
+
+        if piece_type == ADVISOR:
+            return ADVISOR_MOVES[color_index][square]
+
+        if piece_type == GENERAL:
+            return GENERAL_MOVES[color_index][square]
+
+        return SOLDIER_MOVES[color_index][square]
+
+    def update_attacks(self, changed_squares):
+        """
+        Takes the squares whose contents changed and recalculates the attacks of only the pieces
+        that depend on them: the pieces on those squares, the first piece along each row and
+        column from them if it is a chariot or cannon, the second if it is a cannon, and the
+        horses whose leg and elephants whose eye they are.
+        """
+        squares  = self._squares
+        affected = set(changed_squares)
+
+        for changed in changed_squares:
+            # A chariot only sees up to the first piece and a cannon up to the second, so pieces
+            # further along the ray attack the same squares whatever is on the changed square
+            for ray in RAYS[changed]:
+                pieces_found = 0
+
+                for target in ray:
+                    code = squares[target]
+
+                    if code:
+                        piece_type = code & TYPE_MASK
+
+                        if piece_type == CANNON or (piece_type == CHARIOT and not pieces_found):
+                            affected.add(target)
+
+                        pieces_found += 1
+
+                        if pieces_found == 2:
+                            break
+
+            for target in NEIGHBOURS[changed]:
+                if squares[target] & TYPE_MASK == HORSE:
+                    affected.add(target)
+
+            for target in DIAGONALS[changed]:
+                if squares[target] & TYPE_MASK == ELEPHANT:
+                    affected.add(target)
+
+        for square in affected:
+            self.recalculate_square(square)
+
+    def recalculate_square(self, square):
+        """
+        Removes the attacks last recorded for the given square from the map and records the
+        attacks of the piece now on it
+        """
+        old_attacks = self._attacks[square]
+
+        if old_attacks:
+            counts = self._attack_counts[self._owners[square]]
+
+            for target in old_attacks:
+                counts[target] -= 1
+
+        new_attacks = self.piece_attacks(square)
+        self._attacks[square] = new_attacks
+
+        if new_attacks:
+            counts = self._attack_counts[self._squares[square] >> 3]
+
+            for target in new_attacks:
+                counts[target] += 1
+
+        self._owners[square] = self._squares[square] >> 3
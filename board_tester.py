@@ -0,0 +1,211 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for the compact board representation.
+
+import unittest, copy, random
+from board import (
+    CompactBoard, AttackMapBoard, square_index, square_coordinates, piece_code, code_color, SQUARE_NAMES,
+    NEIGHBOURS, RAYS, HORSE_MOVES, ELEPHANT_MOVES, SOLDIER_MOVES,
+    EMPTY, GENERAL, CHARIOT, BLACK_FLAG
+)
+from pieces import Chariot, General, Horse
+from XiangqiGame import XiangqiGame
+
+class SquareTester(unittest.TestCase):
+    def test_square_index(self):
+        self.assertEqual(square_index('a', 1), 0)
+        self.assertEqual(square_index('i', 10), 89)
+        self.assertEqual(square_index('e', 4), 31)
+
+    def test_square_coordinates(self):
+        for square in range(90):
+            self.assertEqual(
+                square_index(*square_coordinates(square)),
+                square
+            )
+
+    def test_square_names(self):
+        self.assertEqual(SQUARE_NAMES[0], 'a1')
+        self.assertEqual(SQUARE_NAMES[89], 'i10')
+
+    def test_piece_code(self):
+        self.assertEqual(piece_code(General('red', 'e', 1)), GENERAL)
+        self.assertEqual(piece_code(Chariot('black', 'a', 10)), CHARIOT | BLACK_FLAG)
+        self.assertEqual(code_color(CHARIOT | BLACK_FLAG), 'black')
+        self.assertEqual(code_color(CHARIOT), 'red')
+
+class TableTester(unittest.TestCase):
+    def test_neighbours_corner(self):
+        self.assertCountEqual(
+            NEIGHBOURS[square_index('a', 1)],
+            (square_index('a', 2), square_index('b', 1))
+        )
+
+    def test_rays_lengths(self):
+        self.assertEqual(
+            sum(len(ray) for ray in RAYS[square_index('e', 5)]),
+            17
+        )
+
+    def test_horse_legs(self):
+        self.assertIn(
+            (square_index('c', 3), square_index('b', 2)),
+            HORSE_MOVES[square_index('b', 1)]
+        )
+
+    def test_elephant_river(self):
+        self.assertEqual(
+            [target for target, _eye in ELEPHANT_MOVES[0][square_index('c', 5)]],
+            [square_index('e', 3), square_index('a', 3)]
+        )
+
+    def test_soldier_river(self):
+        self.assertEqual(
+            len(SOLDIER_MOVES[0][square_index('e', 4)]),
+            1
+        )
+
+        self.assertEqual(
+            len(SOLDIER_MOVES[0][square_index('e', 6)]),
+            3
+        )
+
+class CompactBoardTester(unittest.TestCase):
+    def setUp(self):
+        self.game  = XiangqiGame()
+        self.board = CompactBoard.from_board(self.game._board)
+
+    def test_from_board(self):
+        self.assertEqual(
+            self.board.general_square('black'),
+            square_index('e', 10)
+        )
+
+        self.assertEqual(
+            self.board.get_code(square_index('a', 1)),
+            CHARIOT
+        )
+
+    def test_move_and_undo(self):
+        from_square = square_index('b', 3)
+        to_square   = square_index('b', 10)
+
+        captured = self.board.move(from_square, to_square)
+
+        self.assertEqual(self.board.get_code(from_square), EMPTY)
+        self.assertNotEqual(captured, EMPTY)
+
+        self.board.undo(from_square, to_square, captured)
+
+        self.assertEqual(
+            self.board.get_code(to_square),
+            captured
+        )
+
+    def test_start_legal_moves(self):
+        self.assertEqual(
+            len(list(self.board.generate_legal_moves('red'))),
+            44
+        )
+
+    def test_generals_facing(self):
+        self.assertFalse(self.board.generals_facing())
+
+        for row in (4, 7):
+            self.board.move(square_index('e', row), square_index('d', row))
+
+        self.assertTrue(self.board.generals_facing())
+
+    def test_horse_check(self):
+        board = copy.deepcopy( XiangqiGame.BLANK_BOARD )
+        board[1]['e'] = General('red', 'e', 1)
+        board[10]['d'] = General('black', 'd', 10)
+        board[3]['f'] = Horse('black', 'f', 3)
+
+        compact_board = CompactBoard.from_board(board)
+
+        self.assertTrue(compact_board.is_in_check('red'))
+
+        # Block the horses leg
+        compact_board.set_code(square_index('f', 2), CHARIOT)
+
+        self.assertFalse(compact_board.is_in_check('red'))
+
+    def test_matches_dict_board_over_random_games(self):
+        generator    = random.Random(2020)
+        compact_game = XiangqiGame(board_backend = "compact")
+
+        for _ply in range(60):
+            if self.game.get_game_state() != "UNFINISHED":
+                break
+
+            for color in ('red', 'black'):
+                self.assertEqual(
+                    compact_game.is_in_check(color),
+                    self.game.is_in_check(color)
+                )
+
+            legal_moves = self.game.legal_moves()
+
+            self.assertCountEqual(
+                compact_game.legal_moves(),
+                legal_moves
+            )
+
+            from_coord, to_coord = generator.choice(legal_moves)
+
+            self.assertTrue(self.game.make_move(from_coord, to_coord))
+            self.assertTrue(compact_game.make_move(from_coord, to_coord))
+
+class AttackMapBoardTester(unittest.TestCase):
+    def setUp(self):
+        self.game  = XiangqiGame(board_backend = "attack_map")
+        self.board = self.game._board_backend
+
+    def assert_map_matches_board(self):
+        # A map rebuilt from scratch and the reverse attack check should both agree with the
+        # incrementally updated map
+        rebuilt_board = AttackMapBoard.from_board(self.game._board)
+
+        for square in range(90):
+            for color_index in (0, 1):
+                self.assertEqual(
+                    self.board.attack_count(square, color_index),
+                    rebuilt_board.attack_count(square, color_index)
+                )
+
+                self.assertEqual(
+                    self.board.is_attacked(square, color_index),
+                    CompactBoard.is_attacked(self.board, square, color_index)
+                )
+
+    def test_start_attacks(self):
+        # The red chariot, horse and elephant all reach a3, as does the cannon on h3 over the
+        # cannon on b3, and no black piece does
+        self.assertEqual(self.board.attack_count(square_index('a', 3), 0), 4)
+        self.assertEqual(self.board.attack_count(square_index('a', 3), 1), 0)
+
+        # The red cannon on b3 attacks the black horse on b10 over the black cannon on b8
+        self.assertEqual(self.board.attack_count(square_index('b', 10), 0), 1)
+
+        self.assert_map_matches_board()
+
+    def test_map_after_random_moves_and_undo(self):
+        generator = random.Random(1)
+
+        for _ply in range(40):
+            legal_moves = self.game.legal_moves()
+
+            if not legal_moves:
+                break
+
+            self.game.make_move(*generator.choice(legal_moves))
+            self.assert_map_matches_board()
+
+        while self.game.pop_move():
+            pass
+
+        self.assert_map_matches_board()
+
+if __name__ == '__main__':
+    unittest.main()
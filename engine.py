@@ -0,0 +1,333 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Search engine for the XiangqiGame class.  Finds a move for the player to move using a
+#              negamax alpha-beta search with iterative deepening, stopping at a depth, node or time
+#              budget, or when cancelled from another thread.
+
+import threading, time
+from board import square_index
+from transposition import EXACT, LOWER_BOUND, UPPER_BOUND
+from evaluation import PIECE_VALUES
+
+# Score of being checkmated, less the number of moves until it happens so quicker mates are preferred
+MATE_SCORE = 100000
+
+# Scores at least this close to MATE_SCORE are mates, and are stored in the transposition table
+# relative to the position rather than the root so they stay correct wherever the position recurs
+MATE_THRESHOLD = MATE_SCORE - 1000
+
+# Limit on the extra moves the quiescence search plays past the search depth
+QUIESCENCE_DEPTH = 4
+
+class SearchAborted(Exception):
+    """
+    Raised inside the search when the node or time budget runs out or the search is cancelled
+    """
+
+class SearchEngine:
+    """
+    Negamax alpha-beta search that plays out moves with apply_move and takes them back with
+    pop_move, so the game searched is left unchanged. Only moves from the games own legal move
+    generator are searched, so the move returned is always legal.
+    """
+    def __init__(self, max_depth = 4, node_limit = None, time_limit = None, transposition_table = None):
+        """
+        Initialization method that takes the deepest iteration to search to, and optionally the
+        most positions to visit, the most seconds to spend and a TranspositionTable to reuse
+        results in, which may be shared between searches
+        """
+        self._max_depth           = max_depth
+        self._node_limit          = node_limit
+        self._time_limit          = time_limit
+        self._transposition_table = transposition_table
+        self._cancel_event = threading.Event()
+        self._deadline     = None
+        self._nodes        = 0
+        self._search_info  = {}
+
+    def cancel(self):
+        """
+        Stops a search running in another thread, which then returns the best move found by the
+        deepest iteration it completed. A cancel made before a search starts stops that search as
+        soon as it begins.
+        """
+        self._cancel_event.set()
+
+    def reset(self):
+        """
+        Withdraws a cancel that no search has used up yet
+        """
+        self._cancel_event.clear()
+
+    def get_search_info(self):
+        """
+        Returns a dict of the move, score, depth completed and positions visited by the last search
+        """
+        return dict(self._search_info)
+
+    def search(self, game):
+        """
+        Takes a game and returns the best move found for the player to move as a (from, to) tuple
+        of string coordinates, or None if the game is over or there are no legal moves
+        """
+        self._nodes       = 0
+        self._deadline    = time.perf_counter() + self._time_limit if self._time_limit is not None else None
+        self._search_info = { "move": None, "score": None, "depth": 0, "nodes": 0 }
+
+        # A cancel that arrived before the search started still stops it, and is used up once the
+        # search returns so the next search runs in full
+        try:
+            return self.search_iterations(game)
+        finally:
+            self._cancel_event.clear()
+
+    def search_iterations(self, game):
+        """
+        Runs the iterative deepening of search and returns its move
+        """
+        if game.get_game_state() != "UNFINISHED":
+            return None
+
+        if self._transposition_table is not None:
+            self._transposition_table.new_search()
+
+        root_moves = self.order_moves(game, list(game.generate_legal_moves(game.get_current_turn())))
+
+        if not root_moves:
+            return None
+
+        # Start from the first ordered move so there is always an answer even if the budget runs
+        # out during the first iteration
+        best_move = root_moves[0]
+
+        for depth in range(1, self._max_depth + 1):
+            try:
+                score, iteration_best = self.search_root(game, root_moves, depth)
+            except SearchAborted:
+                break
+
+            best_move = iteration_best
+
+            self._search_info.update({ "score": score, "depth": depth })
+
+            # Search the best move first in the next iteration
+            root_moves.remove(best_move)
+            root_moves.insert(0, best_move)
+
+            # No need to look deeper once a forced mate has been found
+            if abs(score) >= MATE_SCORE - self._max_depth:
+                break
+
+        from_coord_dict, to_coord_dict = best_move
+        move = (game.format_coord(from_coord_dict), game.format_coord(to_coord_dict))
+
+        self._search_info.update({ "move": move, "nodes": self._nodes })
+
+        return move
+
+    def search_root(self, game, root_moves, depth):
+        """
+        Searches every root move to the given depth and returns a tuple of the best score and move
+        """
+        alpha     = -MATE_SCORE - 1
+        beta      = MATE_SCORE + 1
+        best_move = root_moves[0]
+
+        for from_coord_dict, to_coord_dict in root_moves:
+            game.apply_move(from_coord_dict, to_coord_dict)
+
+            try:
+                score = -self.negamax(game, depth - 1, -beta, -alpha, 1)
+            finally:
+                game.pop_move()
+
+            if score > alpha:
+                alpha     = score
+                best_move = (from_coord_dict, to_coord_dict)
+
+        return alpha, best_move
+
+    def negamax(self, game, depth, alpha, beta, ply):
+        """
+        Returns the score of the position for the player to move, searched to the given depth
+        within the alpha-beta window
+        """
+        self.count_node()
+
+        if depth <= 0:
+            return self.quiescence(game, alpha, beta, QUIESCENCE_DEPTH)
+
+        position_hash = game.get_position_hash()
+        stored_move   = None
+
+        if self._transposition_table is not None:
+            entry = self._transposition_table.probe(position_hash)
+
+            if entry is not None:
+                stored_move  = entry['best_move']
+                stored_score = self.score_from_table(entry['score'], ply)
+
+                # A result searched at least as deep can be used if its bound settles this window
+                if entry['depth'] >= depth and (
+                    entry['bound'] == EXACT or
+                    (entry['bound'] == LOWER_BOUND and stored_score >= beta) or
+                    (entry['bound'] == UPPER_BOUND and stored_score <= alpha)
+                ):
+                    return stored_score
+
+        moves = list(game.generate_legal_moves(game.get_current_turn()))
+
+        # No legal moves is a loss in xiangqi, whether checkmate or stalemate
+        if not moves:
+            return -MATE_SCORE + ply
+
+        original_alpha = alpha
+        best_score     = -MATE_SCORE - 1
+        best_move      = None
+
+        for from_coord_dict, to_coord_dict in self.order_moves(game, moves, stored_move):
+            game.apply_move(from_coord_dict, to_coord_dict)
+
+            try:
+                score = -self.negamax(game, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                game.pop_move()
+
+            if score > best_score:
+                best_score = score
+                best_move  = (from_coord_dict, to_coord_dict)
+
+            if score > alpha:
+                alpha = score
+
+            if score >= beta:
+                break
+
+        if self._transposition_table is not None:
+            if best_score <= original_alpha:
+                bound = UPPER_BOUND
+            elif best_score >= beta:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+
+            self._transposition_table.store(
+                position_hash, depth, self.score_to_table(best_score, ply), bound, self.move_key(best_move)
+            )
+
+        return best_score
+
+    def quiescence(self, game, alpha, beta, depth):
+        """
+        Returns the score of the position for the player to move after playing out captures, so
+        the search does not stop in the middle of an exchange
+        """
+        stand_pat = self.evaluate(game)
+
+        if depth == 0 or stand_pat >= beta:
+            return stand_pat
+
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        captures = [
+            move for move in game.generate_legal_moves(game.get_current_turn())
+            if game.get_piece(move[1])
+        ]
+
+        for from_coord_dict, to_coord_dict in self.order_moves(game, captures):
+            self.count_node()
+            game.apply_move(from_coord_dict, to_coord_dict)
+
+            try:
+                score = -self.quiescence(game, -beta, -alpha, depth - 1)
+            finally:
+                game.pop_move()
+
+            if score >= beta:
+                return score
+
+            if score > alpha:
+                alpha = score
+
+        return alpha
+
+    def order_moves(self, game, moves, first_move = None):
+        """
+        Returns the moves sorted with the optional first move key (from move_key) first, then
+        captures of the most valuable pieces by the least valuable pieces, then the rest
+        """
+        def move_order(move):
+            if first_move is not None and self.move_key(move) == first_move:
+                return -MATE_SCORE
+
+            captured = game.get_piece(move[1])
+
+            if not captured:
+                return 0
+
+            return -(PIECE_VALUES[str(captured)] * 10 - PIECE_VALUES[str(game.get_piece(move[0]))])
+
+        return sorted(moves, key = move_order)
+
+    def move_key(self, move):
+        """
+        Takes a (from, to) tuple of coordinate dicts and returns it as a tuple of square indexes,
+        the form moves are kept in the transposition table
+        """
+        from_coord_dict, to_coord_dict = move
+
+        return (
+            square_index(from_coord_dict['column'], from_coord_dict['row']),
+            square_index(to_coord_dict['column'], to_coord_dict['row'])
+        )
+
+    def score_to_table(self, score, ply):
+        """
+        Returns a score as stored in the transposition table, with mate scores counted from the
+        position instead of from the root
+        """
+        if score >= MATE_THRESHOLD:
+            return score + ply
+
+        if score <= -MATE_THRESHOLD:
+            return score - ply
+
+        return score
+
+    def score_from_table(self, score, ply):
+        """
+        Returns a score read from the transposition table counted from the root again
+        """
+        if score >= MATE_THRESHOLD:
+            return score - ply
+
+        if score <= -MATE_THRESHOLD:
+            return score + ply
+
+        return score
+
+    def evaluate(self, game):
+        """
+        Returns the games static evaluation of the position from the point of view of the player
+        to move
+        """
+        score = game.evaluate()
+
+        return score if game.get_current_turn() == "red" else -score
+
+    def count_node(self):
+        """
+        Counts a visited position and raises SearchAborted if a budget has run out or the search
+        has been cancelled
+        """
+        self._nodes += 1
+
+        if self._node_limit is not None and self._nodes > self._node_limit:
+            raise SearchAborted()
+
+        if self._deadline is not None and time.perf_counter() > self._deadline:
+            raise SearchAborted()
+
+        if self._cancel_event.is_set():
+            raise SearchAborted()
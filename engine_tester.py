@@ -0,0 +1,114 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for the search engine.
+
+import unittest, copy, threading
+from XiangqiGame import XiangqiGame
+from engine import SearchEngine
+from pieces import Chariot, General, Horse
+
+class SearchEngineTester(unittest.TestCase):
+    def setUp(self):
+        self.game = XiangqiGame()
+
+    def set_up_pieces(self, red_pieces, black_pieces, current_turn):
+        self.game._board = copy.deepcopy( XiangqiGame.BLANK_BOARD )
+
+        for piece in list(red_pieces.values()) + list(black_pieces.values()):
+            coordinates = piece.get_coordinates()
+            self.game._board[coordinates['row']][coordinates['column']] = piece
+
+        self.game._red_pieces   = red_pieces
+        self.game._black_pieces = black_pieces
+        self.game._current_turn = current_turn
+        self.game.rebuild_position_caches()
+
+    def test_finds_mate_in_one(self):
+        self.set_up_pieces(
+            { 'G': General('red', 'd', 1) },
+            { 'G': General('black', 'e', 8), 'R1': Chariot('black', 'c', 6) },
+            "black"
+        )
+
+        # Both c6 d6 (checkmate) and c6 c2 (no legal moves left) win on the spot
+        self.game.make_move(*SearchEngine(max_depth = 2).search(self.game))
+
+        self.assertEqual(
+            self.game.get_game_state(),
+            "BLACK_WON"
+        )
+
+    def test_captures_hanging_piece(self):
+        self.set_up_pieces(
+            { 'G': General('red', 'e', 1), 'R1': Chariot('red', 'a', 1) },
+            { 'G': General('black', 'f', 10), 'H1': Horse('black', 'a', 7) },
+            "red"
+        )
+
+        self.assertEqual(
+            SearchEngine(max_depth = 2).search(self.game),
+            ('a1', 'a7')
+        )
+
+    def test_start_move_is_legal(self):
+        move = SearchEngine(max_depth = 2).search(self.game)
+
+        self.assertIn(move, self.game.legal_moves())
+
+    def test_game_unchanged_after_search(self):
+        self.game.make_move('h3', 'e3')
+        position_hash = self.game.get_position_hash()
+
+        SearchEngine(max_depth = 2).search(self.game)
+
+        self.assertEqual(self.game.get_position_hash(), position_hash)
+        self.assertEqual(self.game.get_current_turn(), "black")
+        self.assertEqual(self.game.get_move_history(), [('h3', 'e3')])
+
+    def test_node_limit(self):
+        engine = SearchEngine(max_depth = 10, node_limit = 500)
+        move   = engine.search(self.game)
+
+        self.assertIn(move, self.game.legal_moves())
+        self.assertLess(engine.get_search_info()['depth'], 10)
+
+    def test_cancel(self):
+        engine = SearchEngine(max_depth = 20)
+        result = []
+        thread = threading.Thread(target = lambda: result.append(engine.search(self.game)))
+
+        # The cancel may land before or after the search starts, either way the search stops
+        thread.start()
+        engine.cancel()
+        thread.join(timeout = 30)
+
+        self.assertFalse(thread.is_alive())
+        self.assertIn(result[0], self.game.legal_moves())
+
+    def test_cancel_before_search(self):
+        engine = SearchEngine(max_depth = 1)
+        engine.cancel()
+
+        # The cancel is not lost, the search stops at once with its first ordered move
+        self.assertIn(engine.search(self.game), self.game.legal_moves())
+        self.assertEqual(engine.get_search_info()['depth'], 0)
+
+        # The cancel is used up, so the next search runs
+        engine.search(self.game)
+        self.assertEqual(engine.get_search_info()['depth'], 1)
+
+    def test_reset(self):
+        engine = SearchEngine(max_depth = 1)
+        engine.cancel()
+        engine.reset()
+
+        engine.search(self.game)
+        self.assertEqual(engine.get_search_info()['depth'], 1)
+
+    def test_game_over(self):
+        self.game._game_state = "RED_WON"
+
+        self.assertIsNone(SearchEngine().search(self.game))
+
+if __name__ == '__main__':
+    unittest.main()
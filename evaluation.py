@@ -0,0 +1,107 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Static evaluation tables for the XiangqiGame class.  A position is scored by adding
+#              one value for every piece code and square pair, the piece's material plus a bonus
+#              for its square, so a move only needs a few additions to update the score.  Scores
+#              are from red's point of view, positive when red is ahead.
+
+from board import (
+    COLUMNS, HORSE_MOVES, GENERAL, ADVISOR, ELEPHANT, HORSE, CHARIOT, CANNON, SOLDIER, BLACK_FLAG,
+    LETTER_CODES, square_index, piece_code
+)
+
+# Constant of the material value of each piece, by the letter the piece classes print as
+PIECE_VALUES = {
+    'G': 0,
+    'A': 20,
+    'E': 20,
+    'H': 40,
+    'R': 90,
+    'C': 45,
+    'S': 10
+}
+
+def square_bonus(piece_type, row, column_index):
+    """
+    Returns the bonus for a red piece of the given type on a square, given by row (1 through 10)
+    and column index (0 through 8). Black pieces use the bonus of the square mirrored across
+    the river.
+    """
+    files_from_center = abs(column_index - 4)
+
+    # Soldiers are worth little until they cross the river, then more the closer they get to
+    # the palace, but a soldier on the last row can only move sideways
+    if piece_type == SOLDIER:
+        if row <= 5:
+            return 0
+
+        if row == 10:
+            return 2
+
+        return 10 + (row - 6) * 2 - files_from_center
+
+    # Horses are worth more where they can reach more squares, and further up the board
+    if piece_type == HORSE:
+        return (len(HORSE_MOVES[square_index(COLUMNS[column_index], row)]) - 6) * 2 + min(row - 1, 5)
+
+    # Chariots on the open middle rows and central files are the most active
+    if piece_type == CHARIOT:
+        return (2 if 4 <= row <= 7 else 0) + (2 if files_from_center <= 1 else 0)
+
+    # The central cannon is the classic opening, and cannons deep in the opposing half lose screens
+    if piece_type == CANNON:
+        return (4 if column_index == 4 and row <= 3 else 0) - (3 if row >= 9 else 0)
+
+    # Advisors and elephants guard the general best from the middle of their positions
+    if piece_type in (ADVISOR, ELEPHANT):
+        return 2 if column_index == 4 else 0
+
+    # Generals are safest on their back row
+    if piece_type == GENERAL:
+        return -3 * (row - 1) + (1 if column_index == 4 else 0)
+
+    return 0
+
+def _build_tables():
+    """
+    Returns a tuple of per square value tuples indexed by piece code (0 through 15, the empty
+    code and the unused codes score zero so lookups never need a check). Black values are
+    negative so every piece's value is simply added.
+    """
+    tables = [(0,) * 90 for _code in range(16)]
+
+    for letter, piece_type in LETTER_CODES.items():
+        material = PIECE_VALUES[letter]
+
+        tables[piece_type] = tuple(
+            material + square_bonus(piece_type, square // 9 + 1, square % 9)
+            for square in range(90)
+        )
+        tables[piece_type | BLACK_FLAG] = tuple(
+            -(material + square_bonus(piece_type, 10 - square // 9, square % 9))
+            for square in range(90)
+        )
+
+    return tuple(tables)
+
+PIECE_SQUARE_VALUES = _build_tables()
+
+def score_board(board):
+    """
+    Takes a nested dict game board and returns the full score of the position. Only needed when
+    a game is set up, moves update the score with the differences instead.
+    """
+    score = 0
+
+    for row, columns in board.items():
+        for column, piece in columns.items():
+            if piece:
+                score += PIECE_SQUARE_VALUES[piece_code(piece)][square_index(column, row)]
+
+    return score
+
+def score_codes(codes):
+    """
+    Takes the 90 piece codes of a position, indexed by square, and returns its full score
+    """
+    return sum(PIECE_SQUARE_VALUES[code][square] for square, code in enumerate(codes) if code)
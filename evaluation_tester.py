@@ -0,0 +1,80 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for the static evaluation tables and the incremental score.
+
+import unittest, random
+from evaluation import PIECE_SQUARE_VALUES, PIECE_VALUES, score_board, square_bonus
+from board import SOLDIER, HORSE, CHARIOT, BLACK_FLAG, square_index
+from engine import SearchEngine
+from XiangqiGame import XiangqiGame
+
+class EvaluationTester(unittest.TestCase):
+    def test_start_position_is_even(self):
+        self.assertEqual(XiangqiGame().evaluate(), 0)
+
+    def test_black_tables_mirror_red(self):
+        for piece_type in range(1, 8):
+            for square in range(90):
+                mirrored_square = (9 - square // 9) * 9 + square % 9
+
+                self.assertEqual(
+                    PIECE_SQUARE_VALUES[piece_type | BLACK_FLAG][mirrored_square],
+                    -PIECE_SQUARE_VALUES[piece_type][square]
+                )
+
+    def test_square_bonuses(self):
+        # A soldier gains value once it crosses the river
+        self.assertEqual(square_bonus(SOLDIER, 5, 4), 0)
+        self.assertGreater(square_bonus(SOLDIER, 6, 4), 0)
+
+        # A horse in the middle of the board can reach more squares than one in the corner
+        self.assertGreater(square_bonus(HORSE, 5, 4), square_bonus(HORSE, 1, 0))
+
+        self.assertEqual(PIECE_SQUARE_VALUES[CHARIOT][square_index('a', 1)], PIECE_VALUES['R'])
+
+    def test_capture_changes_score(self):
+        game = XiangqiGame()
+
+        # Red's cannon takes the black horse
+        game.make_move('b3', 'b10')
+
+        self.assertGreater(game.evaluate(), PIECE_VALUES['H'] - 10)
+
+        game.pop_move()
+
+        self.assertEqual(game.evaluate(), 0)
+
+    def test_incremental_score_matches_full_score(self):
+        generator = random.Random(7)
+        game      = XiangqiGame(board_backend = "compact")
+
+        for _ply in range(120):
+            legal_moves = game.legal_moves()
+
+            if game.get_game_state() != "UNFINISHED":
+                break
+
+            game.make_move(*generator.choice(legal_moves))
+
+            self.assertEqual(game.evaluate(), score_board(game._board))
+
+        while game.pop_move():
+            self.assertEqual(game.evaluate(), score_board(game._board))
+
+        self.assertEqual(game.evaluate(), 0)
+
+    def test_fen_and_snapshot_scores(self):
+        game = XiangqiGame.from_fen("4k4/9/9/9/9/9/9/9/9/R2K5 w")
+
+        self.assertEqual(game.evaluate(), score_board(game._board))
+        self.assertEqual(XiangqiGame.from_snapshot(game.snapshot()).evaluate(), game.evaluate())
+        self.assertGreater(game.evaluate(), 0)
+
+    def test_engine_scores_for_player_to_move(self):
+        game   = XiangqiGame.from_fen("4k4/9/9/9/9/9/9/9/9/R2K5 b")
+        engine = SearchEngine()
+
+        self.assertEqual(engine.evaluate(game), -game.evaluate())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,278 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Opening book for xiangqi built from game records.  The book is a binary file of
+#              entries sorted by position hash, each a move played from that position with the
+#              number of games and their results, and is read through mmap with a binary search
+#              so a position's moves are found without loading the book.
+#
+# Usage: python opening_book.py build games.pgn book.xqb [--plies N] [--min-games N]
+#        python opening_book.py probe book.xqb [--fen FEN] [moves ...]
+
+import argparse, mmap, struct, sys
+from XiangqiGame import XiangqiGame
+from board import SQUARE_NAMES
+from records import RESULT_STATES, read_games, record_moves, load_position
+
+# File Layout #
+###############
+# header     -> magic b'XQOB', version (u16), reserved (u16), entry count (u64)
+# entries    -> position hash (u64), from square (u8), to square (u8), games (u32), and the wins,
+#               draws and losses of the player making the move (u32 each), sorted by position
+#               hash and then move
+#
+# All numbers are little endian.
+BOOK_MAGIC    = b'XQOB'
+BOOK_VERSION  = 1
+HEADER_FORMAT = struct.Struct('<4sHHQ')
+ENTRY_FORMAT  = struct.Struct('<QBBIIII')
+HASH_FORMAT   = struct.Struct('<Q')
+
+# Default number of plies from the start of each game that are added to the book
+DEFAULT_PLIES = 20
+
+# Constant of the winning color of each finished game state, None for a draw
+STATE_WINNERS = {
+    "RED_WON": "red",
+    "BLACK_WON": "black",
+    "DRAW": None
+}
+
+# Constant of the square index of each square name (ex 'a1' -> 0)
+SQUARE_NUMBERS = { name: square for square, name in enumerate(SQUARE_NAMES) }
+
+def game_result(record, game_state):
+    """
+    Takes a game record and the state its replay reached, and returns the winning color, None
+    for a draw, or False if the game has no result. The records result token is used first.
+    """
+    game_state = RESULT_STATES.get(record['result'], game_state)
+
+    return STATE_WINNERS.get(game_state, False)
+
+def first_mover(record):
+    """
+    Takes a game record and returns the color string of the player making its first move, read
+    from the side to move field of its FEN tag if it has one
+    """
+    fields = record['tags'].get('FEN', "").split()
+
+    return XiangqiGame.FEN_TURNS[fields[1]] if len(fields) > 1 else "red"
+
+def collect_book_moves(source, plies = DEFAULT_PLIES, notation = "auto"):
+    """
+    Takes a file path or iterable of lines of PGN style game records and returns a tuple of a
+    dict of (position hash, from square, to square) to [games, wins, draws, losses] counts over
+    the first plies moves of every game that replays without an illegal move, and the number of
+    games skipped. Each game is replayed once, by record_moves, which also gives the position
+    hash before each move.
+    """
+    book_moves = {}
+    skipped    = 0
+
+    for record in read_games(source):
+        moves, game_state, illegal_move, hashes = record_moves(record, notation, with_hashes = True)
+
+        if illegal_move:
+            skipped += 1
+            continue
+
+        winner = game_result(record, game_state)
+        mover  = first_mover(record)
+
+        for (from_coord, to_coord), position_hash in zip(moves[:plies], hashes):
+            counts = book_moves.setdefault(
+                (position_hash, SQUARE_NUMBERS[from_coord], SQUARE_NUMBERS[to_coord]), [0, 0, 0, 0]
+            )
+
+            counts[0] += 1
+
+            if winner is None:
+                counts[2] += 1
+            elif winner:
+                counts[1 if winner == mover else 3] += 1
+
+            mover = XiangqiGame.OPPOSITE_COLOR_DICT[mover]
+
+    return book_moves, skipped
+
+def write_book(book_moves, path, min_games = 1):
+    """
+    Takes a dict of book moves from collect_book_moves and writes the moves played in at least
+    min_games games to a new book at path, sorted for binary search. Returns the number of
+    entries written.
+    """
+    entries = sorted(
+        (key, counts) for key, counts in book_moves.items() if counts[0] >= min_games
+    )
+
+    with open(path, "wb") as book_file:
+        book_file.write(HEADER_FORMAT.pack(BOOK_MAGIC, BOOK_VERSION, 0, len(entries)))
+
+        for (position_hash, from_square, to_square), counts in entries:
+            book_file.write(ENTRY_FORMAT.pack(position_hash, from_square, to_square, *counts))
+
+    return len(entries)
+
+def build_book(source, path, plies = DEFAULT_PLIES, min_games = 1, notation = "auto"):
+    """
+    Builds a book at path from the first plies moves of the game records in source. Returns a
+    tuple of the number of entries written and games skipped for illegal moves.
+    """
+    book_moves, skipped = collect_book_moves(source, plies, notation)
+
+    return write_book(book_moves, path, min_games), skipped
+
+class OpeningBook:
+    """
+    Reads a book through mmap. A position's moves are found by a binary search over the sorted
+    entries, reading only the few entries the search touches.
+    """
+    def __init__(self, path):
+        """
+        Initialization method that takes the path of the book, raising a ValueError if it is not
+        a book
+        """
+        with open(path, "rb") as book_file:
+            self._map = mmap.mmap(book_file.fileno(), 0, access = mmap.ACCESS_READ)
+
+        magic, version, _reserved, entry_count = HEADER_FORMAT.unpack_from(self._map)
+
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            self.close()
+            raise ValueError(f"Not a version {BOOK_VERSION} opening book: {path}")
+
+        self._entry_count = entry_count
+
+    def __enter__(self):
+        """
+        Returns the book for use in a with statement
+        """
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        """
+        Closes the book at the end of a with statement
+        """
+        self.close()
+
+    def __len__(self):
+        """
+        Returns the number of entries in the book
+        """
+        return self._entry_count
+
+    def close(self):
+        """
+        Closes the mapped file
+        """
+        self._map.close()
+
+    def entry_hash(self, entry_number):
+        """
+        Returns the position hash of an entry
+        """
+        return HASH_FORMAT.unpack_from(self._map, HEADER_FORMAT.size + entry_number * ENTRY_FORMAT.size)[0]
+
+    def get_entries(self, position_hash):
+        """
+        Takes a position hash and returns a list of the book moves from that position, most
+        played first, each a dict of the move as a (from, to) tuple of string coordinates and
+        the games, wins, draws and losses of the player making it
+        """
+        # Binary search for the first entry of the position
+        low  = 0
+        high = self._entry_count
+
+        while low < high:
+            middle = (low + high) // 2
+
+            if self.entry_hash(middle) < position_hash:
+                low = middle + 1
+            else:
+                high = middle
+
+        entries = []
+
+        for entry_number in range(low, self._entry_count):
+            entry_hash, from_square, to_square, games, wins, draws, losses = ENTRY_FORMAT.unpack_from(
+                self._map, HEADER_FORMAT.size + entry_number * ENTRY_FORMAT.size
+            )
+
+            if entry_hash != position_hash:
+                break
+
+            entries.append({
+                "move": (SQUARE_NAMES[from_square], SQUARE_NAMES[to_square]),
+                "games": games,
+                "wins": wins,
+                "draws": draws,
+                "losses": losses
+            })
+
+        entries.sort(key = lambda entry: -entry['games'])
+
+        return entries
+
+    def get_moves(self, game):
+        """
+        Takes a game and returns the book entries for its position, as get_entries, keeping only
+        moves that are legal in the game in case two positions share a hash
+        """
+        entries = self.get_entries(game.get_position_hash())
+        legal   = game.validate_moves([entry['move'] for entry in entries], with_reasons = False)
+
+        return [entry for entry, is_legal in zip(entries, legal) if is_legal]
+
+    def choose_move(self, game, generator = None):
+        """
+        Takes a game and returns a book move for it as a (from, to) tuple of string coordinates,
+        or None if the position is not in the book. The most played move is returned, or with a
+        random generator a move picked at random weighted by the games it was played in.
+        """
+        entries = self.get_moves(game)
+
+        if not entries:
+            return None
+
+        if generator is None:
+            return entries[0]['move']
+
+        return generator.choices(entries, [entry['games'] for entry in entries])[0]['move']
+
+def main(arguments = None):
+    """
+    Command line entry point, returns the exit status
+    """
+    parser       = argparse.ArgumentParser(description = "Build and probe xiangqi opening books.")
+    subparsers   = parser.add_subparsers(dest = "command", required = True)
+    build_parser = subparsers.add_parser("build", help = "build a book from PGN style records")
+    build_parser.add_argument("source", help = "file of PGN style game records")
+    build_parser.add_argument("path", help = "book to write")
+    build_parser.add_argument("--plies", type = int, default = DEFAULT_PLIES, help = "plies of each game to add")
+    build_parser.add_argument("--min-games", type = int, default = 1, help = "games a move needs to be kept")
+    probe_parser = subparsers.add_parser("probe", help = "print the book moves of a position")
+    probe_parser.add_argument("path", help = "book to read")
+    probe_parser.add_argument("--fen", default = None, help = "position to start from")
+    probe_parser.add_argument("moves", nargs = "*", help = "joined coordinate moves to play first (ex h3e3)")
+    options = parser.parse_args(arguments)
+
+    if options.command == "build":
+        entries, skipped = build_book(options.source, options.path, options.plies, options.min_games)
+        print(f"{entries} book entries written, {skipped} games skipped with illegal moves")
+        return 0
+
+    try:
+        game = load_position(options.moves, fen = options.fen)
+    except ValueError as error:
+        print(error)
+        return 1
+
+    with OpeningBook(options.path) as book:
+        for entry in book.get_moves(game):
+            from_coord, to_coord = entry['move']
+            print(f"{from_coord}{to_coord} games {entry['games']} +{entry['wins']} ={entry['draws']} -{entry['losses']}")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
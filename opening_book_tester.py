@@ -0,0 +1,120 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for the opening book builder and reader.
+
+import unittest, contextlib, io, os, random, tempfile
+from XiangqiGame import XiangqiGame
+from opening_book import OpeningBook, build_book, collect_book_moves, main
+
+# Three games starting with a central cannon, and one with an illegal fourth move
+RECORDS = """[Event "Book"]
+1. H2-E2 H9-G7 2. H0-G2 I9-H9 1-0
+
+1. H2-E2 B9-C7 2. H0-G2 0-1
+
+1. B2-E2 H9-G7 1/2-1/2
+
+[Event "Illegal"]
+1. h2e2 h9g7 2. h0g2 a9a5 1-0
+"""
+
+class OpeningBookTester(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path      = os.path.join(self.directory.name, "book.xqb")
+        self.source    = os.path.join(self.directory.name, "games.pgn")
+
+        with open(self.source, "w") as source_file:
+            source_file.write(RECORDS)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_build_counts(self):
+        entries, skipped = build_book(self.source, self.path)
+
+        self.assertEqual((entries, skipped), (8, 1))
+
+        with OpeningBook(self.path) as book:
+            self.assertEqual(len(book), 8)
+
+            # Both central cannon openings are played from the start, h3e3 twice
+            self.assertEqual(book.get_moves(XiangqiGame()), [
+                {"move": ('h3', 'e3'), "games": 2, "wins": 1, "draws": 0, "losses": 1},
+                {"move": ('b3', 'e3'), "games": 1, "wins": 0, "draws": 1, "losses": 0}
+            ])
+
+    def test_results_are_for_the_player_to_move(self):
+        build_book(self.source, self.path)
+
+        game = XiangqiGame()
+        game.make_move('h3', 'e3')
+
+        with OpeningBook(self.path) as book:
+            self.assertCountEqual(book.get_moves(game), [
+                {"move": ('h10', 'g8'), "games": 1, "wins": 0, "draws": 0, "losses": 1},
+                {"move": ('b10', 'c8'), "games": 1, "wins": 1, "draws": 0, "losses": 0}
+            ])
+
+    def test_entries_are_sorted(self):
+        build_book(self.source, self.path)
+
+        with OpeningBook(self.path) as book:
+            hashes = [book.entry_hash(entry_number) for entry_number in range(len(book))]
+
+        self.assertEqual(hashes, sorted(hashes))
+
+    def test_game_from_fen(self):
+        # Black moves first, and loses, so the move counts as a loss for black
+        records = '[FEN "4k4/9/9/9/9/9/9/9/R8/1R1K5 b"]\n1. e9f9 b0b9 1-0\n'
+
+        book_moves, _skipped = collect_book_moves(io.StringIO(records))
+
+        self.assertEqual(sorted(book_moves.values()), [[1, 0, 0, 1], [1, 1, 0, 0]])
+
+    def test_plies_and_min_games(self):
+        book_moves, _skipped = collect_book_moves(self.source, plies = 1)
+
+        self.assertEqual(sorted(counts[0] for counts in book_moves.values()), [1, 2])
+        self.assertEqual(build_book(self.source, self.path, min_games = 2), (1, 1))
+
+    def test_positions_out_of_book(self):
+        build_book(self.source, self.path)
+
+        game = XiangqiGame()
+        game.make_move('a4', 'a5')
+
+        with OpeningBook(self.path) as book:
+            self.assertEqual(book.get_moves(game), [])
+            self.assertIsNone(book.choose_move(game))
+            self.assertEqual(book.get_entries(0), [])
+            self.assertEqual(book.get_entries(2 ** 64 - 1), [])
+
+    def test_choose_move(self):
+        build_book(self.source, self.path)
+
+        with OpeningBook(self.path) as book:
+            self.assertEqual(book.choose_move(XiangqiGame()), ('h3', 'e3'))
+
+            moves = {book.choose_move(XiangqiGame(), random.Random(seed)) for seed in range(20)}
+
+        self.assertEqual(moves, {('h3', 'e3'), ('b3', 'e3')})
+
+    def test_not_a_book(self):
+        with self.assertRaises(ValueError):
+            OpeningBook(self.source)
+
+    def test_main(self):
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(main(["build", self.source, self.path]), 0)
+            self.assertEqual(main(["probe", self.path, "h3e3"]), 0)
+            self.assertEqual(main(["probe", self.path, "e1e3"]), 1)
+
+        self.assertIn("8 book entries written, 1 games skipped", output.getvalue())
+        self.assertIn("h10g8 games 1 +0 =0 -1", output.getvalue())
+        self.assertIn("Illegal move: e1e3", output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
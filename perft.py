@@ -0,0 +1,202 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Perft runner for the XiangqiGame class.  Counts the positions reached by every legal
+#              move sequence to a given depth, to check move generation against known counts and
+#              to measure how fast it runs.
+#
+# Usage: python perft.py [--depth N] [--divide] [--backend compact] [--fen FEN] [--moves h3e3 h8e8 ...]
+#        python perft.py --check [--depth N]
+#        python perft.py --check-queries N [--backend attack_map]
+
+import argparse, random, sys, time
+from XiangqiGame import XiangqiGame
+from records import load_position
+
+# Constant of positions with known good perft counts by depth.  Positions are described by a FEN
+# (None for the starting position) and the moves played from it.
+PERFT_POSITIONS = [
+    {
+        "name": "start",
+        "fen": None,
+        "moves": [],
+        "counts": { 1: 44, 2: 1920, 3: 79666, 4: 3290240, 5: 133312995 }
+    },
+    {
+        "name": "position 2",
+        "fen": "r1ba1a3/4kn3/2n1b4/pNp1p1p1p/4c4/6P2/P1P2R2P/1CcC5/9/2BAKAB2 w - - 0 1",
+        "moves": [],
+        "counts": { 1: 38, 2: 1128, 3: 43929, 4: 1339047, 5: 53112976 }
+    },
+    {
+        "name": "position 3",
+        "fen": "1cbak4/9/n2a5/2p1p3p/5cp2/2n2N3/6PCP/3AB4/2C6/3A1K1N1 w - - 0 1",
+        "moves": [],
+        "counts": { 1: 7, 2: 281, 3: 8620, 4: 326201, 5: 10369923 }
+    },
+    {
+        "name": "position 4",
+        "fen": "5a3/3k5/3aR4/9/5r3/5n3/9/3A1A3/5K3/2BC2B2 w - - 0 1",
+        "moves": [],
+        "counts": { 1: 25, 2: 424, 3: 9850, 4: 202884, 5: 4739553 }
+    },
+    {
+        "name": "position 5",
+        "fen": "CRN1k1b2/3ca4/4ba3/9/2nr5/9/9/4B4/4A4/4KA3 w - - 0 1",
+        "moves": [],
+        "counts": { 1: 28, 2: 516, 3: 14808, 4: 395483, 5: 11842230 }
+    },
+    {
+        "name": "position 6",
+        "fen": "R1N1k1b2/9/3aba3/9/2nr5/2B6/9/4B4/4A4/4KA3 w - - 0 1",
+        "moves": [],
+        "counts": { 1: 21, 2: 364, 3: 7626, 4: 162837, 5: 3500505 }
+    },
+    {
+        "name": "position 7",
+        "fen": "C1nNk4/9/9/9/9/9/n1pp5/B3C4/9/3A1K3 w - - 0 1",
+        "moves": [],
+        "counts": { 1: 28, 2: 222, 3: 6241, 4: 64971, 5: 1914306 }
+    },
+    {
+        "name": "position 8",
+        "fen": "4ka3/4a4/9/9/4N4/p8/9/4C3c/7n1/2BK5 w - - 0 1",
+        "moves": [],
+        "counts": { 1: 23, 2: 345, 3: 8124, 4: 149272, 5: 3513104 }
+    },
+    {
+        "name": "position 9",
+        "fen": "2b1ka3/9/b3N4/4n4/9/9/9/4C4/2p6/2BK5 w - - 0 1",
+        "moves": [],
+        "counts": { 1: 21, 2: 195, 3: 3883, 4: 48060, 5: 933096 }
+    },
+    {
+        "name": "position 10",
+        "fen": "1C2ka3/9/C1Nab1n2/p3p3p/6p2/9/P3P3P/3AB4/3p2c2/c1BAK4 w - - 0 1",
+        "moves": [],
+        "counts": { 1: 30, 2: 830, 3: 22787, 4: 649866, 5: 17920736 }
+    },
+    {
+        "name": "position 11",
+        "fen": "CnN1k1b2/c3a4/4ba3/9/2nr5/9/9/4C4/4A4/4KA3 w - - 0 1",
+        "moves": [],
+        "counts": { 1: 19, 2: 583, 3: 11714, 4: 376467, 5: 8148177 }
+    },
+]
+
+def run_perft(game, depth):
+    """
+    Runs perft on the game to the given depth and returns a tuple of the node count and the
+    seconds taken
+    """
+    start_time = time.perf_counter()
+    nodes      = game.perft(depth)
+
+    return nodes, time.perf_counter() - start_time
+
+def format_result(depth, nodes, seconds):
+    """
+    Returns a line reporting a perft result with its speed in nodes per second
+    """
+    nodes_per_second = nodes / seconds if seconds > 0 else float('inf')
+
+    return f"depth {depth}: {nodes} nodes in {seconds:.3f}s ({nodes_per_second:,.0f} nodes/s)"
+
+def run_check_benchmark(board_backend = "dict", checks_per_move = 20, games = 20, plies = 80):
+    """
+    Plays seeded random games, asking is_in_check for both colors the given number of times
+    after every move, as a check heavy workload such as a search probing positions would.
+    Returns a tuple of the number of moves made and the seconds taken.
+    """
+    moves      = 0
+    start_time = time.perf_counter()
+
+    for seed in range(games):
+        generator = random.Random(seed)
+        game      = XiangqiGame(board_backend = board_backend, lazy_game_state = True)
+
+        for _ply in range(plies):
+            legal_moves = game.legal_moves()
+
+            if not legal_moves:
+                break
+
+            # Sorted so every backend plays the same games whatever order it generates moves in
+            game.make_move(*generator.choice(sorted(legal_moves)))
+            moves += 1
+
+            for _check in range(checks_per_move):
+                game.is_in_check("red")
+                game.is_in_check("black")
+
+    return moves, time.perf_counter() - start_time
+
+def check_known_counts(max_depth, board_backend = "dict"):
+    """
+    Runs every position in PERFT_POSITIONS up to the given depth and returns a list of
+    (name, depth, expected, actual) tuples for every count that did not match
+    """
+    mismatches = []
+
+    for position in PERFT_POSITIONS:
+        game = load_position(position['moves'], board_backend, position['fen'])
+
+        for depth, expected in sorted(position['counts'].items()):
+            if depth > max_depth:
+                break
+
+            actual = game.perft(depth)
+
+            if actual != expected:
+                mismatches.append((position['name'], depth, expected, actual))
+
+    return mismatches
+
+def main(arguments = None):
+    """
+    Command line entry point, returns the exit status
+    """
+    parser = argparse.ArgumentParser(description = "Count and time xiangqi move generation.")
+    parser.add_argument("--depth", type = int, default = 3, help = "depth to search to")
+    parser.add_argument("--divide", action = "store_true", help = "print the count below each move")
+    parser.add_argument("--backend", default = "dict", choices = sorted(XiangqiGame.BOARD_BACKENDS))
+    parser.add_argument("--fen", default = None, help = "position to start from instead of the start")
+    parser.add_argument("--moves", nargs = "*", default = [], help = "moves to play first, ex h3e3")
+    parser.add_argument("--check", action = "store_true", help = "check the known counts up to depth")
+    parser.add_argument("--check-queries", type = int, default = None, help = "time random games asking for checks this often per move")
+    options = parser.parse_args(arguments)
+
+    if options.check_queries is not None:
+        moves, seconds = run_check_benchmark(options.backend, options.check_queries)
+        print(f"{moves} moves with {options.check_queries} check queries each in {seconds:.3f}s ({moves / seconds:,.0f} moves/s)")
+
+        return 0
+
+    if options.check:
+        mismatches = check_known_counts(options.depth, options.backend)
+
+        for name, depth, expected, actual in mismatches:
+            print(f"{name} depth {depth}: expected {expected}, got {actual}")
+
+        print("all counts match" if not mismatches else f"{len(mismatches)} counts do not match")
+
+        return 1 if mismatches else 0
+
+    game = load_position(options.moves, options.backend, options.fen)
+
+    if options.divide:
+        start_time = time.perf_counter()
+        results    = game.divide(options.depth)
+        seconds    = time.perf_counter() - start_time
+
+        for (from_coord, to_coord), nodes in sorted(results.items()):
+            print(f"{from_coord}{to_coord}: {nodes}")
+
+        print(format_result(options.depth, sum(results.values()), seconds))
+    else:
+        for depth in range(1, options.depth + 1):
+            print(format_result(depth, *run_perft(game, depth)))
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for perft and divide, checking move generation against known counts.
+
+import unittest, contextlib, io
+from XiangqiGame import XiangqiGame
+from perft import load_position, check_known_counts, run_check_benchmark, main
+
+class PerftTester(unittest.TestCase):
+    def setUp(self):
+        self.game = XiangqiGame()
+
+    def test_perft_start(self):
+        self.assertEqual(self.game.perft(0), 1)
+        self.assertEqual(self.game.perft(1), 44)
+        self.assertEqual(self.game.perft(2), 1920)
+
+    def test_perft_start_depth_3(self):
+        game = XiangqiGame(board_backend = "compact")
+
+        self.assertEqual(game.perft(3), 79666)
+
+    def test_perft_leaves_game_unchanged(self):
+        start_hash = self.game.get_position_hash()
+        self.game.perft(2)
+
+        self.assertEqual(self.game.get_position_hash(), start_hash)
+        self.assertEqual(self.game.get_move_history(), [])
+        self.assertEqual(self.game.get_current_turn(), "red")
+
+    def test_divide(self):
+        results = self.game.divide(2)
+
+        self.assertEqual(len(results), 44)
+        self.assertEqual(sum(results.values()), 1920)
+        self.assertIn(('h3', 'e3'), results)
+
+    def test_perft_after_moves(self):
+        game = load_position(['h3e3', 'h8e8'])
+
+        # Perft from a position after moves matches on both board backends
+        self.assertEqual(
+            game.perft(2),
+            load_position(['h3e3', 'h8e8'], "compact").perft(2)
+        )
+
+    def test_perft_from_fen(self):
+        game = load_position([], "compact", "r1ba1a3/4kn3/2n1b4/pNp1p1p1p/4c4/6P2/P1P2R2P/1CcC5/9/2BAKAB2 w - - 0 1")
+
+        self.assertEqual(game.perft(2), 1128)
+
+    def test_check_known_counts(self):
+        self.assertEqual(
+            check_known_counts(2),
+            []
+        )
+
+    def test_main(self):
+        output = io.StringIO()
+
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(main(["--check", "--depth", "1"]), 0)
+            self.assertEqual(main(["--depth", "1", "--moves", "h3e3"]), 0)
+
+        self.assertIn("all counts match", output.getvalue())
+
+    def test_check_benchmark(self):
+        # Every backend plays the same seeded games
+        moves = { run_check_benchmark(board_backend, 2, games = 2, plies = 20)[0] for board_backend in XiangqiGame.BOARD_BACKENDS }
+
+        self.assertEqual(moves, { 40 })
+
+if __name__ == '__main__':
+    unittest.main()
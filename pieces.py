@@ -3,10 +3,52 @@
 # Description: Pieces to be used by the XiangqiGame class.  Represents 7 different piece classes
 #              that all inherit from a base piece class for shared logic.
 
+from board import (
+    COLUMNS, COLORS, SQUARE_COORDINATES, CODE_LETTERS, BLACK_FLAG, TYPE_MASK, piece_code,
+    HORSE_MOVES, ELEPHANT_MOVES, ADVISOR_MOVES, GENERAL_MOVES, SOLDIER_MOVES
+)
+
+def _build_move_table(color_tables):
+    """
+    Converts a pair of per square move tables from the board module, indexed by color index,
+    into a dict of color string to a dict of every (column, row) square to a dict of each
+    destination (column, row) to the (column, row) square that blocks it, or None
+    """
+    move_table = {}
+
+    for color, square_table in zip(COLORS, color_tables):
+        move_table[color] = {}
+
+        for square, moves in enumerate(square_table):
+            destinations = {}
+
+            for move in moves:
+                # Moves with a blocking square are (destination, block) pairs
+                if isinstance(move, tuple):
+                    destinations[SQUARE_COORDINATES[move[0]]] = SQUARE_COORDINATES[move[1]]
+                else:
+                    destinations[SQUARE_COORDINATES[move]] = None
+
+            move_table[color][SQUARE_COORDINATES[square]] = destinations
+
+    return move_table
+
+# Constant move tables for the pieces with a fixed movement pattern, built once at import. Each is
+# a dict of color to origin (column, row) to a dict of destination (column, row) to the square
+# that blocks the move, or None if nothing can block it.
+HORSE_MOVE_TABLE    = _build_move_table((HORSE_MOVES, HORSE_MOVES))
+ELEPHANT_MOVE_TABLE = _build_move_table(ELEPHANT_MOVES)
+ADVISOR_MOVE_TABLE  = _build_move_table(ADVISOR_MOVES)
+GENERAL_MOVE_TABLE  = _build_move_table(GENERAL_MOVES)
+SOLDIER_MOVE_TABLE  = _build_move_table(SOLDIER_MOVES)
+
 class Piece:
     """
-    Base piece class containing common logic shared between all piece sub-classes
+    Base piece class containing common logic shared between all piece sub-classes. Pieces use
+    __slots__ rather than a per instance __dict__ to keep the 32 pieces of every game small.
     """
+    __slots__ = ('_color', '_column', '_row', '_in_play')
+
     def __init__(self, color, start_column, start_row):
         """
         Initialization method that takes a color string and starting position.
@@ -61,6 +103,92 @@ class Piece:
 
         return True
 
+    def generate_moves(self, board):
+        """
+        Yields every destination as a (column, row) tuple that this piece could move to on the
+        given board.  The base implementation probes every square with valid_move, sub-classes
+        override it to only visit the squares their movement pattern can reach.
+        """
+        for row in range(1, 11):
+            for column in COLUMNS:
+                if self.valid_move(column, row, board):
+                    yield column, row
+
+    def table_move_allowed(self, dest_column, dest_row, board):
+        """
+        Helper for the pieces with a fixed movement pattern. Looks the destination up in the
+        class's MOVE_TABLE for this piece's color and square, returning false if it is not
+        there or if the blocking square listed for it is occupied.
+        """
+        move_table = self.MOVE_TABLE[self._color][(self._column, self._row)]
+        destination = (dest_column, dest_row)
+
+        if destination not in move_table:
+            return False
+
+        block = move_table[destination]
+
+        if block and board[block[1]][block[0]]:
+            return False
+
+        return True
+
+    def generate_table_moves(self, board):
+        """
+        Helper for the pieces with a fixed movement pattern. Yields each destination in the
+        class's MOVE_TABLE for this piece's color and square that is not blocked and not
+        occupied by a piece of the same color.
+        """
+        for (column, row), block in self.MOVE_TABLE[self._color][(self._column, self._row)].items():
+            if block and board[block[1]][block[0]]:
+                continue
+
+            piece_found = board[row][column]
+
+            if piece_found and piece_found.get_color() == self._color:
+                continue
+
+            yield column, row
+
+    def generate_ray_moves(self, board, jump_screen):
+        """
+        Helper for the pieces that slide along rows and columns. Walks outward in each of the four
+        directions yielding empty squares, and either stops at the first piece (chariot) or jumps
+        a single screen to capture the next piece found (cannon) when jump_screen is true.
+        """
+        column_index = ord(self._column) - 97
+
+        for row_step, column_step in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+            row           = self._row + row_step
+            current_index = column_index + column_step
+            screen_found  = False
+
+            while 1 <= row <= 10 and 0 <= current_index <= 8:
+                piece_found = board[row][COLUMNS[current_index]]
+
+                if not screen_found:
+                    if not piece_found:
+                        yield COLUMNS[current_index], row
+                    elif jump_screen:
+                        screen_found = True
+                    else:
+                        if piece_found.get_color() != self._color:
+                            yield COLUMNS[current_index], row
+                        break
+                elif piece_found:
+                    if piece_found.get_color() != self._color:
+                        yield COLUMNS[current_index], row
+                    break
+
+                row           += row_step
+                current_index += column_step
+
+    def get_kind(self):
+        """
+        Returns the interned PieceKind of the pieces type and color
+        """
+        return PIECE_KINDS[piece_code(self)]
+
     def get_coordinates(self):
         """
         Returns a coordinates dict of row and column
@@ -86,21 +214,20 @@ class Piece:
         """
         self._in_play = False
 
+    def restore(self):
+        """
+        Sets the pieces in play status back to true, used when a capture is taken back
+        """
+        self._in_play = True
+
 class Advisor(Piece):
     """
     Implements the advisor piece
     """
-    # Constant representing the boundary limits for movement
-    BOUNDARIES = {
-        'red': {
-            'row_high': 3,
-            'row_low': 1
-        },
-        'black': {
-            'row_high': 10,
-            'row_low': 8
-        }
-    }
+    __slots__ = ()
+
+    # Constant table of the one space diagonal moves inside the palace from every square
+    MOVE_TABLE = ADVISOR_MOVE_TABLE
 
     def __init__(self, color, start_column, start_row):
         """
@@ -119,19 +246,15 @@ class Advisor(Piece):
         if not precheck_valid:
             return False
 
-        # Column boundaries of the palace
-        if dest_column > 'f' or dest_column < 'd':
-            return False
+        # Return false if the destination is not in the move table or the table's blocking
+        # square is occupied
+        return self.table_move_allowed(dest_column, dest_row, board)
 
-        # Row boundaries of the palace
-        if dest_row > self.BOUNDARIES[self._color]['row_high'] or dest_row < self.BOUNDARIES[self._color]['row_low']:
-            return False
-
-        # Only moving one space in a diagonal fashion
-        if abs(dest_row - self._row) != 1 or abs(ord(dest_column) - ord(self._column)) != 1:
-            return False
-
-        return True
+    def generate_moves(self, board):
+        """
+        Yields the one space diagonal destinations that are valid for this piece
+        """
+        return self.generate_table_moves(board)
 
     def __str__(self):
         """
@@ -143,6 +266,8 @@ class Cannon(Piece):
     """
     Implements the cannon piece
     """
+    __slots__ = ()
+
     def __init__(self, color, start_column, start_row):
         """
         Initialization method, calls up to parent class definition
@@ -222,6 +347,12 @@ class Cannon(Piece):
         # of the opposite color (precheck checked for same color)
         return True
 
+    def generate_moves(self, board):
+        """
+        Yields the destinations along each row and column, jumping a single screen to capture
+        """
+        return self.generate_ray_moves(board, True)
+
     def __str__(self):
         """
         Overrites the str method when printing the object
@@ -232,6 +363,8 @@ class Chariot(Piece):
     """
     Implements the chariot piece
     """
+    __slots__ = ()
+
     def __init__(self, color, start_column, start_row):
         """
         Initialization method, calls up to parent class definition
@@ -291,6 +424,13 @@ class Chariot(Piece):
 
         return True
 
+    def generate_moves(self, board):
+        """
+        Yields the destinations along each row and column up to and including the first piece
+        of the opposite color
+        """
+        return self.generate_ray_moves(board, False)
+
     def __str__(self):
         """
         Overrites the str method when printing the object
@@ -301,6 +441,12 @@ class Elephant(Piece):
     """
     Implements the elephant piece
     """
+    __slots__ = ()
+
+    # Constant table of the two space diagonal moves that do not cross the river from every
+    # square, with the eye square between that blocks each one
+    MOVE_TABLE = ELEPHANT_MOVE_TABLE
+
     def __init__(self, color, start_column, start_row):
         """
         Initialization method, calls up to parent class definition
@@ -318,35 +464,15 @@ class Elephant(Piece):
         if not precheck_valid:
             return False
 
-        # Verify not crossing the river
-        if self._color == "red":
-            if dest_row > 5:
-                return False
-        else:
-            if dest_row < 6:
-                return False
-
-        # Return false if moving diagonally and not two spaces
-        if not (abs(ord(dest_column) - ord(self._column)) == 2 and abs(dest_row - self._row) == 2):
-            return False
+        # Return false if the destination is not in the move table or the table's blocking
+        # square is occupied
+        return self.table_move_allowed(dest_column, dest_row, board)
 
-        # Check if another piece is blocking in the direction moving
-        if dest_row > self._row:
-            if ord(dest_column) > ord(self._column):
-                if board[dest_row - 1][chr(ord(dest_column) - 1)]:
-                    return False
-            else:
-                if board[dest_row - 1][chr(ord(dest_column) + 1)]:
-                    return False
-        else:
-            if ord(dest_column) > ord(self._column):
-                if board[dest_row + 1][chr(ord(dest_column) - 1)]:
-                    return False
-            else:
-                if board[dest_row + 1][chr(ord(dest_column) + 1)]:
-                    return False
-
-        return True
+    def generate_moves(self, board):
+        """
+        Yields the two space diagonal destinations that are valid for this piece
+        """
+        return self.generate_table_moves(board)
 
     def __str__(self):
         """
@@ -358,6 +484,11 @@ class General(Piece):
     """
     Implements the general piece
     """
+    __slots__ = ()
+
+    # Constant table of the one space orthogonal moves inside the palace from every square
+    MOVE_TABLE = GENERAL_MOVE_TABLE
+
     def __init__(self, color, start_column, start_row):
         """
         Initialization method, calls up to parent class definition
@@ -375,33 +506,19 @@ class General(Piece):
         if not precheck_valid:
             return False
 
-        # Return false if dest column is outside of palace
-        if dest_column < 'd' or dest_column > 'f':
+        # Return false if the destination is not a one space move inside the palace
+        if not self.table_move_allowed(dest_column, dest_row, board):
             return False
 
-        column_change_value = abs(ord(dest_column) - ord(self._column))
-        row_change_value    = abs(dest_row - self._row)
-
-        # Return false if moving diagonally
-        if column_change_value > 0 and row_change_value > 0:
-            return False
-
-        # Return false if moving more than one
-        if column_change_value > 1 or row_change_value > 1:
-            return False
-
-        # Check to make sure move does not go to a row outside of palace. Also check if the move
-        # will cause the two generals to be unblocked in the same row
+        # Check if the move will cause the two generals to be unblocked in the same column
         if self._color == "red":
-            if dest_row > 3:
-                return False
-
             current_row = dest_row + 1
 
             while current_row < 11:
                 piece_found = board[current_row][dest_column]
 
-                if piece_found:
+                # Skip over this general when retreating along its own column
+                if piece_found and piece_found is not self:
                     if piece_found.__class__.__name__ == "General":
                         return False
                     else:
@@ -409,15 +526,13 @@ class General(Piece):
 
                 current_row += 1
         else:
-            if dest_row < 8:
-                return False
-
             current_row = dest_row - 1
 
             while current_row > 0:
                 piece_found = board[current_row][dest_column]
 
-                if piece_found:
+                # Skip over this general when retreating along its own column
+                if piece_found and piece_found is not self:
                     if piece_found.__class__.__name__ == "General":
                         return False
                     else:
@@ -427,6 +542,15 @@ class General(Piece):
 
         return True
 
+    def generate_moves(self, board):
+        """
+        Yields the one space orthogonal destinations that are valid for this piece
+        """
+        # The table moves still need the check for the generals facing each other
+        for column, row in self.generate_table_moves(board):
+            if self.valid_move(column, row, board):
+                yield column, row
+
     def __str__(self):
         """
         Overrites the str method when printing the object
@@ -437,6 +561,12 @@ class Horse(Piece):
     """
     Implements the horse piece
     """
+    __slots__ = ()
+
+    # Constant table of the L shaped moves from every square, with the leg square next to the
+    # horse that blocks each one
+    MOVE_TABLE = HORSE_MOVE_TABLE
+
     def __init__(self, color, start_column, start_row):
         """
         Initialization method, calls up to parent class definition
@@ -454,43 +584,15 @@ class Horse(Piece):
         if not precheck_valid:
             return False
 
-        # Given the row and column difference, check and see if they are found, which will return
-        # the spot at the board to check if there is a blocking piece.  If there is a combination
-        # not present it means the move is not valid.
-        valid_move_dict = {
-            1: {
-                2: (self._row, chr(ord(self._column) - 1)),
-                -2: (self._row, chr(ord(self._column) + 1))
-            },
-            -1: {
-                2: (self._row, chr(ord(self._column) - 1)),
-                -2: (self._row, chr(ord(self._column) + 1))
-            },
-            2: {
-                1: (self._row - 1, self._column),
-                -1: (self._row - 1, self._column)
-            },
-            -2: {
-                1: (self._row + 1, self._column),
-                -1: (self._row + 1, self._column)
-            }
-        }
-
-        row_difference = self._row - dest_row
-        column_difference = ord(self._column) - ord(dest_column)
-
-        try:
-            coords_to_check = valid_move_dict[row_difference][column_difference]
-
-            # Return false if a piece was found at the coordinates as it is blocking
-            if board[coords_to_check[0]][coords_to_check[1]]:
-                return False
-
-        # If a KeyError is raised it was an invalid move, return False
-        except KeyError:
-            return False
+        # Return false if the destination is not in the move table or the table's blocking
+        # square is occupied
+        return self.table_move_allowed(dest_column, dest_row, board)
 
-        return True
+    def generate_moves(self, board):
+        """
+        Yields the L shaped destinations that are valid for this piece
+        """
+        return self.generate_table_moves(board)
 
     def __str__(self):
         """
@@ -502,6 +604,12 @@ class Soldier(Piece):
     """
     Implements the soldier piece
     """
+    __slots__ = ()
+
+    # Constant table of the forward moves, plus the sideways moves once across the river, from
+    # every square
+    MOVE_TABLE = SOLDIER_MOVE_TABLE
+
     def __init__(self, color, start_column, start_row):
         """
         Initialization method, calls up to parent class definition
@@ -519,36 +627,107 @@ class Soldier(Piece):
         if not precheck_valid:
             return False
 
-        # If the destination is more than 1 space away in any direction it is invalid
-        if abs(self._row - dest_row) > 1 or abs(ord(self._column) - ord(dest_column)) > 1:
-            return False
+        # Return false if the destination is not in the move table or the table's blocking
+        # square is occupied
+        return self.table_move_allowed(dest_column, dest_row, board)
 
-        # Return false if moving diagonally
-        if abs(ord(dest_column) - ord(self._column)) > 0 and abs(dest_row - self._row) > 0:
-            return False
+    def generate_moves(self, board):
+        """
+        Yields the forward and, once across the river, sideways destinations that are valid
+        for this piece
+        """
+        return self.generate_table_moves(board)
 
-        if self._color == "red":
-            # Check moving backwards
-            if dest_row < self._row:
-                return False
+    def __str__(self):
+        """
+        Overrites the str method when printing the object
+        """
+        return "S"
 
-            # Check if moving sideways before the river
-            if self._row <= 5 and ord(self._column) - ord(dest_column) != 0:
-                return False
+class PieceKind:
+    """
+    Immutable value of a piece type and color with no position, for code that keeps coordinates
+    in the board alone. There is exactly one kind for each type and color, found in PIECE_KINDS by
+    piece code, so kinds can be compared with is.
+    """
+    __slots__ = ('_piece_class', '_color', '_code')
 
-        else:
-            # Check moving backwards
-            if dest_row > self._row:
-                return False
+    def __init__(self, piece_class, color, code):
+        """
+        Initialization method that takes the piece class, color string and piece code
+        """
+        object.__setattr__(self, '_piece_class', piece_class)
+        object.__setattr__(self, '_color', color)
+        object.__setattr__(self, '_code', code)
 
-            # Check if moving sideways before the river
-            if self._row >= 6 and ord(self._column) - ord(dest_column) != 0:
-                return False
+    def __setattr__(self, name, value):
+        """
+        Kinds are shared by every game, so they cannot be changed
+        """
+        raise AttributeError("PieceKind values cannot be changed")
 
-        return True
+    def __reduce__(self):
+        """
+        Unpickles to the same interned kind
+        """
+        return piece_kind, (self._code,)
 
     def __str__(self):
         """
-        Overrites the str method when printing the object
+        Returns the letter the piece class prints as
         """
-        return "S"
+        return CODE_LETTERS[self._code & TYPE_MASK]
+
+    def __repr__(self):
+        """
+        Returns the color and piece class name for debugging
+        """
+        return f"PieceKind({self._color}, {self._piece_class.__name__})"
+
+    def get_piece_class(self):
+        """
+        Returns the piece class of the kind
+        """
+        return self._piece_class
+
+    def get_color(self):
+        """
+        Returns the color string of the kind
+        """
+        return self._color
+
+    def get_code(self):
+        """
+        Returns the piece code of the kind
+        """
+        return self._code
+
+    def make_piece(self, column, row):
+        """
+        Returns a new piece object of this kind at the given column and row
+        """
+        return self._piece_class(self._color, column, row)
+
+# Constant of the piece classes by the letter they print as
+PIECE_CLASSES = {
+    'G': General,
+    'A': Advisor,
+    'E': Elephant,
+    'H': Horse,
+    'R': Chariot,
+    'C': Cannon,
+    'S': Soldier
+}
+
+# Constant of the interned piece kinds by piece code, None for the empty and unused codes
+PIECE_KINDS = tuple(
+    PieceKind(PIECE_CLASSES[CODE_LETTERS[code & TYPE_MASK]], 'black' if code & BLACK_FLAG else 'red', code)
+    if code & TYPE_MASK else None
+    for code in range(16)
+)
+
+def piece_kind(code):
+    """
+    Returns the interned PieceKind for a piece code
+    """
+    return PIECE_KINDS[code]
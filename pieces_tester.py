@@ -2,8 +2,10 @@
 # Date: 03/01/2020
 # Description: Tests for the base and piece classes.
 
-import unittest, copy
-from pieces import Piece, Advisor, Cannon, Chariot, Elephant, General, Horse, Soldier
+import unittest, copy, pickle
+from pieces import Piece, Advisor, Cannon, Chariot, Elephant, General, Horse, Soldier, PIECE_KINDS, piece_kind
+from board import CHARIOT, BLACK_FLAG
+from pieces import HORSE_MOVE_TABLE, ELEPHANT_MOVE_TABLE, ADVISOR_MOVE_TABLE, GENERAL_MOVE_TABLE, SOLDIER_MOVE_TABLE
 from XiangqiGame import XiangqiGame
 
 class PieceTester(unittest.TestCase):
@@ -104,6 +106,35 @@ class PieceTester(unittest.TestCase):
             self.piece._in_play
         )
 
+    def test_restore(self):
+        self.piece.capture()
+        self.piece.restore()
+
+        self.assertTrue(
+            self.piece._in_play
+        )
+
+    def test_generate_moves_matches_valid_move(self):
+        # Scatter pieces of both colors around the board to block and be captured
+        for column, row, color in (('e', 5, 'red'), ('b', 3, 'black'), ('e', 9, 'black'),
+                                   ('d', 2, 'red'), ('f', 6, 'black'), ('a', 8, 'red')):
+            self.board[row][column] = Piece(color, column, row)
+
+        for column, row in (('e', 2), ('d', 1), ('e', 7), ('c', 5), ('h', 9), ('a', 1)):
+            self.piece.set_coordinates(column, row)
+
+            expected_moves = [
+                (dest_column, dest_row)
+                for dest_row in range(1, 11)
+                for dest_column in 'abcdefghi'
+                if self.piece.valid_move(dest_column, dest_row, self.board)
+            ]
+
+            self.assertCountEqual(
+                list(self.piece.generate_moves(self.board)),
+                expected_moves
+            )
+
 class AdvisorTester(PieceTester):
     def setUp(self):
         self.board = copy.deepcopy( XiangqiGame.BLANK_BOARD )
@@ -237,6 +268,16 @@ class CannonTester(PieceTester):
             self.piece.valid_move('b', 5, self.board)
         )
 
+    def test_generate_moves_jumps_screen(self):
+        self.board[5][self.valid_start_column] = Piece('red', self.valid_start_column, 5)
+        self.board[8][self.valid_start_column] = Piece('black', self.valid_start_column, 8)
+
+        moves = list(self.piece.generate_moves(self.board))
+
+        self.assertIn((self.valid_start_column, 8), moves)
+        self.assertNotIn((self.valid_start_column, 5), moves)
+        self.assertNotIn((self.valid_start_column, 6), moves)
+
     def test_invalid_diagonal_move(self):
         self.assertFalse(
             self.piece.valid_move('c', 4, self.board)
@@ -277,6 +318,12 @@ class ChariotTester(PieceTester):
             self.piece.valid_move('a', 3, self.board)
         )
 
+    def test_generate_moves_empty_board(self):
+        self.assertEqual(
+            len(list(self.piece.generate_moves(self.board))),
+            17
+        )
+
     def test_invalid_diagonal_move(self):
         self.assertFalse(
             self.piece.valid_move('b', 2, self.board)
@@ -414,6 +461,25 @@ class GeneralTester(PieceTester):
             black_general.valid_move('f', 10, self.board)
         )
 
+    def test_valid_move_retreat_along_column(self):
+        self.piece.set_coordinates('e', 2)
+        self.board[2]['e'] = self.piece
+        self.board[10]['d'] = self.klass('black', 'd', 10)
+
+        self.assertTrue(
+            self.piece.valid_move('e', 1, self.board)
+        )
+
+        # Block the column so the generals do not face each other
+        self.board[5]['e'] = Soldier('red', 'e', 5)
+
+        black_general = self.klass('black', 'e', 9)
+        self.board[9]['e'] = black_general
+
+        self.assertTrue(
+            black_general.valid_move('e', 10, self.board)
+        )
+
     def test_invalid_move_row_red(self):
         self.piece.set_coordinates('d', 3)
 
@@ -588,5 +654,83 @@ class SoldierTester(PieceTester):
             piece.valid_move('b', 5, self.board)
         )
 
+class MoveTableTester(unittest.TestCase):
+    def test_horse_table(self):
+        self.assertEqual(
+            HORSE_MOVE_TABLE['red'][('b', 1)],
+            { ('c', 3): ('b', 2), ('a', 3): ('b', 2), ('d', 2): ('c', 1) }
+        )
+
+    def test_elephant_table(self):
+        self.assertEqual(
+            ELEPHANT_MOVE_TABLE['red'][('c', 5)],
+            { ('e', 3): ('d', 4), ('a', 3): ('b', 4) }
+        )
+
+        self.assertEqual(
+            ELEPHANT_MOVE_TABLE['black'][('c', 6)],
+            { ('e', 8): ('d', 7), ('a', 8): ('b', 7) }
+        )
+
+    def test_advisor_table(self):
+        self.assertEqual(
+            set(ADVISOR_MOVE_TABLE['black'][('e', 9)]),
+            { ('d', 10), ('f', 10), ('d', 8), ('f', 8) }
+        )
+
+        self.assertEqual(
+            ADVISOR_MOVE_TABLE['red'][('e', 9)],
+            {}
+        )
+
+    def test_general_table(self):
+        self.assertEqual(
+            set(GENERAL_MOVE_TABLE['red'][('d', 1)]),
+            { ('d', 2), ('e', 1) }
+        )
+
+    def test_soldier_table(self):
+        self.assertEqual(
+            set(SOLDIER_MOVE_TABLE['red'][('e', 5)]),
+            { ('e', 6) }
+        )
+
+        self.assertEqual(
+            set(SOLDIER_MOVE_TABLE['black'][('e', 5)]),
+            { ('e', 4), ('d', 5), ('f', 5) }
+        )
+
+class PieceKindTester(unittest.TestCase):
+    def test_pieces_have_no_dict(self):
+        for piece_class in (Advisor, Cannon, Chariot, Elephant, General, Horse, Soldier):
+            piece = piece_class('red', 'e', 1)
+
+            self.assertFalse(hasattr(piece, '__dict__'))
+
+            with self.assertRaises(AttributeError):
+                piece.extra = True
+
+    def test_kinds_are_interned(self):
+        kind = Chariot('black', 'a', 10).get_kind()
+
+        self.assertIs(kind, PIECE_KINDS[CHARIOT | BLACK_FLAG])
+        self.assertIs(kind, Chariot('black', 'i', 10).get_kind())
+        self.assertIs(pickle.loads(pickle.dumps(kind)), kind)
+        self.assertIs(piece_kind(CHARIOT | BLACK_FLAG), kind)
+
+        self.assertEqual(str(kind), 'R')
+        self.assertEqual(kind.get_color(), 'black')
+        self.assertIs(kind.get_piece_class(), Chariot)
+
+    def test_kinds_are_immutable(self):
+        with self.assertRaises(AttributeError):
+            PIECE_KINDS[CHARIOT]._color = 'black'
+
+    def test_make_piece(self):
+        self.assertEqual(
+            PIECE_KINDS[CHARIOT].make_piece('a', 1),
+            Chariot('red', 'a', 1)
+        )
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,173 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Opt-in call counters and timers for the hot methods of XiangqiGame and the piece
+#              move validators.  Enabling wraps the methods in place and disabling puts the
+#              originals back, so nothing is added to a call while profiling is off.
+#
+# Usage: python profiling.py [--games N] [--max-moves N] [--seed N] [--backend dict]
+
+import argparse, functools, sys, time
+from contextlib import contextmanager
+from XiangqiGame import XiangqiGame
+from pieces import PIECE_CLASSES
+from selfplay import play_game
+
+# Constant of the XiangqiGame methods that are profiled
+GAME_METHODS = (
+    "make_move", "is_in_check", "move_puts_current_player_in_check", "move_exposes_general",
+    "update_game_state"
+)
+
+# Constant of the (class, method name) pairs that are profiled, every piece class's valid_move is
+# counted separately
+PROFILED_METHODS = tuple(
+    [(XiangqiGame, name) for name in GAME_METHODS] +
+    [(piece_class, "valid_move") for piece_class in PIECE_CLASSES.values()]
+)
+
+# Counters of [calls, seconds] by "Class.method" name, and the original function of each wrapped
+# method by (class, method name), which is empty while profiling is off
+_counters  = {}
+_originals = {}
+
+def profiled_name(cls, name):
+    """
+    Returns the name the counters for a method are kept under (ex 'XiangqiGame.make_move')
+    """
+    return f"{cls.__name__}.{name}"
+
+def wrap_method(cls, name, function):
+    """
+    Returns a wrapper of a method that counts its calls and adds up its wall time
+    """
+    counter    = _counters.setdefault(profiled_name(cls, name), [0, 0.0])
+    perf_clock = time.perf_counter
+
+    @functools.wraps(function)
+    def wrapper(*arguments, **keyword_arguments):
+        start_time = perf_clock()
+
+        try:
+            return function(*arguments, **keyword_arguments)
+        finally:
+            counter[0] += 1
+            counter[1] += perf_clock() - start_time
+
+    return wrapper
+
+def enable():
+    """
+    Starts profiling by wrapping every method in PROFILED_METHODS. Counts carry on from any
+    earlier profiling until reset is called. Enabling twice does nothing.
+    """
+    if _originals:
+        return
+
+    for cls, name in PROFILED_METHODS:
+        # Keep the classes own attribute, or None if the method is inherited
+        _originals[(cls, name)] = cls.__dict__.get(name)
+
+        setattr(cls, name, wrap_method(cls, name, getattr(cls, name)))
+
+def disable():
+    """
+    Stops profiling, putting back every original method. The counts are kept.
+    """
+    for (cls, name), original in _originals.items():
+        if original is None:
+            delattr(cls, name)
+        else:
+            setattr(cls, name, original)
+
+    _originals.clear()
+
+def is_enabled():
+    """
+    Returns true if profiling is on
+    """
+    return bool(_originals)
+
+def reset():
+    """
+    Sets every count and time back to zero
+    """
+    for counter in _counters.values():
+        counter[0] = 0
+        counter[1] = 0.0
+
+def get_stats():
+    """
+    Returns a snapshot of the counters as a dict of "Class.method" name to a dict of calls and
+    seconds, for every profiled method. Times include the time spent in profiled methods called
+    from inside, so make_move includes its update_game_state. Only calls made in this process
+    are counted.
+    """
+    stats = {}
+
+    for cls, name in PROFILED_METHODS:
+        calls, seconds = _counters.get(profiled_name(cls, name), (0, 0.0))
+
+        stats[profiled_name(cls, name)] = { "calls": calls, "seconds": seconds }
+
+    return stats
+
+@contextmanager
+def profile(reset_counts = True):
+    """
+    Context manager that profiles the code inside it and yields a dict that is filled with the
+    get_stats snapshot on exit. The counts are reset on entry unless reset_counts is false.
+    Profiling that was already on is left on.
+    """
+    was_enabled = is_enabled()
+    stats       = {}
+
+    if reset_counts:
+        reset()
+
+    enable()
+
+    try:
+        yield stats
+    finally:
+        if not was_enabled:
+            disable()
+
+        stats.update(get_stats())
+
+def format_stats(stats):
+    """
+    Returns a table of a get_stats snapshot, slowest method first, skipping methods never called
+    """
+    lines = [f"{'method':<50} {'calls':>10} {'seconds':>10} {'us/call':>10}"]
+
+    for name, counts in sorted(stats.items(), key = lambda item: -item[1]['seconds']):
+        if counts['calls']:
+            lines.append(
+                f"{name:<50} {counts['calls']:>10} {counts['seconds']:>10.3f} "
+                f"{counts['seconds'] / counts['calls'] * 1e6:>10.1f}"
+            )
+
+    return "\n".join(lines)
+
+def main(arguments = None):
+    """
+    Command line entry point, plays random games in this process under profiling and prints
+    the counters. Returns the exit status.
+    """
+    parser = argparse.ArgumentParser(description = "Profile the hot methods of XiangqiGame over random games.")
+    parser.add_argument("--games", type = int, default = 10, help = "number of games to play")
+    parser.add_argument("--max-moves", type = int, default = 200, help = "moves before a game is stopped")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the first game")
+    parser.add_argument("--backend", default = "dict", choices = sorted(XiangqiGame.BOARD_BACKENDS))
+    options = parser.parse_args(arguments)
+
+    with profile() as stats:
+        for seed in range(options.seed, options.seed + options.games):
+            play_game(seed, max_moves = options.max_moves, board_backend = options.backend)
+
+    print(format_stats(stats))
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for the profiling counters.
+
+import unittest, contextlib, io
+import profiling
+from XiangqiGame import XiangqiGame
+from pieces import Cannon
+
+class ProfilingTester(unittest.TestCase):
+    def tearDown(self):
+        profiling.disable()
+        profiling.reset()
+
+    def test_disabled_leaves_methods_alone(self):
+        make_move = XiangqiGame.__dict__['make_move']
+
+        profiling.enable()
+
+        self.assertTrue(profiling.is_enabled())
+        self.assertIsNot(XiangqiGame.__dict__['make_move'], make_move)
+
+        profiling.disable()
+
+        self.assertFalse(profiling.is_enabled())
+        self.assertIs(XiangqiGame.__dict__['make_move'], make_move)
+
+    def test_counts_calls(self):
+        game = XiangqiGame()
+
+        with profiling.profile() as stats:
+            game.make_move('h3', 'e3')
+            game.make_move('h3', 'e3')
+
+        self.assertEqual(stats['XiangqiGame.make_move']['calls'], 2)
+        self.assertEqual(stats['XiangqiGame.update_game_state']['calls'], 1)
+        self.assertEqual(stats['Cannon.valid_move']['calls'], 1)
+        self.assertGreater(stats['XiangqiGame.make_move']['seconds'], 0)
+
+        # Nothing is counted once the context manager exits
+        game.make_move('h8', 'e8')
+
+        self.assertEqual(profiling.get_stats()['XiangqiGame.make_move']['calls'], 2)
+
+    def test_reset(self):
+        with profiling.profile():
+            XiangqiGame().is_in_check("red")
+
+        with profiling.profile(reset_counts = False) as stats:
+            XiangqiGame().is_in_check("red")
+
+        self.assertEqual(stats['XiangqiGame.is_in_check']['calls'], 2)
+
+        profiling.reset()
+
+        self.assertEqual(profiling.get_stats()['XiangqiGame.is_in_check']['calls'], 0)
+
+    def test_nested_profile_stays_enabled(self):
+        profiling.enable()
+
+        with profiling.profile():
+            Cannon('red', 'b', 3).valid_move('e', 3, XiangqiGame()._board)
+
+        self.assertTrue(profiling.is_enabled())
+        self.assertEqual(profiling.get_stats()['Cannon.valid_move']['calls'], 1)
+
+    def test_main(self):
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(profiling.main(["--games", "1", "--max-moves", "10"]), 0)
+
+        self.assertIn("XiangqiGame.make_move", output.getvalue())
+        self.assertFalse(profiling.is_enabled())
+
+if __name__ == '__main__':
+    unittest.main()
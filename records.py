@@ -0,0 +1,439 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Streaming reader and replay validator for xiangqi game records.  Reads games in
+#              PGN style containers with ICCS (ex H2-E2) or WXF (ex C2.5) move notation one game at
+#              a time, and replays each through XiangqiGame.make_move to find the first illegal move.
+#
+# Usage: python records.py games.pgn [--workers N] [--chunk-size N] [--notation auto]
+
+import argparse, re, sys
+from concurrent.futures import ProcessPoolExecutor
+from XiangqiGame import XiangqiGame
+from pieces import General, Advisor, Elephant, Horse, Chariot, Cannon, Soldier
+
+# Pattern matching an ICCS move, files a through i and ranks 0 through 9 counted from red's side,
+# with or without the dash (ex 'H2-E2' or 'h2e2')
+ICCS_PATTERN = re.compile(r'^([a-iA-I])([0-9])-?([a-iA-I])([0-9])$')
+
+# Pattern matching a WXF move (ex 'C2.5', 'H8+7', '+R-3', 'R+=4' or '2P.4'). The front or rear
+# piece of two on one file is marked with + or - either before the piece letter or in place of
+# the file, and three or more on one file are numbered from the front before the piece letter.
+WXF_PATTERN = re.compile(r'^([+\-1-5]?)([KAEBHNRCP])([1-9+-]?)([+\-.=])([1-9])$')
+
+# Pattern matching the result tokens that end a game's moves
+RESULT_PATTERN = re.compile(r'^(1-0|0-1|1/2-1/2|\*)$')
+
+# Constant of the game state each decided result token stands for
+RESULT_STATES = {
+    "1-0": "RED_WON",
+    "0-1": "BLACK_WON",
+    "1/2-1/2": "DRAW"
+}
+
+# Pattern matching a move number (ex '1.' or '12...'), with or without a move joined to it
+MOVE_NUMBER_PATTERN = re.compile(r'^\d+\.+')
+
+# Pattern matching a tag pair line (ex '[Event "Club Match"]')
+TAG_PATTERN = re.compile(r'^\[(\w+)\s+"(.*)"\]\s*$')
+
+# Pattern matching a move written as two joined coordinates (ex 'h3e3' or 'b10c8')
+MOVE_PATTERN = re.compile(r'^([a-i](?:10|[1-9]))([a-i](?:10|[1-9]))$')
+
+# Constant of the WXF letter of each piece class, with the alternate letters each can be read as
+WXF_LETTERS = {
+    General: 'K',
+    Advisor: 'A',
+    Elephant: 'E',
+    Horse: 'H',
+    Chariot: 'R',
+    Cannon: 'C',
+    Soldier: 'P'
+}
+WXF_ALIASES = { 'B': 'E', 'N': 'H' }
+
+# Pieces that move along rows and columns, whose forward and backward WXF moves give the number
+# of rows moved rather than the destination file
+WXF_LINE_PIECES = (General, Chariot, Cannon, Soldier)
+
+def parse_move(move):
+    """
+    Splits a move written as two joined coordinates (ex 'h3e3') into a (from, to) tuple,
+    raising a ValueError if it is not in that form
+    """
+    match = MOVE_PATTERN.match(move)
+
+    if not match:
+        raise ValueError(f"Invalid move: {move}")
+
+    return match.group(1), match.group(2)
+
+def load_position(moves, board_backend = "dict", fen = None):
+    """
+    Returns a new game with the given list of joined coordinate moves played from the starting
+    position, or from the optional FEN, raising a ValueError if any of them is illegal
+    """
+    game = XiangqiGame(board_backend = board_backend, fen = fen, lazy_game_state = True)
+
+    for move in moves:
+        if not game.make_move(*parse_move(move)):
+            raise ValueError(f"Illegal move: {move}")
+
+    return game
+
+def iccs_to_coords(move):
+    """
+    Converts an ICCS move (ex 'H2-E2') to a (from, to) tuple of string coordinates (ex
+    ('h3', 'e3')), or returns None if it is not an ICCS move
+    """
+    match = ICCS_PATTERN.match(move)
+
+    if not match:
+        return None
+
+    return (
+        match.group(1).lower() + str(int(match.group(2)) + 1),
+        match.group(3).lower() + str(int(match.group(4)) + 1)
+    )
+
+def wxf_file(color, column):
+    """
+    Returns the WXF file number of a column for the given color, counted from 1 on that players
+    right hand side
+    """
+    column_index = ord(column) - 97
+
+    return 9 - column_index if color == "red" else column_index + 1
+
+def wxf_notations(game, from_coord_dict, to_coord_dict):
+    """
+    Takes a game and a move for the player to move as coordinate dicts, and returns a list of
+    the WXF strings the move can be written as. A piece sharing its file with another of the
+    same kind can be written with the front or rear marker in either place. Three or more on one
+    file are numbered 1 to 5 from the front before the letter (ex '2P.4'), and the front and rear
+    ones can also take the marker. When another file holds two or more of the same kind as well,
+    the marker or number alone is ambiguous and the file follows the letter (ex '+P5+1').
+    """
+    piece = game.get_piece(from_coord_dict)
+    color = piece.get_color()
+    kind  = piece.__class__
+
+    letter    = WXF_LETTERS[kind]
+    from_row  = from_coord_dict['row']
+    to_row    = to_coord_dict['row']
+    row_steps = to_row - from_row if color == "red" else from_row - to_row
+
+    if row_steps == 0:
+        operator = '.'
+    else:
+        operator = '+' if row_steps > 0 else '-'
+
+    # Line pieces moving forward or backward give the rows moved, all other moves give the file
+    if operator != '.' and kind in WXF_LINE_PIECES:
+        argument = str(abs(row_steps))
+    else:
+        argument = str(wxf_file(color, to_coord_dict['column']))
+
+    from_file = str(wxf_file(color, from_coord_dict['column']))
+    notations = [letter + from_file + operator + argument]
+
+    # Tandem pieces on the same file are told apart by how far forward they are
+    files = {}
+
+    for other in game.get_pieces(color):
+        if other.__class__ is kind:
+            files.setdefault(other.get_coordinates()['column'], []).append(other)
+
+    same_file = sorted(
+        files[from_coord_dict['column']],
+        key = lambda other: other.get_coordinates()['row'],
+        reverse = color == "red"
+    )
+
+    if len(same_file) < 2:
+        return notations
+
+    position = same_file.index(piece)
+
+    if len(same_file) == 2:
+        markers = ['+' if position == 0 else '-']
+    else:
+        markers = [str(position + 1)]
+
+        if position == 0:
+            markers.append('+')
+        elif position == len(same_file) - 1:
+            markers.append('-')
+
+    other_tandems = any(
+        len(others) > 1 for column, others in files.items() if column != from_coord_dict['column']
+    )
+
+    for marker in markers:
+        if other_tandems:
+            notations.append(marker + letter + from_file + operator + argument)
+        else:
+            notations.append(marker + letter + operator + argument)
+
+            if marker in ('+', '-'):
+                notations.append(letter + marker + operator + argument)
+
+    return notations
+
+def move_to_wxf(game, from_coord, to_coord):
+    """
+    Takes a game and a legal move for the player to move as string coordinates (ex 'h3', 'e3')
+    and returns it in WXF notation (ex 'C2.5'), using the front or rear marker or the number
+    from the front when needed
+    """
+    notations = wxf_notations(game, game.convert_coord(from_coord), game.convert_coord(to_coord))
+
+    return notations[0] if len(notations) == 1 else notations[1]
+
+def wxf_to_coords(game, move):
+    """
+    Takes a game and a WXF move for the player to move (ex 'C2.5'), and returns the legal move it
+    names as a (from, to) tuple of string coordinates, or None if it names no legal move or more
+    than one
+    """
+    match = WXF_PATTERN.match(move)
+
+    if not match:
+        return None
+
+    prefix, letter, file_mark, operator, argument = match.groups()
+
+    # A tandem marker must be given exactly once, and a file number is needed without one
+    if prefix and file_mark in ('+', '-') or not prefix and not file_mark:
+        return None
+
+    letter   = WXF_ALIASES.get(letter, letter)
+    operator = '.' if operator == '=' else operator
+    move     = prefix + letter + file_mark + operator + argument
+    matches  = [
+        (from_coord_dict, to_coord_dict)
+        for from_coord_dict, to_coord_dict in game.generate_legal_moves(game.get_current_turn())
+        if WXF_LETTERS[game.get_piece(from_coord_dict).__class__] == letter and
+        move in wxf_notations(game, from_coord_dict, to_coord_dict)
+    ]
+
+    if len(matches) != 1:
+        return None
+
+    from_coord_dict, to_coord_dict = matches[0]
+
+    return game.format_coord(from_coord_dict), game.format_coord(to_coord_dict)
+
+def read_games(source):
+    """
+    Generator that takes a file path or an iterable of lines (such as an open file) of PGN style
+    records, and yields one game at a time as a dict of its index, tags, list of move tokens and
+    result token (None if the game has no result). Comments in braces or after semicolons and
+    variations in parentheses are skipped. Only one game is held in memory at a time.
+    """
+    if isinstance(source, str):
+        with open(source, encoding = "utf-8") as source_file:
+            yield from read_games(source_file)
+        return
+
+    index         = 0
+    tags          = {}
+    moves         = []
+    comment_depth = 0
+    variation     = 0
+
+    for line in source:
+        line = line.strip()
+
+        if comment_depth == 0 and variation == 0 and line.startswith('['):
+            # A tag after moves starts the next game when the last one had no result token
+            if moves:
+                yield { "index": index, "tags": tags, "moves": moves, "result": None }
+                index += 1
+                tags   = {}
+                moves  = []
+
+            match = TAG_PATTERN.match(line)
+
+            if match:
+                tags[match.group(1)] = match.group(2)
+
+            continue
+
+        for token in re.split(r'(\{|\}|\(|\)|;|\s+)', line):
+            if not token or token.isspace():
+                continue
+
+            # Skip everything inside comments and variations
+            if token == '{':
+                comment_depth += 1
+            elif token == '}':
+                comment_depth = max(0, comment_depth - 1)
+            elif comment_depth:
+                continue
+            elif token == '(':
+                variation += 1
+            elif token == ')':
+                variation = max(0, variation - 1)
+            elif variation:
+                continue
+            elif token == ';':
+                break
+            elif RESULT_PATTERN.match(token):
+                yield { "index": index, "tags": tags, "moves": moves, "result": token }
+                index += 1
+                tags   = {}
+                moves  = []
+            else:
+                token = MOVE_NUMBER_PATTERN.sub('', token)
+
+                if token:
+                    moves.append(token)
+
+    if moves or tags:
+        yield { "index": index, "tags": tags, "moves": moves, "result": None }
+
+def record_moves(record, notation = "auto", with_hashes = False):
+    """
+    Takes a game record from read_games and replays its moves through make_move, from the
+    position in its FEN tag if it has one, checking for checkmate only once the replay stops.
+    Returns a tuple of the moves played as (from, to) tuples of string coordinates, the game
+    state reached (None if the FEN could not be read) and the first illegal or unreadable move
+    as a (move number, token) tuple, or None if every move was legal. The notation is "iccs",
+    "wxf" or "auto", which reads the Format tag or otherwise tries ICCS and then WXF per move.
+    With with_hashes true, a list of the position hash before each move played is added to the
+    end of the tuple.
+    """
+    tags = record['tags']
+
+    if notation == "auto" and tags.get('Format', "").lower() in ("iccs", "wxf"):
+        notation = tags['Format'].lower()
+
+    try:
+        game = XiangqiGame(fen = tags.get('FEN'), lazy_game_state = True)
+    except ValueError:
+        return ([], None, (0, tags['FEN']), []) if with_hashes else ([], None, (0, tags['FEN']))
+
+    moves  = []
+    hashes = []
+
+    for token in record['moves']:
+        coords = None
+
+        if notation in ("iccs", "auto"):
+            coords = iccs_to_coords(token)
+
+        if coords is None and notation in ("wxf", "auto"):
+            coords = wxf_to_coords(game, token)
+
+        position_hash = game.get_position_hash()
+
+        if coords is None or not game.make_move(*coords):
+            illegal_move = (len(moves) + 1, token)
+            break
+
+        moves.append(coords)
+        hashes.append(position_hash)
+    else:
+        illegal_move = None
+
+    if with_hashes:
+        return moves, game.get_game_state(), illegal_move, hashes
+
+    return moves, game.get_game_state(), illegal_move
+
+def replay_game(record, notation = "auto"):
+    """
+    Takes a game record from read_games and replays it with record_moves. Returns a dict of the
+    records index, tags and result, the number of moves played, the game state reached, and the
+    first illegal or unreadable move as a (move number, token) tuple, or None if every move was
+    legal.
+    """
+    moves, game_state, illegal_move = record_moves(record, notation)
+
+    return {
+        "index": record['index'],
+        "tags": record['tags'],
+        "result": record['result'],
+        "moves_played": len(moves),
+        "game_state": game_state,
+        "illegal_move": illegal_move
+    }
+
+def replay_chunk(records, notation = "auto"):
+    """
+    Replays a list of game records, returning the list of replay_game results. Used as the unit
+    of work sent to worker processes.
+    """
+    return [replay_game(record, notation) for record in records]
+
+def chunk_games(games, chunk_size):
+    """
+    Generator that groups the games from read_games into lists of up to chunk_size games
+    """
+    chunk = []
+
+    for game in games:
+        chunk.append(game)
+
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+def validate_records(source, workers = 1, chunk_size = 100, notation = "auto"):
+    """
+    Generator that takes a file path or iterable of lines of game records and yields the
+    replay_game result of every game, in order. With more than one worker, chunks of games are
+    replayed in a pool of worker processes, with at most two chunks per worker read ahead so
+    memory stays bounded however large the archive is.
+    """
+    games = read_games(source)
+
+    if workers == 1:
+        for game in games:
+            yield replay_game(game, notation)
+        return
+
+    with ProcessPoolExecutor(max_workers = workers) as executor:
+        pending = []
+
+        for chunk in chunk_games(games, chunk_size):
+            pending.append(executor.submit(replay_chunk, chunk, notation))
+
+            # Wait on the oldest chunk once enough are queued, which also keeps the order
+            if len(pending) >= workers * 2:
+                yield from pending.pop(0).result()
+
+        for future in pending:
+            yield from future.result()
+
+def main(arguments = None):
+    """
+    Command line entry point, returns the exit status, 1 if any game had an illegal move
+    """
+    parser = argparse.ArgumentParser(description = "Replay xiangqi game records and report illegal moves.")
+    parser.add_argument("path", help = "file of PGN style game records")
+    parser.add_argument("--workers", type = int, default = 1, help = "worker processes")
+    parser.add_argument("--chunk-size", type = int, default = 100, help = "games sent to a worker at a time")
+    parser.add_argument("--notation", default = "auto", choices = ("auto", "iccs", "wxf"))
+    options = parser.parse_args(arguments)
+
+    games   = 0
+    invalid = 0
+
+    for result in validate_records(options.path, options.workers, options.chunk_size, options.notation):
+        games += 1
+
+        if result['illegal_move']:
+            invalid += 1
+            move_number, token = result['illegal_move']
+            print(f"game {result['index']}: illegal move {move_number} {token}")
+
+    print(f"{games} games, {invalid} with illegal moves")
+
+    return 1 if invalid else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
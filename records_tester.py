@@ -0,0 +1,186 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for the game record reader and replay validator.
+
+import unittest, contextlib, io, os, random, tempfile
+from XiangqiGame import XiangqiGame
+from records import (
+    iccs_to_coords, move_to_wxf, wxf_to_coords, parse_move, load_position, read_games, record_moves,
+    replay_game, validate_records, main
+)
+
+# Two short games in ICCS and WXF notation, and one with an illegal fourth move
+RECORDS = """[Event "Test"]
+[Format "ICCS"]
+[Result "*"]
+
+1. H2-E2 H9-G7 2. H0-G2 {a comment
+spanning lines} I9-H9 (2... C7-C6 3. A0-A1) 3. I0-H0 *
+
+[Format "WXF"]
+1. C2.5 H8+7 2. H2+3 R9.8 ; the rest of this line is ignored
+3. R1.2 *
+
+[Event "Illegal"]
+1. h2e2 h9g7 2. h0g2 a9a5 1-0
+"""
+
+class NotationTester(unittest.TestCase):
+    def setUp(self):
+        self.game = XiangqiGame()
+
+    def test_parse_move(self):
+        self.assertEqual(parse_move('h3e3'), ('h3', 'e3'))
+        self.assertEqual(parse_move('b10c8'), ('b10', 'c8'))
+
+        with self.assertRaises(ValueError):
+            parse_move('z1a1')
+
+    def test_load_position_illegal_move(self):
+        self.assertEqual(load_position(['h3e3']).get_current_turn(), "black")
+
+        with self.assertRaises(ValueError):
+            load_position(['a1a5'])
+
+    def test_iccs_to_coords(self):
+        self.assertEqual(iccs_to_coords('H2-E2'), ('h3', 'e3'))
+        self.assertEqual(iccs_to_coords('b9c7'), ('b10', 'c8'))
+        self.assertIsNone(iccs_to_coords('C2.5'))
+
+    def test_move_to_wxf(self):
+        self.assertEqual(move_to_wxf(self.game, 'h3', 'e3'), 'C2.5')
+        self.assertEqual(move_to_wxf(self.game, 'h1', 'g3'), 'H2+3')
+        self.assertEqual(move_to_wxf(self.game, 'i1', 'i2'), 'R1+1')
+        self.assertEqual(move_to_wxf(self.game, 'e1', 'e2'), 'K5+1')
+
+        self.game.make_move('h3', 'e3')
+
+        # Black counts files from its own right, so the h file is black's 8th
+        self.assertEqual(move_to_wxf(self.game, 'h10', 'g8'), 'H8+7')
+        self.assertEqual(move_to_wxf(self.game, 'g7', 'g6'), 'P7+1')
+
+    def test_wxf_tandem(self):
+        game = XiangqiGame.from_fen("3k5/9/9/9/9/9/9/R8/9/R3K4 w")
+
+        self.assertEqual(move_to_wxf(game, 'a3', 'a4'), '+R+1')
+        self.assertEqual(wxf_to_coords(game, 'R++1'), ('a3', 'a4'))
+        self.assertEqual(wxf_to_coords(game, '-R.8'), ('a1', 'b1'))
+        self.assertIsNone(wxf_to_coords(game, 'R9+1'))
+
+    def test_wxf_three_tandem(self):
+        game = XiangqiGame.from_fen("3k5/9/4P4/4P4/4P4/9/9/9/9/5K3 w")
+
+        # Three soldiers on one file are numbered from the front
+        self.assertEqual(move_to_wxf(game, 'e8', 'e9'), '1P+1')
+        self.assertEqual(move_to_wxf(game, 'e7', 'd7'), '2P.6')
+        self.assertEqual(wxf_to_coords(game, '2P.4'), ('e7', 'f7'))
+        self.assertEqual(wxf_to_coords(game, '+P.4'), ('e8', 'f8'))
+        self.assertEqual(wxf_to_coords(game, 'P-.6'), ('e6', 'd6'))
+        self.assertIsNone(wxf_to_coords(game, 'P5.4'))
+        self.assertIsNone(wxf_to_coords(game, '4P.4'))
+
+    def test_wxf_tandem_on_two_files(self):
+        game = XiangqiGame.from_fen("3k5/9/9/9/2P1P4/2P1P4/9/9/9/5K3 w")
+
+        # The file follows the marker when another file holds tandem soldiers too
+        self.assertEqual(move_to_wxf(game, 'e6', 'e7'), '+P5+1')
+        self.assertEqual(wxf_to_coords(game, '+P7.8'), ('c6', 'b6'))
+        self.assertIsNone(wxf_to_coords(game, '+P+1'))
+
+    def test_wxf_round_trip(self):
+        generator = random.Random(4)
+
+        for _ply in range(80):
+            legal_moves = self.game.legal_moves()
+
+            if not legal_moves:
+                break
+
+            move = generator.choice(legal_moves)
+
+            self.assertEqual(wxf_to_coords(self.game, move_to_wxf(self.game, *move)), move)
+            self.game.make_move(*move)
+
+    def test_wxf_aliases(self):
+        self.assertEqual(wxf_to_coords(self.game, 'N2+3'), ('h1', 'g3'))
+        self.assertEqual(wxf_to_coords(self.game, 'B3+5'), ('g1', 'e3'))
+        self.assertEqual(wxf_to_coords(self.game, 'C2=5'), ('h3', 'e3'))
+        self.assertIsNone(wxf_to_coords(self.game, 'C2+9'))
+
+class RecordReaderTester(unittest.TestCase):
+    def test_read_games(self):
+        games = list(read_games(io.StringIO(RECORDS)))
+
+        self.assertEqual(len(games), 3)
+        self.assertEqual(games[0]['tags']['Event'], "Test")
+        self.assertEqual(games[0]['moves'], ['H2-E2', 'H9-G7', 'H0-G2', 'I9-H9', 'I0-H0'])
+        self.assertEqual(games[1]['moves'], ['C2.5', 'H8+7', 'H2+3', 'R9.8', 'R1.2'])
+        self.assertEqual(games[2]['result'], "1-0")
+
+    def test_game_without_result(self):
+        games = list(read_games(io.StringIO('1. h2e2 h7e7\n[Event "Next"]\n1. h2e2\n')))
+
+        self.assertEqual([game['moves'] for game in games], [['h2e2', 'h7e7'], ['h2e2']])
+        self.assertEqual(games[1]['tags'], { "Event": "Next" })
+
+    def test_replay_games(self):
+        results = [replay_game(game) for game in read_games(io.StringIO(RECORDS))]
+
+        self.assertEqual([result['moves_played'] for result in results], [5, 5, 3])
+        self.assertEqual([result['illegal_move'] for result in results], [None, None, (4, 'a9a5')])
+
+    def test_replay_repeated_position(self):
+        # The starting position comes up a third time and the game goes on
+        record = {
+            "index": 0,
+            "tags": {},
+            "moves": ['B0-C2', 'B9-C7', 'C2-B0', 'C7-B9'] * 2 + ['H2-E2'],
+            "result": None
+        }
+        result = replay_game(record)
+
+        self.assertEqual(result['moves_played'], 9)
+        self.assertIsNone(result['illegal_move'])
+        self.assertEqual(result['game_state'], "UNFINISHED")
+
+    def test_record_moves_with_hashes(self):
+        record = next(read_games(io.StringIO(RECORDS)))
+
+        moves, game_state, illegal_move, hashes = record_moves(record, with_hashes = True)
+        game = XiangqiGame()
+
+        for move, position_hash in zip(moves, hashes):
+            self.assertEqual(game.get_position_hash(), position_hash)
+            game.make_move(*move)
+
+        self.assertEqual((len(hashes), game_state, illegal_move), (5, "UNFINISHED", None))
+        self.assertEqual(record_moves(record), (moves, game_state, illegal_move))
+
+    def test_replay_from_fen(self):
+        record = {
+            "index": 0,
+            "tags": { "FEN": "5k3/9/9/9/4r4/9/9/9/9/4K4 w" },
+            "moves": ["e0d0"],
+            "result": None
+        }
+
+        self.assertEqual(replay_game(record)['game_state'], "UNFINISHED")
+        self.assertIsNone(replay_game(record)['illegal_move'])
+
+    def test_validate_records_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games.pgn")
+
+            with open(path, "w") as records_file:
+                records_file.write(RECORDS * 5)
+
+            single  = list(validate_records(path))
+            workers = list(validate_records(path, workers = 2, chunk_size = 2))
+
+            self.assertEqual(workers, single)
+            self.assertEqual(len(single), 15)
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(main([path, "--workers", "1"]), 1)
+
+if __name__ == '__main__':
+    unittest.main()
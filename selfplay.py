@@ -0,0 +1,196 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Self-play harness for the XiangqiGame class.  Plays games between move policies
+#              across a pool of worker processes and reports the speed, game lengths and results,
+#              to stress the rules and to generate game records.
+#
+# Usage: python selfplay.py [--games N] [--workers N] [--red random] [--black greedy]
+#                           [--max-moves N] [--seed N] [--backend dict] [--depth N] [--output games.jsonl]
+
+import argparse, json, os, random, sys, time
+from collections import Counter
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from XiangqiGame import XiangqiGame
+from engine import SearchEngine
+from evaluation import PIECE_VALUES
+
+def random_policy(game, generator):
+    """
+    Move policy that plays a random legal move
+    """
+    return generator.choice(game.legal_moves())
+
+def greedy_capture_policy(game, generator):
+    """
+    Move policy that captures the most valuable piece it can, and otherwise plays a random
+    legal move
+    """
+    legal_moves = game.legal_moves()
+    best_value  = 0
+    best_moves  = []
+
+    for move in legal_moves:
+        captured = game.get_piece(game.convert_coord(move[1]))
+        value    = PIECE_VALUES[str(captured)] if captured else 0
+
+        if value > best_value:
+            best_value = value
+            best_moves = [move]
+        elif value == best_value and value:
+            best_moves.append(move)
+
+    return generator.choice(best_moves or legal_moves)
+
+class SearchPolicy:
+    """
+    Move policy that plays the move found by a SearchEngine of the given depth. Kept as a class
+    rather than a closure so it can be sent to worker processes.
+    """
+    def __init__(self, depth = 2):
+        """
+        Initialization method that takes the search depth
+        """
+        self._depth = depth
+
+    def __call__(self, game, generator):
+        """
+        Returns the move found by the search
+        """
+        return SearchEngine(max_depth = self._depth).search(game)
+
+# Constant of the move policies by name. A policy is any callable taking a game and a random
+# generator and returning a legal (from, to) move for the player to move.
+POLICIES = {
+    "random": random_policy,
+    "greedy": greedy_capture_policy,
+    "search": SearchPolicy
+}
+
+def make_policy(policy, search_depth = 2):
+    """
+    Takes a policy name from POLICIES or a policy callable, and returns the policy callable
+    """
+    if callable(policy):
+        return policy
+
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy: {policy}")
+
+    if policy == "search":
+        return SearchPolicy(search_depth)
+
+    return POLICIES[policy]
+
+def play_game(seed, red_policy = "random", black_policy = "random", max_moves = 200, board_backend = "dict", search_depth = 2):
+    """
+    Plays one game between the two policies, seeding the random generator with the given seed,
+    until it is won or max_moves have been made. Returns a dict of the seed, the result (the game
+    state, or MOVE_LIMIT) and the list of moves as joined coordinates (ex 'h3e3').
+    """
+    generator = random.Random(seed)
+    game      = XiangqiGame(board_backend = board_backend)
+    policies  = {
+        "red": make_policy(red_policy, search_depth),
+        "black": make_policy(black_policy, search_depth)
+    }
+    moves     = []
+
+    while game.get_game_state() == "UNFINISHED" and len(moves) < max_moves:
+        from_coord, to_coord = policies[game.get_current_turn()](game, generator)
+
+        # A policy returning an illegal move is a bug in the rules or the policy, so stop loudly
+        if not game.make_move(from_coord, to_coord):
+            raise RuntimeError(f"Policy played an illegal move {from_coord}{to_coord} in game {seed}")
+
+        moves.append(from_coord + to_coord)
+
+    result = game.get_game_state()
+
+    return {
+        "seed": seed,
+        "result": result if result != "UNFINISHED" else "MOVE_LIMIT",
+        "moves": moves
+    }
+
+def run_selfplay(games, workers = None, red_policy = "random", black_policy = "random", max_moves = 200,
+                 seed = 0, board_backend = "dict", search_depth = 2):
+    """
+    Plays the given number of games, game i seeded with seed + i, across a pool of worker
+    processes (all CPUs if workers is None, in this process if workers is 1). Returns a dict of
+    the games played, the seconds taken, games per second, average length in moves, a Counter
+    of results and the list of game records from play_game in seed order.
+    """
+    start_time = time.perf_counter()
+    seeds      = range(seed, seed + games)
+    arguments  = (red_policy, black_policy, max_moves, board_backend, search_depth)
+
+    if workers == 1:
+        records = [play_game(game_seed, *arguments) for game_seed in seeds]
+    else:
+        workers = workers or os.cpu_count() or 1
+
+        # Games are sent in chunks so short games do not pay a round trip to a worker each
+        with ProcessPoolExecutor(max_workers = workers) as executor:
+            records = list(executor.map(
+                play_game, seeds, *[repeat(argument, games) for argument in arguments],
+                chunksize = max(1, games // (workers * 4))
+            ))
+
+    seconds = time.perf_counter() - start_time
+
+    return {
+        "games": games,
+        "seconds": seconds,
+        "games_per_second": games / seconds if seconds > 0 else float('inf'),
+        "average_length": sum(len(record['moves']) for record in records) / games if games else 0.0,
+        "results": Counter(record['result'] for record in records),
+        "records": records
+    }
+
+def format_summary(summary):
+    """
+    Returns a report of a run_selfplay summary
+    """
+    lines = [
+        f"{summary['games']} games in {summary['seconds']:.2f}s ({summary['games_per_second']:.2f} games/s)",
+        f"average length: {summary['average_length']:.1f} moves"
+    ]
+
+    for result, count in sorted(summary['results'].items()):
+        lines.append(f"{result}: {count} ({count / summary['games']:.1%})")
+
+    return "\n".join(lines)
+
+def main(arguments = None):
+    """
+    Command line entry point, returns the exit status
+    """
+    parser = argparse.ArgumentParser(description = "Play xiangqi games between move policies.")
+    parser.add_argument("--games", type = int, default = 100, help = "number of games to play")
+    parser.add_argument("--workers", type = int, default = None, help = "worker processes, all CPUs by default")
+    parser.add_argument("--red", default = "random", choices = sorted(POLICIES), help = "red move policy")
+    parser.add_argument("--black", default = "random", choices = sorted(POLICIES), help = "black move policy")
+    parser.add_argument("--max-moves", type = int, default = 200, help = "moves before a game is stopped")
+    parser.add_argument("--seed", type = int, default = 0, help = "seed of the first game")
+    parser.add_argument("--backend", default = "dict", choices = sorted(XiangqiGame.BOARD_BACKENDS))
+    parser.add_argument("--depth", type = int, default = 2, help = "depth of the search policy")
+    parser.add_argument("--output", default = None, help = "file to write the games to as JSON lines")
+    options = parser.parse_args(arguments)
+
+    summary = run_selfplay(
+        options.games, options.workers, options.red, options.black, options.max_moves,
+        options.seed, options.backend, options.depth
+    )
+
+    print(format_summary(summary))
+
+    if options.output:
+        with open(options.output, "w") as output_file:
+            for record in summary['records']:
+                output_file.write(json.dumps(record) + "\n")
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
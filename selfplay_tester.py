@@ -0,0 +1,65 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for the self-play harness.
+
+import unittest, contextlib, io, json, os, random, tempfile
+from XiangqiGame import XiangqiGame
+from selfplay import play_game, run_selfplay, make_policy, greedy_capture_policy, main
+from records import parse_move
+
+class SelfPlayTester(unittest.TestCase):
+    def test_play_game_replays(self):
+        record = play_game(3, max_moves = 60)
+        game   = XiangqiGame()
+
+        for move in record['moves']:
+            self.assertTrue(game.make_move(*parse_move(move)))
+
+        if record['result'] == "MOVE_LIMIT":
+            self.assertEqual(len(record['moves']), 60)
+        else:
+            self.assertEqual(game.get_game_state(), record['result'])
+
+    def test_play_game_is_repeatable(self):
+        self.assertEqual(play_game(5, "greedy", "random", 40), play_game(5, "greedy", "random", 40))
+
+    def test_greedy_takes_chariot(self):
+        game = XiangqiGame.from_fen("3k5/9/9/9/r3p4/9/9/9/9/R3K4 w")
+
+        self.assertEqual(greedy_capture_policy(game, random.Random(0)), ('a1', 'a6'))
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            make_policy("best")
+
+    def test_run_selfplay_in_process(self):
+        summary = run_selfplay(4, workers = 1, black_policy = "greedy", max_moves = 30)
+
+        self.assertEqual(summary['games'], 4)
+        self.assertEqual(sum(summary['results'].values()), 4)
+        self.assertEqual([record['seed'] for record in summary['records']], [0, 1, 2, 3])
+
+    def test_run_selfplay_workers_match(self):
+        # Games are seeded by number, so the pool plays the same games as a single process
+        self.assertEqual(
+            run_selfplay(3, workers = 2, max_moves = 20, seed = 10)['records'],
+            run_selfplay(3, workers = 1, max_moves = 20, seed = 10)['records']
+        )
+
+    def test_search_policy(self):
+        record = play_game(1, "search", "random", 4, search_depth = 1)
+
+        self.assertEqual(len(record['moves']), 4)
+
+    def test_main_output(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games.jsonl")
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(main(["--games", "2", "--workers", "1", "--max-moves", "10", "--output", path]), 0)
+
+            with open(path) as games_file:
+                self.assertEqual(len([json.loads(line) for line in games_file]), 2)
+
+if __name__ == '__main__':
+    unittest.main()
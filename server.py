@@ -0,0 +1,300 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Asyncio game server hosting many XiangqiGame sessions over TCP.  Clients send one
+#              JSON request per line and get one JSON response per line.  Moves and legal move
+#              listing, which scan for checkmate, run in an executor so a slow game does not hold
+#              up every other connection.
+#
+# Usage: python server.py [--host 127.0.0.1] [--port 8765] [--workers N] [--max-games N]
+
+import argparse, asyncio, json, sys
+from concurrent.futures import ThreadPoolExecutor
+from XiangqiGame import XiangqiGame
+
+# Protocol #
+############
+# Each request is a JSON object on one line with a "command" and the fields it takes, and an
+# optional "id" that is copied to the response. Responses have "ok" true with the fields listed,
+# or "ok" false with an "error" message.
+#
+# new_game     -> optional "fen" and "backend", responds with "game" (the game id)
+# make_move    -> "game", "from" and "to" (ex "h3", "e3"), responds with "result" (as make_move),
+#                 "game_state" and "turn"
+# game_state   -> "game", responds with "game_state", "turn" and "fen"
+# is_in_check  -> "game" and "color", responds with "in_check"
+# legal_moves  -> "game" and optional "color", responds with "moves" as [from, to] pairs
+# close_game   -> "game", responds with no fields
+COMMANDS = ("new_game", "make_move", "game_state", "is_in_check", "legal_moves", "close_game")
+
+class ProtocolError(Exception):
+    """
+    Raised for a request that cannot be carried out, its message is sent back to the client
+    """
+
+def get_field(request, name, field_type, required = True):
+    """
+    Returns a field of a request, or None if it is missing and not required, raising a
+    ProtocolError if it is missing and required or is not of the given type. True and false are
+    not accepted as integers.
+    """
+    value = request.get(name)
+
+    if value is None:
+        if required:
+            raise ProtocolError(f"Missing field: {name}")
+
+        return None
+
+    if not isinstance(value, field_type) or (field_type is int and isinstance(value, bool)):
+        raise ProtocolError(f"Field {name} must be a {'string' if field_type is str else 'number'}")
+
+    return value
+
+class GameServer:
+    """
+    Hosts games by id for any number of connections, so two clients can play the same game.
+    Requests on one game are run one at a time under a lock for that game, while requests on
+    different games run concurrently.
+    """
+    def __init__(self, executor = None, max_games = None):
+        """
+        Initialization method that takes an optional executor to run moves and move generation
+        in (a thread pool is made by default) and an optional limit on the games hosted at once
+        """
+        self._executor      = executor
+        self._owns_executor = executor is None
+        self._max_games     = max_games
+        self._games         = {}
+        self._locks         = {}
+        self._pending_games = 0
+        self._next_game_id  = 1
+
+        if self._owns_executor:
+            self._executor = ThreadPoolExecutor()
+
+    def get_game_count(self):
+        """
+        Returns the number of games being hosted
+        """
+        return len(self._games)
+
+    def close(self):
+        """
+        Shuts down the executor if the server made it
+        """
+        if self._owns_executor:
+            self._executor.shutdown(wait = False)
+
+    async def run_in_executor(self, function, *arguments):
+        """
+        Runs a blocking function in the executor and returns its result
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *arguments)
+
+    def get_game(self, request):
+        """
+        Returns the game and its lock named by the requests "game" field, raising a ProtocolError
+        if the field is not a game id or there is no such game
+        """
+        game_id = get_field(request, "game", int)
+
+        if game_id not in self._games:
+            raise ProtocolError(f"No game {game_id}")
+
+        return self._games[game_id], self._locks[game_id]
+
+    async def handle_request(self, request):
+        """
+        Takes a request dict and returns the response dict, errors included. An unexpected
+        exception is also sent back as an error, so one bad request does not drop the connection.
+        """
+        if not isinstance(request, dict):
+            return { "ok": False, "error": "Request must be a JSON object" }
+
+        response = { "id": request['id'] } if "id" in request else {}
+
+        try:
+            command = request.get("command")
+
+            if command not in COMMANDS:
+                raise ProtocolError(f"Unknown command: {command}")
+
+            response.update(await getattr(self, "command_" + command)(request))
+            response['ok'] = True
+        except ProtocolError as error:
+            response['ok']    = False
+            response['error'] = str(error)
+        except Exception as error:
+            response['ok']    = False
+            response['error'] = f"Internal error: {type(error).__name__}: {error}"
+
+        return response
+
+    async def command_new_game(self, request):
+        """
+        Starts a game from the starting position or the requests FEN
+        """
+        backend = get_field(request, "backend", str, required = False)
+        fen     = get_field(request, "fen", str, required = False)
+
+        if backend is None:
+            backend = "dict"
+
+        if backend not in XiangqiGame.BOARD_BACKENDS:
+            raise ProtocolError(f"Unknown board backend: {backend}")
+
+        # Games still loading hold their slot, so requests arriving together cannot pass the limit
+        if self._max_games is not None and len(self._games) + self._pending_games >= self._max_games:
+            raise ProtocolError("Too many games")
+
+        self._pending_games += 1
+
+        # Loading a FEN checks for a finished game, so it runs in the executor
+        try:
+            game = await self.run_in_executor(XiangqiGame, backend, None, fen)
+        except ValueError as error:
+            raise ProtocolError(str(error))
+        finally:
+            self._pending_games -= 1
+
+        game_id             = self._next_game_id
+        self._next_game_id += 1
+
+        self._games[game_id] = game
+        self._locks[game_id] = asyncio.Lock()
+
+        return { "game": game_id }
+
+    async def command_make_move(self, request):
+        """
+        Makes a move, returning whether it was made and the state afterwards
+        """
+        game, lock = self.get_game(request)
+        from_coord = request.get("from")
+        to_coord   = request.get("to")
+
+        if not game.is_coordinate(from_coord) or not game.is_coordinate(to_coord):
+            raise ProtocolError(f"Invalid move: {from_coord} {to_coord}")
+
+        # The checkmate scan after each move is the slow part, so the move runs in the executor
+        async with lock:
+            result = await self.run_in_executor(game.make_move, from_coord, to_coord)
+
+            return { "result": result, "game_state": game.get_game_state(), "turn": game.get_current_turn() }
+
+    async def command_game_state(self, request):
+        """
+        Returns the state, turn and FEN of a game
+        """
+        game, lock = self.get_game(request)
+
+        async with lock:
+            return { "game_state": game.get_game_state(), "turn": game.get_current_turn(), "fen": game.to_fen() }
+
+    async def command_is_in_check(self, request):
+        """
+        Returns whether the requests color is in check
+        """
+        game, lock = self.get_game(request)
+        color      = get_field(request, "color", str)
+
+        if color not in XiangqiGame.OPPOSITE_COLOR_DICT:
+            raise ProtocolError(f"Invalid color: {color}")
+
+        async with lock:
+            return { "in_check": game.is_in_check(color) }
+
+    async def command_legal_moves(self, request):
+        """
+        Returns the legal moves of the requests color, or of the player to move
+        """
+        game, lock = self.get_game(request)
+        color      = get_field(request, "color", str, required = False)
+
+        if color is not None and color not in XiangqiGame.OPPOSITE_COLOR_DICT:
+            raise ProtocolError(f"Invalid color: {color}")
+
+        async with lock:
+            moves = await self.run_in_executor(game.legal_moves, color)
+
+        return { "moves": [list(move) for move in moves] }
+
+    async def command_close_game(self, request):
+        """
+        Stops hosting a game
+        """
+        game_id     = request.get("game")
+        _game, lock = self.get_game(request)
+
+        # Wait for any request on the game to finish before dropping it
+        async with lock:
+            self._games.pop(game_id, None)
+            self._locks.pop(game_id, None)
+
+        return {}
+
+    async def handle_connection(self, reader, writer):
+        """
+        Reads requests from a connection one line at a time until it closes, writing a response
+        line for each
+        """
+        try:
+            while True:
+                line = await reader.readline()
+
+                if not line:
+                    break
+
+                if not line.strip():
+                    continue
+
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = { "ok": False, "error": "Invalid JSON" }
+                else:
+                    response = await self.handle_request(request)
+
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host = "127.0.0.1", port = 8765):
+        """
+        Starts listening and returns the asyncio server, port 0 picks a free port
+        """
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+async def serve(host, port, workers = None, max_games = None):
+    """
+    Runs a server until it is cancelled
+    """
+    game_server = GameServer(ThreadPoolExecutor(max_workers = workers), max_games)
+
+    async with await game_server.start(host, port) as server:
+        print(f"Serving on {', '.join(str(socket.getsockname()) for socket in server.sockets)}")
+        await server.serve_forever()
+
+def main(arguments = None):
+    """
+    Command line entry point, returns the exit status
+    """
+    parser = argparse.ArgumentParser(description = "Host xiangqi games over a JSON lines protocol.")
+    parser.add_argument("--host", default = "127.0.0.1", help = "address to listen on")
+    parser.add_argument("--port", type = int, default = 8765, help = "port to listen on")
+    parser.add_argument("--workers", type = int, default = None, help = "executor threads")
+    parser.add_argument("--max-games", type = int, default = None, help = "games hosted at once")
+    options = parser.parse_args(arguments)
+
+    try:
+        asyncio.run(serve(options.host, options.port, options.workers, options.max_games))
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for the asyncio game server.
+
+import unittest, asyncio, json, threading
+from concurrent.futures import ThreadPoolExecutor
+from server import GameServer
+
+class GameServerTester(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.game_server = GameServer(max_games = 3)
+
+    async def asyncTearDown(self):
+        self.game_server.close()
+
+    async def request(self, **request):
+        return await self.game_server.handle_request(request)
+
+    async def test_play_moves(self):
+        game_id = (await self.request(command = "new_game"))['game']
+
+        response = await self.request(id = 7, command = "make_move", game = game_id, **{ "from": "h3", "to": "e3" })
+
+        self.assertEqual(response, { "id": 7, "ok": True, "result": True, "game_state": "UNFINISHED", "turn": "black" })
+
+        # Red cannot move twice
+        response = await self.request(command = "make_move", game = game_id, **{ "from": "e3", "to": "e7" })
+
+        self.assertFalse(response['result'])
+
+        response = await self.request(command = "legal_moves", game = game_id)
+
+        self.assertEqual(len(response['moves']), 45)
+        self.assertIn(["h8", "e8"], response['moves'])
+
+    async def test_checkmate_from_fen(self):
+        game_id = (await self.request(command = "new_game", fen = "4k4/9/9/9/9/9/9/9/R8/1R1K5 w"))['game']
+
+        response = await self.request(command = "make_move", game = game_id, **{ "from": "a2", "to": "a9" })
+
+        self.assertEqual(response['game_state'], "UNFINISHED")
+
+        response = await self.request(command = "make_move", game = game_id, **{ "from": "e10", "to": "f10" })
+        response = await self.request(command = "make_move", game = game_id, **{ "from": "b1", "to": "b10" })
+
+        self.assertEqual(response['game_state'], "RED_WON")
+
+        response = await self.request(command = "is_in_check", game = game_id, color = "black")
+
+        self.assertTrue(response['in_check'])
+
+    async def test_errors(self):
+        self.assertFalse((await self.request(command = "fly"))['ok'])
+        self.assertFalse((await self.request(command = "game_state", game = 99))['ok'])
+        self.assertFalse((await self.request(command = "new_game", fen = "not a fen"))['ok'])
+        self.assertFalse((await self.request(command = "new_game", backend = "abacus"))['ok'])
+        self.assertEqual((await self.request(command = "new_game", backend = ""))['error'], "Unknown board backend: ")
+
+        game_id = (await self.request(command = "new_game"))['game']
+
+        self.assertFalse((await self.request(command = "make_move", game = game_id, **{ "from": "z1", "to": "a2" }))['ok'])
+        self.assertFalse((await self.request(command = "is_in_check", game = game_id, color = "green"))['ok'])
+
+    async def test_wrong_field_types(self):
+        game_id = (await self.request(command = "new_game"))['game']
+
+        self.assertEqual((await self.request(command = "new_game", fen = 123))['error'], "Field fen must be a string")
+        self.assertFalse((await self.request(command = "new_game", backend = ["dict"]))['ok'])
+        self.assertEqual((await self.request(command = "game_state", game = [game_id]))['error'], "Field game must be a number")
+        self.assertFalse((await self.request(command = "game_state", game = True))['ok'])
+        self.assertFalse((await self.request(command = "is_in_check", game = game_id, color = ["red"]))['ok'])
+        self.assertFalse((await self.request(command = "legal_moves", game = game_id, color = 1))['ok'])
+        self.assertFalse((await self.request(command = "make_move", game = game_id, **{ "from": 1, "to": "e3" }))['ok'])
+
+    async def test_unexpected_error(self):
+        game_id = (await self.request(command = "new_game"))['game']
+
+        def broken_legal_moves(color = None):
+            raise RuntimeError("broken")
+
+        self.game_server._games[game_id].legal_moves = broken_legal_moves
+
+        response = await self.request(id = 3, command = "legal_moves", game = game_id)
+
+        self.assertEqual(response, { "id": 3, "ok": False, "error": "Internal error: RuntimeError: broken" })
+        self.assertTrue((await self.request(command = "game_state", game = game_id))['ok'])
+
+    async def test_game_limit_and_close(self):
+        game_ids = [(await self.request(command = "new_game"))['game'] for _game in range(3)]
+
+        self.assertEqual((await self.request(command = "new_game"))['error'], "Too many games")
+        self.assertTrue((await self.request(command = "close_game", game = game_ids[0]))['ok'])
+        self.assertEqual(self.game_server.get_game_count(), 2)
+        self.assertTrue((await self.request(command = "new_game"))['ok'])
+
+    async def test_game_limit_with_requests_together(self):
+        responses = await asyncio.gather(*[self.request(command = "new_game") for _game in range(6)])
+
+        self.assertEqual(sum(response['ok'] for response in responses), 3)
+        self.assertEqual(self.game_server.get_game_count(), 3)
+
+    async def test_slow_move_does_not_block_other_games(self):
+        release = threading.Event()
+        server  = GameServer(ThreadPoolExecutor(max_workers = 2))
+
+        slow_id = (await server.handle_request({ "command": "new_game" }))['game']
+        fast_id = (await server.handle_request({ "command": "new_game" }))['game']
+
+        # Hold one games move in the executor until the other game has been served
+        slow_game = server._games[slow_id]
+        make_move = slow_game.make_move
+
+        def blocked_make_move(from_coord, to_coord):
+            release.wait(5)
+            return make_move(from_coord, to_coord)
+
+        slow_game.make_move = blocked_make_move
+
+        slow_move = asyncio.ensure_future(
+            server.handle_request({ "command": "make_move", "game": slow_id, "from": "h3", "to": "e3" })
+        )
+        response = await server.handle_request({ "command": "make_move", "game": fast_id, "from": "b3", "to": "e3" })
+
+        self.assertTrue(response['result'])
+        self.assertFalse(slow_move.done())
+
+        release.set()
+
+        self.assertTrue((await slow_move)['result'])
+
+        server._executor.shutdown()
+
+    async def test_tcp_connection(self):
+        server         = await self.game_server.start(port = 0)
+        port           = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+        async def send(line):
+            writer.write(line + b"\n")
+            await writer.drain()
+            return json.loads(await reader.readline())
+
+        game_id = (await send(b'{"command": "new_game"}'))['game']
+
+        self.assertEqual((await send(b'{"command": "game_state", "game": %d}' % game_id))['turn'], "red")
+        self.assertEqual((await send(b'{not json'))['error'], "Invalid JSON")
+        self.assertFalse((await send(b'{"command": "make_move", "game": [1], "from": "h3", "to": "e3"}'))['ok'])
+        self.assertTrue((await send(b'{"command": "game_state", "game": %d}' % game_id))['ok'])
+
+        writer.close()
+        await writer.wait_closed()
+        server.close()
+        await server.wait_closed()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Immutable snapshot of a XiangqiGame position.  Holds the piece codes of the 90
+#              squares as bytes along with the player to move, game state and position hash, so
+#              it is cheap to take, compare, hash and send between processes.
+
+class GameSnapshot:
+    """
+    Snapshot of a game position made by XiangqiGame.snapshot. Games are made back from it with
+    XiangqiGame.from_snapshot, which only builds piece objects if they are used.
+    """
+    def __init__(self, codes, current_turn, game_state, position_hash):
+        """
+        Initialization method that takes the 90 piece codes by square index, the color string
+        of the player to move, the game state string and the position hash
+        """
+        if len(codes) != 90:
+            raise ValueError(f"A snapshot needs 90 squares, got {len(codes)}")
+
+        self._codes         = bytes(codes)
+        self._current_turn  = current_turn
+        self._game_state    = game_state
+        self._position_hash = position_hash
+
+    def get_codes(self):
+        """
+        Returns the piece codes of every square as 90 bytes
+        """
+        return self._codes
+
+    def get_current_turn(self):
+        """
+        Returns the color string of the player to move
+        """
+        return self._current_turn
+
+    def get_game_state(self):
+        """
+        Returns the game state string
+        """
+        return self._game_state
+
+    def get_position_hash(self):
+        """
+        Returns the Zobrist hash of the position
+        """
+        return self._position_hash
+
+    def __eq__(self, other):
+        """
+        Snapshots are equal when the pieces and player to move are the same
+        """
+        if not isinstance(other, GameSnapshot):
+            return NotImplemented
+
+        return self._codes == other._codes and self._current_turn == other._current_turn
+
+    def __hash__(self):
+        """
+        Hashes by the position hash, which already covers the pieces and player to move
+        """
+        return hash(self._position_hash)
+
+    def __repr__(self):
+        """
+        Returns a short description of the snapshot for debugging
+        """
+        return f"GameSnapshot({self._current_turn}, {self._game_state}, {self._position_hash:016x})"
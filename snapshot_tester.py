@@ -0,0 +1,115 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for game snapshots and cloning.
+
+import unittest, pickle
+from XiangqiGame import XiangqiGame
+from snapshot import GameSnapshot
+
+class GameSnapshotTester(unittest.TestCase):
+    def setUp(self):
+        self.game = XiangqiGame()
+        self.game.make_move('h3', 'e3')
+        self.game.make_move('h10', 'g8')
+
+    def test_snapshot_matches_position(self):
+        snapshot = self.game.snapshot()
+
+        self.assertEqual(len(snapshot.get_codes()), 90)
+        self.assertEqual(snapshot.get_current_turn(), "red")
+        self.assertEqual(snapshot.get_game_state(), "UNFINISHED")
+        self.assertEqual(snapshot.get_position_hash(), self.game.get_position_hash())
+
+    def test_snapshot_same_on_every_backend(self):
+        for board_backend in XiangqiGame.BOARD_BACKENDS:
+            game = XiangqiGame(board_backend = board_backend)
+            game.make_move('h3', 'e3')
+            game.make_move('h10', 'g8')
+
+            self.assertEqual(game.snapshot().get_codes(), self.game.snapshot().get_codes())
+
+    def test_snapshot_transposition(self):
+        # The same position reached in a different order gives an equal snapshot
+        other_game = XiangqiGame()
+        other_game.make_move('b1', 'c3')
+        other_game.make_move('b10', 'c8')
+        other_game.make_move('c3', 'b1')
+        other_game.make_move('c8', 'b10')
+        other_game.make_move('h3', 'e3')
+        other_game.make_move('h10', 'g8')
+
+        self.assertEqual(other_game.snapshot(), self.game.snapshot())
+        self.assertEqual(len({ other_game.snapshot(), self.game.snapshot() }), 1)
+        self.assertNotEqual(XiangqiGame().snapshot(), self.game.snapshot())
+
+    def test_pickle(self):
+        snapshot = self.game.snapshot()
+
+        self.assertEqual(pickle.loads(pickle.dumps(snapshot)), snapshot)
+
+    def test_invalid_codes(self):
+        with self.assertRaises(ValueError):
+            GameSnapshot(bytes(89), "red", "UNFINISHED", 0)
+
+class CloneTester(unittest.TestCase):
+    def setUp(self):
+        self.game = XiangqiGame()
+        self.game.make_move('h3', 'e3')
+
+    def test_clone_builds_pieces_lazily(self):
+        clone = self.game.clone()
+
+        self.assertNotIn('_board', clone.__dict__)
+        self.assertEqual(clone.to_fen(), self.game.to_fen())
+        self.assertIn('_board', clone.__dict__)
+
+    def test_clone_piece_kinds_without_pieces(self):
+        clone = self.game.clone()
+
+        self.assertEqual(str(clone.get_piece_kind({ "row": 3, "column": 'e' })), 'C')
+        self.assertIsNone(clone.get_piece_kind({ "row": 3, "column": 'h' }))
+        self.assertNotIn('_board', clone.__dict__)
+
+        self.assertIs(
+            clone.get_piece_kind({ "row": 1, "column": 'a' }),
+            self.game.get_piece({ "row": 1, "column": 'a' }).get_kind()
+        )
+
+    def test_clone_is_independent(self):
+        clone = self.game.clone()
+
+        self.assertCountEqual(clone.legal_moves(), self.game.legal_moves())
+        self.assertTrue(clone.make_move('h8', 'e8'))
+
+        self.assertEqual(self.game.get_current_turn(), "black")
+        self.assertEqual(self.game.get_move_history(), [('h3', 'e3')])
+        self.assertEqual(clone.get_move_history(), [('h8', 'e8')])
+        self.assertIsNone(self.game.get_piece({ "row": 8, "column": 'e' }))
+
+    def test_clone_keeps_backend(self):
+        game = XiangqiGame(board_backend = "bitboard")
+        game.make_move('h3', 'e3')
+        clone = game.clone()
+
+        # The backend answers check questions without building the pieces
+        self.assertFalse(clone.is_in_check('black'))
+        self.assertNotIn('_board', clone.__dict__)
+
+        self.assertCountEqual(clone.legal_moves(), game.legal_moves())
+        self.assertEqual(clone.perft(2), game.perft(2))
+
+    def test_from_snapshot_keeps_game_state(self):
+        game = XiangqiGame.from_fen("9/9/4k4/9/3r5/9/9/9/9/3K5 w")
+
+        self.assertEqual(
+            XiangqiGame.from_snapshot(game.snapshot(), "compact").get_game_state(),
+            "BLACK_WON"
+        )
+
+    def test_clone_pickles_without_pieces(self):
+        clone = pickle.loads(pickle.dumps(self.game.clone()))
+
+        self.assertEqual(clone.to_fen(), self.game.to_fen())
+
+if __name__ == '__main__':
+    unittest.main()
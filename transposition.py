@@ -0,0 +1,166 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Fixed size transposition table keyed by Zobrist position hash.  Stores the depth,
+#              score, bound type and best move found for a position so search and analysis can
+#              reuse earlier work, and keeps hit and miss counts.  Entries live in preallocated
+#              arrays of fixed size fields, so the memory limit holds exactly.
+
+from array import array
+
+# Constants of the bound types a stored score can be. An exact score was searched inside the
+# alpha-beta window, a lower bound failed high and an upper bound failed low.
+EXACT       = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Array Fields #
+################
+# One array per field, indexed by slot. A bound of NO_ENTRY marks an empty slot, and a best move
+# square of NO_SQUARE a missing best move. Ages are kept modulo 65536, only ever compared for
+# equality with the current age.
+#
+# key, score, depth, age, bound, best move from square, best move to square
+FIELD_TYPECODES = ('Q', 'q', 'h', 'H', 'B', 'B', 'B')
+NO_ENTRY        = 255
+NO_SQUARE       = 255
+AGE_MASK        = 0xFFFF
+
+# Bytes one slot costs, the sum of one item of every field array, used to turn a memory limit
+# into a slot count
+ENTRY_SIZE = sum(array(typecode).itemsize for typecode in FIELD_TYPECODES)
+
+# Bytes set aside from the memory limit for the table object and the headers of its arrays
+TABLE_OVERHEAD = 4096
+
+# Default memory limit of the table in bytes
+DEFAULT_MEMORY_LIMIT = 16 * 1024 * 1024
+
+# Constant of the replacement schemes. "depth" keeps the deeper of two entries for the same slot
+# unless the stored one is left over from an earlier search, "age" always keeps the newest.
+REPLACEMENT_SCHEMES = ("depth", "age")
+
+class TranspositionTable:
+    """
+    Transposition table of a fixed number of slots, each holding at most one entry. A position
+    hash picks its slot by modulo, and the full hash is stored with the entry so a different
+    position sharing the slot is seen as a miss. Best moves are (from, to) tuples of square
+    indexes.
+    """
+    def __init__(self, memory_limit = DEFAULT_MEMORY_LIMIT, replacement = "depth"):
+        """
+        Initialization method that takes the most bytes the table may use and the replacement
+        scheme name from REPLACEMENT_SCHEMES
+        """
+        if replacement not in REPLACEMENT_SCHEMES:
+            raise ValueError(f"Unknown replacement scheme: {replacement}")
+
+        if memory_limit < TABLE_OVERHEAD + ENTRY_SIZE:
+            raise ValueError(f"Memory limit must be at least {TABLE_OVERHEAD + ENTRY_SIZE} bytes")
+
+        self._capacity    = (memory_limit - TABLE_OVERHEAD) // ENTRY_SIZE
+        self._replacement = replacement
+
+        self.clear()
+
+    def get_capacity(self):
+        """
+        Returns the number of entries the table can hold
+        """
+        return self._capacity
+
+    def new_search(self):
+        """
+        Marks the start of a new search, so entries from earlier searches can be replaced first
+        """
+        self._age = (self._age + 1) & AGE_MASK
+
+    def clear(self):
+        """
+        Removes every entry and resets the statistics
+        """
+        capacity = self._capacity
+
+        self._keys       = array('Q', [0]) * capacity
+        self._scores     = array('q', [0]) * capacity
+        self._depths     = array('h', [0]) * capacity
+        self._ages       = array('H', [0]) * capacity
+        self._bounds     = array('B', [NO_ENTRY]) * capacity
+        self._move_from  = array('B', [NO_SQUARE]) * capacity
+        self._move_to    = array('B', [NO_SQUARE]) * capacity
+        self._age        = 0
+        self._hits       = 0
+        self._misses     = 0
+        self._stores     = 0
+        self._overwrites = 0
+        self._rejections = 0
+
+    def probe(self, key):
+        """
+        Takes a position hash and returns its stored entry as a dict of depth, score, bound and
+        best move, or None if the position is not in the table
+        """
+        slot = key % self._capacity
+
+        if self._bounds[slot] == NO_ENTRY or self._keys[slot] != key:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        from_square = self._move_from[slot]
+
+        return {
+            "depth": self._depths[slot],
+            "score": self._scores[slot],
+            "bound": self._bounds[slot],
+            "best_move": None if from_square == NO_SQUARE else (from_square, self._move_to[slot])
+        }
+
+    def store(self, key, depth, score, bound, best_move = None):
+        """
+        Takes a position hash and the depth, score, bound type and best move found for it, and
+        stores them if the replacement scheme allows. Returns True if the entry was stored.
+        """
+        slot     = key % self._capacity
+        occupied = self._bounds[slot] != NO_ENTRY
+
+        if occupied and self._keys[slot] != key:
+            # A different position holds the slot, with the depth scheme only replace it if it
+            # is stale or was searched no deeper
+            if self._replacement == "depth" and self._ages[slot] == self._age and self._depths[slot] > depth:
+                self._rejections += 1
+                return False
+
+            self._overwrites += 1
+
+        # Keep the best move of an earlier search of the same position when this one has none
+        if best_move is not None:
+            self._move_from[slot], self._move_to[slot] = best_move
+        elif not occupied or self._keys[slot] != key:
+            self._move_from[slot] = NO_SQUARE
+
+        self._keys[slot]   = key
+        self._scores[slot] = score
+        self._depths[slot] = depth
+        self._ages[slot]   = self._age
+        self._bounds[slot] = bound
+        self._stores      += 1
+
+        return True
+
+    def get_stats(self):
+        """
+        Returns a dict of the hit, miss, store, overwrite and rejection counts, the entries in use
+        and the hit rate
+        """
+        probes = self._hits + self._misses
+
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "stores": self._stores,
+            "overwrites": self._overwrites,
+            "rejections": self._rejections,
+            "entries": self._capacity - self._bounds.count(NO_ENTRY),
+            "capacity": self._capacity,
+            "hit_rate": self._hits / probes if probes else 0.0
+        }
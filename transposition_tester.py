@@ -0,0 +1,186 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for the transposition table.
+
+import unittest, copy, random, tracemalloc
+from transposition import TranspositionTable, ENTRY_SIZE, TABLE_OVERHEAD, EXACT, LOWER_BOUND, UPPER_BOUND
+from XiangqiGame import XiangqiGame
+from engine import SearchEngine
+from pieces import Chariot, General
+
+class TranspositionTableTester(unittest.TestCase):
+    def setUp(self):
+        self.table = TranspositionTable(memory_limit = TABLE_OVERHEAD + ENTRY_SIZE * 8)
+
+    def test_capacity(self):
+        self.assertEqual(self.table.get_capacity(), 8)
+
+        with self.assertRaises(ValueError):
+            TranspositionTable(memory_limit = TABLE_OVERHEAD + ENTRY_SIZE - 1)
+
+        with self.assertRaises(ValueError):
+            TranspositionTable(replacement = "random")
+
+    def test_memory_limit_holds(self):
+        memory_limit = 4 * 1024 * 1024
+
+        tracemalloc.start()
+
+        try:
+            table = TranspositionTable(memory_limit)
+
+            for key in range(table.get_capacity()):
+                table.store(key * 7919, 5, -key, EXACT, (key % 90, (key + 1) % 90))
+
+            allocated, _peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(table.get_stats()['entries'], table.get_capacity())
+        self.assertLessEqual(allocated, memory_limit)
+
+    def test_store_and_probe(self):
+        self.assertIsNone(self.table.probe(3))
+
+        self.assertTrue(self.table.store(3, 2, 50, LOWER_BOUND, (0, 9)))
+
+        self.assertEqual(
+            self.table.probe(3),
+            { "depth": 2, "score": 50, "bound": LOWER_BOUND, "best_move": (0, 9) }
+        )
+
+    def test_slot_collision_is_a_miss(self):
+        self.table.store(3, 2, 50, EXACT)
+
+        # 11 shares slot 3 of the 8 slots with a different key
+        self.assertIsNone(self.table.probe(11))
+
+    def test_depth_preferred_replacement(self):
+        self.table.store(3, 4, 50, EXACT)
+
+        self.assertFalse(self.table.store(11, 2, 10, EXACT))
+        self.assertEqual(self.table.probe(3)['depth'], 4)
+
+        # Entries from an earlier search can always be replaced
+        self.table.new_search()
+
+        self.assertTrue(self.table.store(11, 2, 10, EXACT))
+        self.assertIsNone(self.table.probe(3))
+
+    def test_age_replacement(self):
+        table = TranspositionTable(memory_limit = TABLE_OVERHEAD + ENTRY_SIZE * 8, replacement = "age")
+        table.store(3, 4, 50, EXACT)
+
+        self.assertTrue(table.store(11, 2, 10, UPPER_BOUND))
+        self.assertEqual(table.probe(11)['score'], 10)
+
+    def test_same_position_keeps_best_move(self):
+        self.table.store(3, 2, 50, EXACT, (0, 9))
+        self.table.store(3, 3, 40, UPPER_BOUND)
+
+        self.assertEqual(self.table.probe(3)['best_move'], (0, 9))
+
+    def test_stats(self):
+        self.table.store(3, 2, 50, EXACT)
+        self.table.probe(3)
+        self.table.probe(4)
+
+        stats = self.table.get_stats()
+
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['entries'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+        self.table.clear()
+
+        self.assertEqual(self.table.get_stats()['entries'], 0)
+
+class GameStateCacheTester(unittest.TestCase):
+    def test_cached_games_match_uncached(self):
+        cache     = TranspositionTable(memory_limit = 1024 * 1024)
+        generator = random.Random(7)
+
+        for _game in range(3):
+            moves = []
+            game  = XiangqiGame()
+
+            for _ply in range(40):
+                legal_moves = game.legal_moves()
+
+                if not legal_moves:
+                    break
+
+                moves.append(generator.choice(legal_moves))
+                game.make_move(*moves[-1])
+
+            # Replay each game twice with the shared cache, the second time answered from it
+            for _replay in range(2):
+                cached_game = XiangqiGame(game_state_cache = cache)
+
+                for move in moves:
+                    self.assertTrue(cached_game.make_move(*move))
+
+                self.assertEqual(cached_game.get_game_state(), game.get_game_state())
+
+        self.assertGreater(cache.get_stats()['hits'], 0)
+
+    def test_cached_checkmate(self):
+        cache = TranspositionTable(memory_limit = 1024 * 1024)
+
+        for replay in range(2):
+            game = XiangqiGame(game_state_cache = cache)
+            game._board = copy.deepcopy( XiangqiGame.BLANK_BOARD )
+
+            red_general   = General('red', 'd', 1)
+            black_chariot = Chariot('black', 'c', 6)
+            black_general = General('black', 'e', 8)
+
+            game._board[1]['d']  = red_general
+            game._board[6]['c']  = black_chariot
+            game._board[8]['e']  = black_general
+            game._red_pieces     = { 'G': red_general }
+            game._black_pieces   = { 'G': black_general, 'R1': black_chariot }
+            game._current_turn   = "black"
+            game.rebuild_position_caches()
+
+            self.assertTrue(game.make_move('c6', 'd6'))
+            self.assertEqual(game.get_game_state(), "BLACK_WON")
+            self.assertEqual(cache.get_stats()['hits'], replay)
+
+    def test_shared_with_search_entries(self):
+        game  = XiangqiGame()
+        cache = TranspositionTable(memory_limit = 1024 * 1024)
+        game.make_move('h3', 'e3')
+
+        # A search score of zero for the same position must not read as black having no moves
+        cache.store(game.get_position_hash(), 3, 0, EXACT)
+
+        cached_game = XiangqiGame(game_state_cache = cache)
+        cached_game.make_move('h3', 'e3')
+
+        self.assertEqual(cached_game.get_game_state(), "UNFINISHED")
+        self.assertEqual(cache.probe(game.get_position_hash())['depth'], 3)
+
+class EngineTableTester(unittest.TestCase):
+    def test_table_reduces_nodes(self):
+        game = XiangqiGame()
+
+        plain_engine = SearchEngine(max_depth = 3)
+        plain_move   = plain_engine.search(game)
+
+        table_engine = SearchEngine(max_depth = 3, transposition_table = TranspositionTable())
+        table_move   = table_engine.search(game)
+
+        self.assertIn(table_move, game.legal_moves())
+        self.assertEqual(
+            table_engine.get_search_info()['score'],
+            plain_engine.get_search_info()['score']
+        )
+        self.assertLess(
+            table_engine.get_search_info()['nodes'],
+            plain_engine.get_search_info()['nodes']
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Zobrist hashing keys for the XiangqiGame class.  A position is hashed by XORing one
+#              random 64 bit key for every piece code and square pair, plus a key when it is black
+#              to move, so a move only needs a few XORs to update the hash.
+
+import random
+from board import square_index, piece_code
+
+# Seed for the key generator, fixed so hashes are the same between runs and processes
+ZOBRIST_SEED = 20200301
+
+def _build_keys():
+    """
+    Returns a tuple of per square key tuples indexed by piece code (0 through 15, the empty code
+    and the unused codes get keys too so lookups never need a check), the side to move key and
+    the key that moves game state cache entries into their own key space
+    """
+    generator = random.Random(ZOBRIST_SEED)
+
+    piece_keys = tuple(
+        tuple(generator.getrandbits(64) for _square in range(90))
+        for _code in range(16)
+    )
+
+    return piece_keys, generator.getrandbits(64), generator.getrandbits(64)
+
+ZOBRIST_PIECE_KEYS, ZOBRIST_SIDE_KEY, ZOBRIST_GAME_STATE_KEY = _build_keys()
+
+def hash_board(board, current_turn):
+    """
+    Takes a nested dict game board and the color string of the player to move, and returns the
+    full hash of the position.  Only needed when a game is set up, moves update the hash with
+    the XOR deltas instead.
+    """
+    position_hash = 0
+
+    for row, columns in board.items():
+        for column, piece in columns.items():
+            if piece:
+                position_hash ^= ZOBRIST_PIECE_KEYS[piece_code(piece)][square_index(column, row)]
+
+    if current_turn == 'black':
+        position_hash ^= ZOBRIST_SIDE_KEY
+
+    return position_hash
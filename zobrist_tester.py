@@ -0,0 +1,48 @@
+# Author: Matthew Yang
+# Date: 10/18/2026
+# Description: Tests for the Zobrist hashing keys.
+
+import unittest, copy
+from zobrist import ZOBRIST_PIECE_KEYS, ZOBRIST_SIDE_KEY, hash_board
+from pieces import General
+from XiangqiGame import XiangqiGame
+
+class ZobristTester(unittest.TestCase):
+    def setUp(self):
+        self.board = copy.deepcopy( XiangqiGame.BLANK_BOARD )
+        self.board[1]['e'] = General('red', 'e', 1)
+        self.board[10]['e'] = General('black', 'e', 10)
+
+    def test_keys_are_64_bit(self):
+        for piece_keys in ZOBRIST_PIECE_KEYS:
+            self.assertEqual(len(piece_keys), 90)
+
+            for key in piece_keys:
+                self.assertTrue(0 <= key < 2 ** 64)
+
+    def test_keys_are_unique(self):
+        all_keys = [key for piece_keys in ZOBRIST_PIECE_KEYS for key in piece_keys]
+        all_keys.append(ZOBRIST_SIDE_KEY)
+
+        self.assertEqual(
+            len(set(all_keys)),
+            len(all_keys)
+        )
+
+    def test_hash_board_side_to_move(self):
+        self.assertEqual(
+            hash_board(self.board, 'red') ^ hash_board(self.board, 'black'),
+            ZOBRIST_SIDE_KEY
+        )
+
+    def test_hash_board_piece_placement(self):
+        empty_hash = hash_board(self.board, 'red')
+        self.board[1]['d'] = General('red', 'd', 1)
+
+        self.assertNotEqual(
+            hash_board(self.board, 'red'),
+            empty_hash
+        )
+
+if __name__ == '__main__':
+    unittest.main()